@@ -0,0 +1,68 @@
+-- 가족(조언 작성자)별 버전 카운터
+-- advices 행이 추가/수정/삭제될 때마다 해당 author_id의 version을 1 올립니다.
+-- 백엔드는 이 값으로 ETag를 만들어 If-None-Match 요청에 전체 목록을 다시 조회하지 않고 304로 응답합니다.
+
+CREATE TABLE IF NOT EXISTS advice_family_versions (
+    author_id VARCHAR(255) PRIMARY KEY REFERENCES users(id) ON DELETE CASCADE,
+    version BIGINT NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE NOT NULL DEFAULT NOW()
+);
+
+-- 문장 단위 트리거: 일괄 INSERT/UPDATE/DELETE에서도 가족마다 한 번만 증가
+CREATE OR REPLACE FUNCTION bump_advice_family_version()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO advice_family_versions (author_id, version, updated_at)
+        SELECT DISTINCT author_id, 1, NOW() FROM new_rows
+        ON CONFLICT (author_id) DO UPDATE
+            SET version = advice_family_versions.version + 1, updated_at = NOW();
+    ELSIF TG_OP = 'UPDATE' THEN
+        INSERT INTO advice_family_versions (author_id, version, updated_at)
+        SELECT author_id, 1, NOW() FROM (
+            SELECT author_id FROM new_rows
+            UNION
+            SELECT author_id FROM old_rows
+        ) changed
+        ON CONFLICT (author_id) DO UPDATE
+            SET version = advice_family_versions.version + 1, updated_at = NOW();
+    ELSE
+        INSERT INTO advice_family_versions (author_id, version, updated_at)
+        SELECT DISTINCT author_id, 1, NOW() FROM old_rows
+        ON CONFLICT (author_id) DO UPDATE
+            SET version = advice_family_versions.version + 1, updated_at = NOW();
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS advices_bump_family_version_insert ON advices;
+CREATE TRIGGER advices_bump_family_version_insert
+    AFTER INSERT ON advices
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_advice_family_version();
+
+DROP TRIGGER IF EXISTS advices_bump_family_version_update ON advices;
+CREATE TRIGGER advices_bump_family_version_update
+    AFTER UPDATE ON advices
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_advice_family_version();
+
+DROP TRIGGER IF EXISTS advices_bump_family_version_delete ON advices;
+CREATE TRIGGER advices_bump_family_version_delete
+    AFTER DELETE ON advices
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_advice_family_version();
+
+-- 기존 데이터로 초기값 생성
+INSERT INTO advice_family_versions (author_id, version, updated_at)
+SELECT author_id, 1, MAX(COALESCE(updated_at, created_at, NOW()))
+FROM advices
+GROUP BY author_id
+ON CONFLICT (author_id) DO NOTHING;
+
+-- Grant permissions
+GRANT SELECT ON advice_family_versions TO anon, authenticated, service_role;
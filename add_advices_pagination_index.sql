@@ -0,0 +1,9 @@
+-- GET /advices 키셋(커서) 페이지네이션용 인덱스
+-- (author_id, created_at DESC, id DESC) 순서로 정렬/범위 조건을 인덱스만으로 처리합니다
+
+CREATE INDEX IF NOT EXISTS advices_author_created_at_id_idx
+    ON advices (author_id, created_at DESC, id DESC);
+
+-- 카테고리 필터와 함께 조회하는 경우
+CREATE INDEX IF NOT EXISTS advices_author_category_created_at_id_idx
+    ON advices (author_id, category, created_at DESC, id DESC);
@@ -0,0 +1,10 @@
+-- Add media_variants column to advices table
+-- 업로드 후 백그라운드에서 생성한 썸네일/웹 최적화 이미지(WebP)와 영상 포스터 URL
+-- 예: {"w320": "...", "w640": "...", "w1280": "..."} 또는 {"poster": "..."}
+ALTER TABLE advices ADD COLUMN IF NOT EXISTS media_variants JSONB;
+
+-- 변형 생성 작업이 media_url로 조언을 찾아 기록하므로 인덱스 추가
+CREATE INDEX IF NOT EXISTS advices_media_url_idx ON advices (media_url) WHERE media_url IS NOT NULL;
+
+-- Add comment to the column
+COMMENT ON COLUMN advices.media_variants IS '미디어 변형 URL (썸네일, WebP, 영상 포스터)';
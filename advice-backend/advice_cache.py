@@ -0,0 +1,131 @@
+import logging
+from typing import Any, Optional
+
+import orjson
+
+from cache import TTLCache
+from config import settings
+from metrics import CACHE_LOOKUPS
+
+logger = logging.getLogger("advice.cache")
+
+# 가족별 조언 목록 캐시
+# (author_id, category, target_age)별로 검증이 끝난 조언 목록을 보관합니다.
+# 항목에는 조회 시점의 가족 버전(advice_family_versions.version)을 함께 저장하고, 읽을 때 현재 버전과 다르면
+# 무효로 처리하므로 여러 워커가 각자 프로세스 내 캐시를 써도 오래된 목록을 반환하지 않습니다.
+# 쓰기 API는 invalidate_family()로 해당 가족의 항목만 즉시 제거합니다.
+
+def filter_key(category: Optional[str], target_age: Optional[int]) -> str:
+    return f"{category or ''}|{target_age or ''}"
+
+class LocalAdviceListBackend:
+    """프로세스 내 LRU 백엔드"""
+
+    def __init__(self, max_size: int, ttl_seconds: float):
+        self.cache = TTLCache(max_size=max_size, ttl_seconds=ttl_seconds, name="advice_lists")
+
+    async def get(self, author_id: str, field: str) -> Optional[dict]:
+        return self.cache.get((author_id, field))
+
+    async def set(self, author_id: str, field: str, entry: dict) -> None:
+        self.cache.set((author_id, field), entry)
+
+    async def invalidate_family(self, author_id: str) -> None:
+        self.cache.invalidate_matching(lambda key: key[0] == author_id)
+
+    def stats(self) -> dict:
+        return {"backend": "local", **self.cache.stats()}
+
+class RedisAdviceListBackend:
+    """Redis 프로토콜 백엔드 (가족마다 해시 하나: advices:<author_id> → {필터: 목록})
+
+    redis.asyncio.Redis와 같은 hget/hset/expire/delete 코루틴을 가진 클라이언트라면 무엇이든 사용할 수 있습니다.
+    축출은 Redis의 maxmemory 정책에 맡기므로 evictions는 집계하지 않습니다.
+    """
+
+    def __init__(self, client: Any, ttl_seconds: float, prefix: str = "advices"):
+        self.client = client
+        self.ttl_seconds = int(ttl_seconds)
+        self.prefix = prefix
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def _key(self, author_id: str) -> str:
+        return f"{self.prefix}:{author_id}"
+
+    async def get(self, author_id: str, field: str) -> Optional[dict]:
+        try:
+            raw = await self.client.hget(self._key(author_id), field)
+        except Exception:
+            # 캐시 장애는 DB 조회로 대체
+            self.errors += 1
+            logger.warning("advice cache read failed", exc_info=True)
+            raw = None
+        if raw is None:
+            self.misses += 1
+            CACHE_LOOKUPS.labels("advice_lists", "miss").inc()
+            return None
+        self.hits += 1
+        CACHE_LOOKUPS.labels("advice_lists", "hit").inc()
+        return orjson.loads(raw)
+
+    async def set(self, author_id: str, field: str, entry: dict) -> None:
+        key = self._key(author_id)
+        try:
+            await self.client.hset(key, field, orjson.dumps(entry))
+            await self.client.expire(key, self.ttl_seconds)
+        except Exception:
+            self.errors += 1
+            logger.warning("advice cache write failed", exc_info=True)
+
+    async def invalidate_family(self, author_id: str) -> None:
+        try:
+            await self.client.delete(self._key(author_id))
+        except Exception:
+            self.errors += 1
+            logger.warning("advice cache invalidation failed", exc_info=True)
+
+    def stats(self) -> dict:
+        return {
+            "backend": "redis",
+            "hits": self.hits,
+            "misses": self.misses,
+            "errors": self.errors,
+            "evictions": None,
+            "hit_ratio": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+        }
+
+class AdviceListCache:
+    def __init__(self, backend):
+        self.backend = backend
+        self.stale = 0
+
+    async def get(self, author_id: str, category: Optional[str], target_age: Optional[int], version: Optional[int]) -> Optional[list]:
+        entry = await self.backend.get(author_id, filter_key(category, target_age))
+        if entry is None:
+            return None
+        if entry["version"] != version:
+            # 다른 워커에서 변경된 경우
+            self.stale += 1
+            CACHE_LOOKUPS.labels("advice_lists", "stale").inc()
+            return None
+        return entry["items"]
+
+    async def set(self, author_id: str, category: Optional[str], target_age: Optional[int], version: Optional[int], items: list) -> None:
+        await self.backend.set(author_id, filter_key(category, target_age), {"version": version, "items": items})
+
+    async def invalidate_family(self, author_id: Optional[str]) -> None:
+        if author_id:
+            await self.backend.invalidate_family(author_id)
+
+    def stats(self) -> dict:
+        return {**self.backend.stats(), "stale": self.stale}
+
+def create_advice_list_cache() -> AdviceListCache:
+    if settings.ADVICE_CACHE_URL:
+        import redis.asyncio as redis
+
+        client = redis.Redis.from_url(settings.ADVICE_CACHE_URL)
+        return AdviceListCache(RedisAdviceListBackend(client, settings.ADVICE_CACHE_TTL_SECONDS))
+    return AdviceListCache(LocalAdviceListBackend(settings.ADVICE_CACHE_MAX_SIZE, settings.ADVICE_CACHE_TTL_SECONDS))
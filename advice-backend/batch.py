@@ -0,0 +1,54 @@
+import csv
+import io
+import json
+from typing import Any, Iterator, List, Optional, Sequence
+
+from fastapi import HTTPException
+
+# CSV 가져오기에서 허용하는 열 (AdviceCreate 필드와 동일)
+CSV_FIELDS = ("category", "target_age", "content", "media_url", "media_type", "unlockType", "password")
+
+class ImportParseError(ValueError):
+    """가져오기 파일의 한 줄을 해석하지 못한 경우 (해당 항목만 실패로 보고)"""
+
+def detect_import_format(content_type: str, requested: Optional[str] = None) -> str:
+    if requested:
+        fmt = requested.lower()
+    elif "csv" in (content_type or ""):
+        fmt = "csv"
+    else:
+        fmt = "ndjson"
+    if fmt not in ("ndjson", "csv"):
+        raise HTTPException(status_code=400, detail="지원하지 않는 형식입니다 (ndjson 또는 csv)")
+    return fmt
+
+def parse_import_body(body: bytes, fmt: str) -> List[Any]:
+    """NDJSON/CSV 본문을 항목 목록으로 변환합니다. 해석할 수 없는 줄은 ImportParseError로 남겨 둡니다."""
+    try:
+        text = body.decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail="UTF-8 형식의 파일만 가져올 수 있습니다")
+
+    items: List[Any] = []
+    if fmt == "ndjson":
+        for line_number, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            try:
+                items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                items.append(ImportParseError(f"{line_number}번째 줄 JSON 오류: {e.msg}"))
+        return items
+
+    reader = csv.DictReader(io.StringIO(text))
+    unknown = set(reader.fieldnames or []) - set(CSV_FIELDS)
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"알 수 없는 CSV 열: {', '.join(sorted(unknown))}")
+    for row in reader:
+        # 빈 칸은 값이 없는 것으로 처리
+        items.append({key: value for key, value in row.items() if value not in (None, "")})
+    return items
+
+def chunked(items: Sequence[Any], size: int) -> Iterator[Sequence[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
@@ -0,0 +1,146 @@
+"""테스트/벤치마크용 메모리 Redis
+
+redis.asyncio.Redis 대신 넣어 Redis 서버 없이 Redis 백엔드(목록 캐시, 이벤트 브로커, 요청 수 제한)를 실행합니다.
+main.py와 각 백엔드가 쓰는 명령만 구현하며, 값은 실제 클라이언트처럼 bytes로 돌려줍니다.
+Lua 스크립트는 실행할 수 없으므로 register_script로 등록할 스크립트마다 같은 동작의 파이썬 함수를 scripts에 넘깁니다.
+now를 바꾸면 TIME 명령과 키 만료가 그 시각을 기준으로 동작합니다.
+
+    fake = FakeRedis(scripts={SCRIPT: python_impl})
+    backend = RedisAdviceListBackend(fake, ttl_seconds=60)
+"""
+import asyncio
+import time
+from collections import Counter
+from typing import Any, Callable, Dict, List, Optional, Set
+
+def encode(value: Any) -> bytes:
+    if isinstance(value, bytes):
+        return value
+    return str(value).encode()
+
+class FakePubSub:
+    def __init__(self, redis: "FakeRedis"):
+        self.redis = redis
+        self.channels: Set[bytes] = set()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.closed = False
+
+    async def subscribe(self, *channels: str) -> None:
+        for channel in map(encode, channels):
+            self.channels.add(channel)
+            self.redis.subscribers.setdefault(channel, set()).add(self)
+
+    async def unsubscribe(self, *channels: str) -> None:
+        for channel in list(map(encode, channels)) or list(self.channels):
+            self.channels.discard(channel)
+            subscribers = self.redis.subscribers.get(channel)
+            if subscribers is not None:
+                subscribers.discard(self)
+                if not subscribers:
+                    del self.redis.subscribers[channel]
+
+    async def get_message(self, ignore_subscribe_messages: bool = False, timeout: float = 0.0) -> Optional[dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        await self.unsubscribe()
+        self.closed = True
+
+class FakeScript:
+    def __init__(self, redis: "FakeRedis", func: Callable[["FakeRedis", List[str], List[Any]], Any]):
+        self.redis = redis
+        self.func = func
+
+    async def __call__(self, keys: Optional[List[str]] = None, args: Optional[List[Any]] = None) -> Any:
+        self.redis._command("evalsha")
+        return self.func(self.redis, list(keys or []), list(args or []))
+
+class FakeRedis:
+    def __init__(self, scripts: Optional[Dict[str, Callable]] = None):
+        self.scripts = scripts or {}
+        self.hashes: Dict[str, Dict[bytes, bytes]] = {}
+        self.expires: Dict[str, float] = {}
+        self.subscribers: Dict[bytes, Set[FakePubSub]] = {}
+        self.calls: Counter = Counter()
+        self.now: Optional[float] = None
+        # True로 두면 모든 명령이 ConnectionError를 냅니다 (장애 흉내)
+        self.down = False
+
+    def time(self) -> float:
+        return self.now if self.now is not None else time.time()
+
+    def _command(self, name: str) -> None:
+        if self.down:
+            raise ConnectionError("fake redis is down")
+        self.calls[name] += 1
+
+    def _hash(self, key: str, create: bool = False) -> Optional[Dict[bytes, bytes]]:
+        expires_at = self.expires.get(key)
+        if expires_at is not None and expires_at <= self.time():
+            self.hashes.pop(key, None)
+            del self.expires[key]
+        if create:
+            return self.hashes.setdefault(key, {})
+        return self.hashes.get(key)
+
+    # 해시 명령
+    async def hget(self, key: str, field: str) -> Optional[bytes]:
+        self._command("hget")
+        return (self._hash(key) or {}).get(encode(field))
+
+    async def hset(self, key: str, field: Optional[str] = None, value: Any = None, mapping: Optional[dict] = None) -> int:
+        self._command("hset")
+        return self.hset_now(key, {**({field: value} if field is not None else {}), **(mapping or {})})
+
+    def hset_now(self, key: str, mapping: dict) -> int:
+        data = self._hash(key, create=True)
+        added = sum(encode(field) not in data for field in mapping)
+        data.update((encode(field), encode(value)) for field, value in mapping.items())
+        return added
+
+    def hmget_now(self, key: str, fields: List[str]) -> List[Optional[bytes]]:
+        data = self._hash(key) or {}
+        return [data.get(encode(field)) for field in fields]
+
+    async def expire(self, key: str, seconds: int) -> bool:
+        self._command("expire")
+        return self.pexpire_now(key, seconds * 1000)
+
+    def pexpire_now(self, key: str, milliseconds: int) -> bool:
+        if self._hash(key) is None:
+            return False
+        self.expires[key] = self.time() + milliseconds / 1000
+        return True
+
+    async def delete(self, *keys: str) -> int:
+        self._command("delete")
+        deleted = 0
+        for key in keys:
+            if self._hash(key) is not None:
+                del self.hashes[key]
+                deleted += 1
+            self.expires.pop(key, None)
+        return deleted
+
+    def ttl(self, key: str) -> Optional[float]:
+        """남은 만료 시간(초), 만료가 없으면 None"""
+        expires_at = self.expires.get(key) if self._hash(key) is not None else None
+        return expires_at - self.time() if expires_at is not None else None
+
+    # pub/sub
+    async def publish(self, channel: str, message: Any) -> int:
+        self._command("publish")
+        subscribers = list(self.subscribers.get(encode(channel), ()))
+        for pubsub in subscribers:
+            pubsub.queue.put_nowait({"type": "message", "channel": encode(channel), "data": encode(message)})
+        return len(subscribers)
+
+    def pubsub(self) -> FakePubSub:
+        return FakePubSub(self)
+
+    # 스크립트
+    def register_script(self, script: str) -> FakeScript:
+        return FakeScript(self, self.scripts[script])
@@ -0,0 +1,477 @@
+"""벤치마크용 메모리 Supabase (PostgREST + Storage)
+
+main.supabase 대신 넣어 실제 Supabase 없이 API를 실행합니다.
+쿼리 빌더는 postgrest-py처럼 필터를 PostgREST 파라미터(author_id=eq.x, or=(...), order=...)로 쌓고
+execute()에서 그 파라미터를 해석하므로, main.py의 apply_or_filter/apply_keyset_order도 실제와 같은 경로로 동작합니다.
+latency를 주면 호출마다 그만큼 대기해 네트워크 왕복을 흉내 냅니다 (스레드 풀에서 실행되므로 time.sleep 사용).
+
+    backend = FakeSupabase(latency=0.005)
+    main.supabase = backend
+"""
+import heapq
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from datetime import datetime, timezone
+from io import BufferedReader, FileIO
+from operator import itemgetter
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+import httpx
+
+from search import NgramIndex
+
+def timestamp(moment: Optional[datetime] = None) -> str:
+    # Supabase timestamptz 형식 (마이크로초 자리를 항상 채워 문자열 비교 순서가 시간 순서와 같도록 함)
+    return (moment or datetime.now(timezone.utc)).strftime("%Y-%m-%dT%H:%M:%S.%f+00:00")
+
+TABLE_DEFAULTS: Dict[str, Dict[str, Any]] = {
+    "users": {"father_id": None, "age": None},
+    "advices": {
+        "media_url": None,
+        "media_type": None,
+        "media_variants": None,
+        "unlock_type": "age",
+        "password": None,
+        "is_read": False,
+        "is_favorite": False,
+    },
+}
+
+class FakeResponse:
+    def __init__(self, data: Any, count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+def sanitize_param(value: Any) -> str:
+    text = "true" if value is True else "false" if value is False else str(value)
+    return f'"{text}"' if any(char in text for char in ",:()") else text
+
+def split_top_level(text: str) -> List[str]:
+    """괄호와 큰따옴표 밖의 쉼표로 나눕니다: a.eq.1,and(b.eq.2,c.eq.3) → [a.eq.1, and(b.eq.2,c.eq.3)]"""
+    parts, depth, quoted, current = [], 0, False, []
+    for char in text:
+        if char == '"':
+            quoted = not quoted
+        elif not quoted and char == "(":
+            depth += 1
+        elif not quoted and char == ")":
+            depth -= 1
+        elif not quoted and depth == 0 and char == ",":
+            parts.append("".join(current))
+            current = []
+            continue
+        current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+def unquote(text: str) -> str:
+    return text[1:-1] if len(text) >= 2 and text[0] == text[-1] == '"' else text
+
+def coerce(sample: Any, text: str) -> Any:
+    """파라미터 문자열을 행 값과 비교할 수 있는 타입으로 바꿉니다."""
+    if isinstance(sample, bool):
+        return text == "true"
+    if isinstance(sample, int):
+        return int(text)
+    if isinstance(sample, float):
+        return float(text)
+    return text
+
+def compare(value: Any, operator: str, criteria: str) -> bool:
+    if operator == "is":
+        return value is None if criteria == "null" else value is coerce(True, criteria)
+    if value is None:
+        return False
+    if operator == "in":
+        return value in {coerce(value, unquote(item)) for item in split_top_level(criteria[1:-1])}
+    if operator in ("like", "ilike"):
+        pattern = criteria.replace("*", "%")
+        haystack, needle = (str(value).lower(), pattern.lower()) if operator == "ilike" else (str(value), pattern)
+        return all(piece in haystack for piece in needle.split("%") if piece)
+    target = coerce(value, unquote(criteria))
+    if operator == "eq":
+        return value == target
+    if operator == "neq":
+        return value != target
+    if operator == "gt":
+        return value > target
+    if operator == "gte":
+        return value >= target
+    if operator == "lt":
+        return value < target
+    if operator == "lte":
+        return value <= target
+    raise ValueError(f"지원하지 않는 연산자입니다: {operator}")
+
+def build_condition(column: str, expression: str) -> Callable[[dict], bool]:
+    negate = expression.startswith("not.")
+    if negate:
+        expression = expression[len("not."):]
+    operator, _, criteria = expression.partition(".")
+    if column in ("or", "and"):
+        conditions = [parse_condition(part) for part in split_top_level(expression[1:-1])]
+        combine = any if column == "or" else all
+        check = lambda row: combine(condition(row) for condition in conditions)
+    else:
+        check = lambda row: compare(row.get(column), operator, criteria)
+    return (lambda row: not check(row)) if negate else check
+
+def parse_condition(text: str) -> Callable[[dict], bool]:
+    # or=(...) 안의 조건: column.op.value 또는 and(...)/or(...)
+    for group in ("and", "or"):
+        if text.startswith(group + "("):
+            return build_condition(group, text[len(group):])
+    column, _, expression = text.partition(".")
+    return build_condition(column, expression)
+
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "on_conflict", "columns"}
+# 기본 키/외래 키처럼 eq 조회를 색인으로 처리하는 열 (행이 만들어진 뒤 바뀌지 않는 열만)
+INDEXED_COLUMNS = ("id", "author_id")
+
+class FakeQuery:
+    """postgrest-py SyncRequestBuilder와 같은 모양의 쿼리 빌더 (path, http_method, params, headers)"""
+
+    def __init__(self, backend: "FakeSupabase", table: str):
+        self.backend = backend
+        self.table = table
+        self.path = f"/{table}"
+        self.http_method = "GET"
+        self.params = httpx.QueryParams()
+        self.headers: Dict[str, str] = {}
+        self.payload: Any = None
+
+    def select(self, *columns: str, count: Optional[str] = None) -> "FakeQuery":
+        self.params = self.params.set("select", ",".join(columns) or "*")
+        return self
+
+    def insert(self, json: Any, *, upsert: bool = False, **_: Any) -> "FakeQuery":
+        self.http_method, self.payload = "POST", json
+        if upsert:
+            self.headers["Prefer"] = "resolution=merge-duplicates"
+        return self
+
+    def upsert(self, json: Any, **kwargs: Any) -> "FakeQuery":
+        return self.insert(json, upsert=True, **kwargs)
+
+    def update(self, json: Dict[str, Any], **_: Any) -> "FakeQuery":
+        self.http_method, self.payload = "PATCH", json
+        return self
+
+    def delete(self, **_: Any) -> "FakeQuery":
+        self.http_method = "DELETE"
+        return self
+
+    def filter(self, column: str, operator: str, criteria: str) -> "FakeQuery":
+        self.params = self.params.add(column, f"{operator}.{criteria}")
+        return self
+
+    def eq(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "eq", sanitize_param(value))
+
+    def neq(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "neq", sanitize_param(value))
+
+    def gt(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "gt", sanitize_param(value))
+
+    def gte(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "gte", sanitize_param(value))
+
+    def lt(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "lt", sanitize_param(value))
+
+    def lte(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "lte", sanitize_param(value))
+
+    def in_(self, column: str, values: Iterable[Any]) -> "FakeQuery":
+        return self.filter(column, "in", "(" + ",".join(map(sanitize_param, values)) + ")")
+
+    def is_(self, column: str, value: Any) -> "FakeQuery":
+        return self.filter(column, "is", "null" if value is None else sanitize_param(value))
+
+    def order(self, column: str, *, desc: bool = False, nullsfirst: bool = False) -> "FakeQuery":
+        self.params = self.params.add("order", f"{column}.{'desc' if desc else 'asc'}")
+        return self
+
+    def limit(self, size: int) -> "FakeQuery":
+        self.params = self.params.set("limit", str(size))
+        return self
+
+    def execute(self) -> FakeResponse:
+        return self.backend.execute(self)
+
+class FakeRpc:
+    def __init__(self, backend: "FakeSupabase", name: str, params: Dict[str, Any]):
+        self.backend = backend
+        self.name = name
+        self.path = f"/rpc/{name}"
+        self.http_method = "POST"
+        self.params = httpx.QueryParams()
+        self.headers: Dict[str, str] = {}
+        self.payload = params or {}
+
+    def execute(self) -> FakeResponse:
+        return self.backend.call_rpc(self)
+
+class FakeBucket:
+    """storage3 SyncBucketProxy에서 main.py가 쓰는 메서드만 구현합니다."""
+
+    def __init__(self, backend: "FakeSupabase", bucket: str):
+        self.backend = backend
+        self.id = bucket
+
+    def upload(self, path: str, file: Any, file_options: Optional[Dict[str, str]] = None) -> FakeResponse:
+        self.backend.wait()
+        # storage3와 같이 BufferedReader/FileIO/bytes만 내용으로 받고, 그 밖의 값은 경로로 보고 엽니다
+        # (SpooledTemporaryFile 같은 파일 객체를 넘기면 실제 클라이언트처럼 TypeError)
+        if isinstance(file, bytes):
+            content = file
+        elif isinstance(file, (BufferedReader, FileIO)):
+            content = file.read()
+        else:
+            with open(file, "rb") as stream:
+                content = stream.read()
+        objects = self.backend.objects.setdefault(self.id, {})
+        with self.backend.lock:
+            if path in objects and (file_options or {}).get("x-upsert") != "true":
+                raise RuntimeError(f"The resource already exists: {path}")
+            objects[path] = content
+            self.backend.calls["storage", self.id, "upload"] += 1
+        return FakeResponse({"Key": f"{self.id}/{path}"})
+
+    def download(self, path: str) -> bytes:
+        self.backend.wait()
+        with self.backend.lock:
+            self.backend.calls["storage", self.id, "download"] += 1
+            return self.backend.objects.get(self.id, {})[path]
+
+    def list(self, path: Optional[str] = None, options: Optional[Dict[str, Any]] = None) -> List[dict]:
+        self.backend.wait()
+        prefix = (path or "").rstrip("/") + "/" if path else ""
+        limit = (options or {}).get("limit", 100)
+        with self.backend.lock:
+            self.backend.calls["storage", self.id, "list"] += 1
+            names = sorted(
+                key[len(prefix):] for key in self.backend.objects.get(self.id, {})
+                if key.startswith(prefix) and "/" not in key[len(prefix):]
+            )
+        return [{"name": name} for name in names[:limit]]
+
+    def remove(self, paths: List[str]) -> List[dict]:
+        self.backend.wait()
+        objects = self.backend.objects.get(self.id, {})
+        with self.backend.lock:
+            self.backend.calls["storage", self.id, "remove"] += 1
+            return [{"name": path} for path in paths if objects.pop(path, None) is not None]
+
+    def get_public_url(self, path: str) -> str:
+        return f"{self.backend.url}/storage/v1/object/public/{self.id}/{path}"
+
+class FakeStorage:
+    def __init__(self, backend: "FakeSupabase"):
+        self.backend = backend
+
+    def from_(self, bucket: str) -> FakeBucket:
+        return FakeBucket(self.backend, bucket)
+
+class FakeSupabase:
+    """supabase.Client 대신 사용하는 메모리 저장소
+
+    advices 변경 시 add_advice_family_versions.sql의 트리거처럼 가족 버전을 올립니다.
+    calls에는 (서비스, 대상, 동작)별 호출 수가 쌓입니다.
+    """
+
+    def __init__(self, latency: float = 0.0, url: str = "http://localhost:54321"):
+        self.latency = latency
+        self.url = url
+        self.tables: Dict[str, List[dict]] = {"users": [], "advices": [], "advice_family_versions": []}
+        self.objects: Dict[str, Dict[str, bytes]] = {}
+        self.indexes: Dict[tuple, Dict[Any, List[dict]]] = {}
+        self.calls: Counter = Counter()
+        self.lock = threading.Lock()
+        self.storage = FakeStorage(self)
+        self.rpcs: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+            "get_advice_stats": self._advice_stats,
+            "get_advice_age_distribution": self._age_distribution,
+            "toggle_advice_favorite": self._toggle_favorite,
+            "search_advices": self._search,
+        }
+
+    def wait(self) -> None:
+        if self.latency:
+            time.sleep(self.latency)
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self, name)
+
+    def rpc(self, name: str, params: Optional[Dict[str, Any]] = None) -> FakeRpc:
+        return FakeRpc(self, name, params)
+
+    def load(self, table: str, rows: List[dict]) -> None:
+        """행을 API를 거치지 않고 바로 넣습니다 (시드 데이터용)."""
+        with self.lock:
+            self.tables.setdefault(table, []).extend(rows)
+            self._index_rows(table, rows)
+            if table == "advices":
+                self._bump_versions({row["author_id"] for row in rows})
+
+    def _index(self, table: str, column: str) -> Dict[Any, List[dict]]:
+        index = self.indexes.get((table, column))
+        if index is None:
+            index = self.indexes[table, column] = defaultdict(list)
+            for row in self.tables.setdefault(table, []):
+                index[row.get(column)].append(row)
+        return index
+
+    def _index_rows(self, table: str, rows: List[dict]) -> None:
+        for (indexed_table, column), index in self.indexes.items():
+            if indexed_table == table:
+                for row in rows:
+                    index[row.get(column)].append(row)
+
+    def _candidates(self, table: str, params: httpx.QueryParams) -> tuple:
+        """(후보 행, 색인으로 이미 처리한 조건)을 반환합니다. 색인 열의 eq 조건이 없으면 테이블 전체가 후보입니다."""
+        for column in INDEXED_COLUMNS:
+            for expression in params.get_list(column):
+                if expression.startswith("eq."):
+                    return self._index(table, column).get(unquote(expression[len("eq."):]), []), (column, expression)
+        return self.tables.setdefault(table, []), None
+
+    # 쿼리 실행
+
+    def execute(self, query: FakeQuery) -> FakeResponse:
+        self.wait()
+        operation = {"GET": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}[query.http_method]
+        with self.lock:
+            self.calls["postgrest", query.table, operation] += 1
+            rows = self.tables.setdefault(query.table, [])
+            if operation == "insert":
+                return FakeResponse(self._insert(query.table, rows, query.payload))
+            candidates, used = self._candidates(query.table, query.params)
+            conditions = [
+                build_condition(column, expression)
+                for column, expression in query.params.multi_items()
+                if column not in RESERVED_PARAMS and (column, expression) != used
+            ]
+            matched = [row for row in candidates if all(condition(row) for condition in conditions)] if conditions else list(candidates)
+            if operation == "update":
+                changes = dict(query.payload, updated_at=timestamp())
+                for row in matched:
+                    row.update(changes)
+                self._touch(query.table, matched)
+                return FakeResponse([dict(row) for row in matched])
+            if operation == "delete":
+                removed = {id(row) for row in matched}
+                rows[:] = [row for row in rows if id(row) not in removed]
+                # 삭제는 드물므로 색인은 다음 조회 때 다시 만듭니다
+                self.indexes = {key: index for key, index in self.indexes.items() if key[0] != query.table}
+                self._touch(query.table, matched)
+                return FakeResponse([dict(row) for row in matched])
+            return FakeResponse(self._select(matched, query.params))
+
+    def _insert(self, table: str, rows: List[dict], payload: Any) -> List[dict]:
+        created = []
+        for item in payload if isinstance(payload, list) else [payload]:
+            now = timestamp()
+            row = {"id": str(uuid.uuid4()), **TABLE_DEFAULTS.get(table, {}), "created_at": now, "updated_at": now, **item}
+            rows.append(row)
+            self._index_rows(table, [row])
+            created.append(dict(row))
+        self._touch(table, created)
+        return created
+
+    def _select(self, rows: List[dict], params: httpx.QueryParams) -> List[dict]:
+        orders = [order.partition(".") for value in params.get_list("order") for order in value.split(",")]
+        columns = [column for column, _, _ in orders]
+        descending = {direction.startswith("desc") for _, _, direction in orders}
+        offset = int(params.get("offset", 0))
+        limit = int(params["limit"]) if "limit" in params else None
+        if orders and limit is not None and len(descending) == 1:
+            # (created_at, id) 색인 범위 조회처럼 필요한 앞부분만 고릅니다
+            pick = heapq.nlargest if descending == {True} else heapq.nsmallest
+            try:
+                rows = pick(offset + limit, rows, key=itemgetter(*columns))[offset:]
+            except (KeyError, TypeError):
+                # 정렬 열에 NULL이 있으면 NULL을 가장 작은 값으로 취급합니다
+                null_safe = lambda row: tuple((row.get(column) is not None, row.get(column)) for column in columns)
+                rows = pick(offset + limit, rows, key=null_safe)[offset:]
+        else:
+            for column, _, direction in reversed(orders):
+                rows = sorted(rows, key=lambda row: (row.get(column) is not None, row.get(column)), reverse=direction.startswith("desc"))
+            rows = rows[offset:offset + limit] if limit is not None else rows[offset:]
+        selected = params.get("select", "*")
+        if selected == "*":
+            return [dict(row) for row in rows]
+        names = [name.strip() for name in selected.split(",")]
+        return [{name: row.get(name) for name in names} for row in rows]
+
+    def _touch(self, table: str, rows: List[dict]) -> None:
+        if table == "advices" and rows:
+            self._bump_versions({row["author_id"] for row in rows})
+
+    def _bump_versions(self, author_ids: Iterable[str]) -> None:
+        versions = {row["author_id"]: row for row in self.tables["advice_family_versions"]}
+        now = timestamp()
+        for author_id in author_ids:
+            row = versions.get(author_id)
+            if row is None:
+                self.tables["advice_family_versions"].append({"author_id": author_id, "version": 1, "updated_at": now})
+            else:
+                row["version"] += 1
+                row["updated_at"] = now
+
+    # RPC (supabase_stats_functions.sql, supabase_mutation_functions.sql, supabase_search_functions.sql)
+
+    def call_rpc(self, query: FakeRpc) -> FakeResponse:
+        self.wait()
+        with self.lock:
+            self.calls["rpc", query.name, "call"] += 1
+            return FakeResponse(self.rpcs[query.name](query.payload))
+
+    def _family(self, author_id: str) -> List[dict]:
+        return list(self._index("advices", "author_id").get(author_id, []))
+
+    def _advice_stats(self, params: Dict[str, Any]) -> dict:
+        rows = self._family(params["author_id_param"])
+        age = params.get("current_age_param")
+        return {
+            "total_advices": len(rows),
+            "read_advices": sum(row["is_read"] for row in rows),
+            "unread_advices": sum(not row["is_read"] for row in rows),
+            "favorite_advices": sum(row["is_favorite"] for row in rows),
+            "available_advices": sum(age is not None and row["target_age"] <= age for row in rows),
+            "future_advices": sum(age is not None and row["target_age"] > age for row in rows),
+        }
+
+    def _age_distribution(self, params: Dict[str, Any]) -> dict:
+        per_age = Counter(row["target_age"] for row in self._family(params["author_id_param"]))
+        ranges = {
+            "childhood": (0, 12), "teenage": (13, 19), "twenties": (20, 29), "thirties": (30, 39),
+            "forties": (40, 49), "fifties": (50, 59), "sixties_plus": (60, 10 ** 6),
+        }
+        return {
+            "age_distribution": {str(age): per_age[age] for age in sorted(per_age)},
+            "total_messages": sum(per_age.values()),
+            "age_ranges": {
+                name: sum(count for age, count in per_age.items() if low <= age <= high)
+                for name, (low, high) in ranges.items()
+            },
+        }
+
+    def _toggle_favorite(self, params: Dict[str, Any]) -> List[dict]:
+        toggled = []
+        for row in self._family(params["author_id_param"]):
+            if row["id"] == params["advice_id_param"]:
+                row["is_favorite"] = not row["is_favorite"]
+                toggled.append(dict(row))
+        self._touch("advices", toggled)
+        return toggled
+
+    def _search(self, params: Dict[str, Any]) -> List[dict]:
+        # 순위는 in-process 검색(search.py)과 같은 방식 (RPC와 동일하게 맞춰져 있음)
+        matches = NgramIndex(self._family(params["author_id_param"])).search(params["query_param"])
+        offset = params.get("offset_param", 0)
+        return [dict(row) for row in matches[offset:offset + params["limit_param"]]]
@@ -0,0 +1,224 @@
+"""API 부하 벤치마크 (메모리 Supabase 사용)
+
+main.supabase를 FakeSupabase로 바꾸고 시드 데이터를 채운 뒤, 시나리오를 동시에 실행해
+요청 이름별 req/s, p50/p95/p99 지연과 반복 1회당 메모리 할당량을 보고합니다.
+실제 Supabase에 접속하지 않으므로 main.py 변경 전후의 수치를 같은 조건에서 비교할 수 있습니다.
+
+    cd advice-backend && python -m benchmarks.load --scenario child-dashboard --advices 10,1000,100000
+    python -m benchmarks.load --scenario all --latency-ms 5 --concurrency 32 --json results.json
+
+시나리오
+- child-dashboard: 자녀 화면 로드 (GET /users/me, /advices?limit=50, /stats, /stats/age-distribution)
+- father-compose: 아버지가 사진을 올리고 조언 작성 (POST /upload-media → POST /advices)
+- login-burst: 여러 사용자의 동시 로그인 (POST /auth/login, bcrypt)
+"""
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import sys
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Awaitable, Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Supabase 클라이언트는 처음 사용할 때 만들어지고 아래에서 FakeSupabase로 바꾸므로 실제로 접속하지 않습니다.
+# 그래도 실수로 실제 클라이언트가 만들어지면 운영 프로젝트가 아닌 로컬 주소를 가리키도록 더미 값을 둡니다
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark.dummy.key")
+# 썸네일 생성 프로세스와 요청 로그는 측정 대상이 아니므로 기본으로 끕니다 (환경 변수로 다시 켤 수 있음)
+os.environ.setdefault("MEDIA_VARIANTS_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+# 모든 요청이 같은 클라이언트 주소에서 오므로 라우트별 요청 수 제한은 끕니다
+os.environ.setdefault("RATE_LIMITS", "")
+
+import httpx
+
+import main
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import PASSWORD, Family, seed_families
+
+SCENARIOS = ("child-dashboard", "father-compose", "login-burst")
+UPLOAD_BODY = os.urandom(64 * 1024)
+
+class Recorder:
+    """요청 이름별 지연 시간(초)을 모읍니다."""
+
+    def __init__(self):
+        self.latencies: Dict[str, List[float]] = defaultdict(list)
+        self.errors: Dict[str, int] = defaultdict(int)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str, **kwargs) -> httpx.Response:
+        started = time.perf_counter()
+        response = await client.request(method, url, **kwargs)
+        self.latencies[name].append(time.perf_counter() - started)
+        if response.status_code >= 400:
+            self.errors[name] += 1
+        return response
+
+def bearer(user_id: str) -> dict:
+    return {"Authorization": f"Bearer {main.create_access_token({'sub': user_id})}"}
+
+def make_scenario(name: str, families: List[Family]) -> Callable[[httpx.AsyncClient, Recorder, int], Awaitable[None]]:
+    children = [child_id for family in families for child_id in family.child_ids]
+    fathers = [family.father_id for family in families]
+    users = fathers + children
+    headers = {user_id: bearer(user_id) for user_id in users}
+
+    async def child_dashboard(client: httpx.AsyncClient, recorder: Recorder, iteration: int) -> None:
+        auth = headers[children[iteration % len(children)]]
+        await recorder.request(client, "GET /users/me", "GET", "/users/me", headers=auth)
+        await recorder.request(client, "GET /advices?limit=50", "GET", "/advices", params={"limit": 50}, headers=auth)
+        await recorder.request(client, "GET /stats", "GET", "/stats", headers=auth)
+        await recorder.request(client, "GET /stats/age-distribution", "GET", "/stats/age-distribution", headers=auth)
+
+    async def father_compose(client: httpx.AsyncClient, recorder: Recorder, iteration: int) -> None:
+        auth = headers[fathers[iteration % len(fathers)]]
+        uploaded = await recorder.request(
+            client, "POST /upload-media", "POST", "/upload-media",
+            files={"file": ("photo.jpg", UPLOAD_BODY, "image/jpeg")}, headers=auth,
+        )
+        media = uploaded.json() if uploaded.status_code == 200 else {}
+        await recorder.request(client, "POST /advices", "POST", "/advices", headers=auth, json={
+            "category": "life",
+            "target_age": iteration % 60,
+            "content": f"벤치마크 조언 {iteration}",
+            "media_url": media.get("url"),
+            "media_type": media.get("type"),
+        })
+
+    async def login_burst(client: httpx.AsyncClient, recorder: Recorder, iteration: int) -> None:
+        user_id = users[iteration % len(users)]
+        await recorder.request(client, "POST /auth/login", "POST", "/auth/login", json={"user_id": user_id, "password": PASSWORD})
+
+    return {"child-dashboard": child_dashboard, "father-compose": father_compose, "login-burst": login_burst}[name]
+
+async def run_iterations(client: httpx.AsyncClient, scenario, recorder: Recorder, iterations: int, concurrency: int) -> float:
+    """iterations번의 시나리오를 concurrency개의 작업자가 나눠 실행하고 걸린 시간(초)을 반환합니다."""
+    counter = iter(range(iterations))
+
+    async def worker() -> None:
+        for iteration in counter:
+            await scenario(client, recorder, iteration)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return time.perf_counter() - started
+
+def percentile(values: List[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))]
+
+async def measure_allocations(client: httpx.AsyncClient, scenario, iterations: int) -> dict:
+    """tracemalloc으로 시나리오 1회당 최대 할당량과 남은 메모리를 잽니다 (처리량 측정과 분리해 따로 실행)."""
+    tracemalloc.start()
+    try:
+        baseline, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        await run_iterations(client, scenario, Recorder(), iterations, 1)
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        "peak_kib": round((peak - baseline) / 1024, 1),
+        "retained_kib_per_iteration": round((current - baseline) / 1024 / iterations, 2),
+    }
+
+async def run_case(args: argparse.Namespace, scenario_name: str, advices: int, case_index: int) -> dict:
+    backend = FakeSupabase(latency=args.latency_ms / 1000)
+    main.supabase = backend
+    password_hash = main.pwd_context.hash(PASSWORD)
+    # 실행마다 사용자 ID를 바꿔 이전 실행의 사용자/목록/압축 캐시가 결과에 섞이지 않게 합니다
+    families = seed_families(
+        backend, password_hash, args.families, advices, args.children, args.seed, prefix=f"bench{case_index}"
+    )
+    scenario = make_scenario(scenario_name, families)
+
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+        await run_iterations(client, scenario, Recorder(), args.warmup, args.concurrency)
+        backend.calls.clear()
+        recorder = Recorder()
+        elapsed = await run_iterations(client, scenario, recorder, args.requests, args.concurrency)
+        upstream_calls = sum(backend.calls.values())
+        allocations = await measure_allocations(client, scenario, args.alloc_iterations) if args.alloc_iterations else None
+
+    total = sum(len(values) for values in recorder.latencies.values())
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    rows = {
+        name: {
+            "count": len(values),
+            "errors": recorder.errors[name],
+            "p50_ms": percentile(values, 0.50) * 1000,
+            "p95_ms": percentile(values, 0.95) * 1000,
+            "p99_ms": percentile(values, 0.99) * 1000,
+            "mean_ms": statistics.fmean(values) * 1000,
+        }
+        for name, values in recorder.latencies.items()
+    }
+    return {
+        "scenario": scenario_name,
+        "advices": advices,
+        "families": args.families,
+        "concurrency": args.concurrency,
+        "latency_ms": args.latency_ms,
+        "iterations": args.requests,
+        "elapsed_s": elapsed,
+        "requests_per_second": total / elapsed,
+        "p50_ms": percentile(all_latencies, 0.50) * 1000,
+        "p95_ms": percentile(all_latencies, 0.95) * 1000,
+        "p99_ms": percentile(all_latencies, 0.99) * 1000,
+        "upstream_calls_per_request": upstream_calls / total,
+        "requests": rows,
+        "allocations": allocations,
+    }
+
+def print_case(result: dict) -> None:
+    print(
+        f"\n[{result['scenario']}] advices={result['advices']} families={result['families']} "
+        f"concurrency={result['concurrency']} latency={result['latency_ms']}ms"
+    )
+    print(f"{'request':<30} {'count':>6} {'errors':>6} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+    for name, row in result["requests"].items():
+        print(f"{name:<30} {row['count']:>6} {row['errors']:>6} {row['p50_ms']:>8.2f} {row['p95_ms']:>8.2f} {row['p99_ms']:>8.2f}")
+    print(
+        f"{'total':<30} {sum(row['count'] for row in result['requests'].values()):>6} "
+        f"{sum(row['errors'] for row in result['requests'].values()):>6} "
+        f"{result['p50_ms']:>8.2f} {result['p95_ms']:>8.2f} {result['p99_ms']:>8.2f}"
+    )
+    print(f"throughput: {result['requests_per_second']:.1f} req/s, upstream calls/request: {result['upstream_calls_per_request']:.2f}")
+    if result["allocations"]:
+        allocations = result["allocations"]
+        print(f"allocations: peak {allocations['peak_kib']} KiB, retained {allocations['retained_kib_per_iteration']} KiB/iteration")
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scenario", choices=SCENARIOS + ("all",), default="all")
+    parser.add_argument("--advices", default="10,1000,100000", help="가족당 조언 수 (쉼표로 여러 값)")
+    parser.add_argument("--families", type=int, default=1)
+    parser.add_argument("--children", type=int, default=2, help="가족당 자녀 수")
+    parser.add_argument("--requests", type=int, default=200, help="측정할 시나리오 반복 횟수")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Supabase 호출마다 더할 지연")
+    parser.add_argument("--alloc-iterations", type=int, default=20, help="할당량 측정 반복 횟수 (0이면 생략)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", help="결과를 JSON으로 저장할 경로")
+    return parser.parse_args()
+
+async def run(args: argparse.Namespace) -> None:
+    scenarios = SCENARIOS if args.scenario == "all" else (args.scenario,)
+    results = []
+    for scenario_name in scenarios:
+        for advices in (int(value) for value in args.advices.split(",")):
+            result = await run_case(args, scenario_name, advices, len(results))
+            print_case(result)
+            results.append(result)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as output:
+            json.dump(results, output, ensure_ascii=False, indent=2)
+
+if __name__ == "__main__":
+    asyncio.run(run(parse_args()))
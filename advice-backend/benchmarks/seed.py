@@ -0,0 +1,85 @@
+"""벤치마크 데이터 시더
+
+FakeSupabase에 가족(아버지 1명 + 자녀 n명)과 조언을 API를 거치지 않고 바로 채웁니다.
+같은 seed 값이면 항상 같은 데이터가 만들어지므로 실행 간 수치를 비교할 수 있습니다.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import List
+
+from benchmarks.fake_supabase import FakeSupabase, timestamp
+
+PASSWORD = "benchmark-password"
+CATEGORIES = ("life", "study", "love", "money", "health", "career", "family", "friendship")
+SENTENCES = (
+    "아빠가 너에게 전하고 싶은 이야기가 있단다.",
+    "힘든 날에는 잠시 쉬어 가도 괜찮아.",
+    "돈보다 사람을 먼저 생각하렴.",
+    "매일 조금씩이라도 책을 읽는 습관을 들이렴.",
+    "실수는 배움의 시작이란다.",
+    "건강은 잃고 나서야 소중함을 알게 된단다.",
+    "좋은 친구 한 명이 백 명의 지인보다 낫다.",
+    "Always be kind, even when it is hard.",
+)
+EPOCH = datetime(2024, 1, 1, tzinfo=timezone.utc)
+
+@dataclass
+class Family:
+    father_id: str
+    child_ids: List[str]
+    advice_ids: List[str] = field(default_factory=list)
+
+def make_advice(rng: random.Random, author_id: str, index: int) -> dict:
+    created_at = timestamp(EPOCH + timedelta(minutes=index, microseconds=rng.randrange(1_000_000)))
+    return {
+        "id": str(uuid.UUID(int=rng.getrandbits(128), version=4)),
+        "author_id": author_id,
+        "category": rng.choice(CATEGORIES),
+        "target_age": rng.randrange(0, 61),
+        "content": " ".join(rng.choices(SENTENCES, k=rng.randint(1, 12))),
+        "media_url": None,
+        "media_type": None,
+        "media_variants": None,
+        "unlock_type": "age",
+        "password": None,
+        "is_read": rng.random() < 0.5,
+        "is_favorite": rng.random() < 0.1,
+        "created_at": created_at,
+        "updated_at": created_at,
+    }
+
+def seed_families(
+    backend: FakeSupabase,
+    password_hash: str,
+    families: int = 1,
+    advices_per_family: int = 1000,
+    children_per_family: int = 2,
+    seed: int = 0,
+    prefix: str = "bench",
+) -> List[Family]:
+    """가족 families개를 만들고 각 아버지에게 조언 advices_per_family개를 넣습니다.
+
+    모든 사용자의 비밀번호는 PASSWORD이며, 해시는 호출한 쪽에서 한 번만 계산해 넘깁니다.
+    사용자 ID는 prefix로 시작하므로 실행마다 prefix를 바꾸면 프로세스 내 캐시가 섞이지 않습니다.
+    """
+    rng = random.Random(seed)
+    created = []
+    for family_index in range(families):
+        father_id = f"{prefix}-father-{family_index}"
+        child_ids = [f"{prefix}-child-{family_index}-{child}" for child in range(children_per_family)]
+        now = timestamp(EPOCH)
+        users = [{
+            "id": father_id, "password_hash": password_hash, "user_type": "father", "name": father_id,
+            "father_id": None, "age": None, "created_at": now, "updated_at": now,
+        }]
+        users += [{
+            "id": child_id, "password_hash": password_hash, "user_type": "child", "name": child_id,
+            "father_id": father_id, "age": rng.randrange(5, 40), "created_at": now, "updated_at": now,
+        } for child_id in child_ids]
+        advices = [make_advice(rng, father_id, index) for index in range(advices_per_family)]
+        backend.load("users", users)
+        backend.load("advices", advices)
+        created.append(Family(father_id, child_ids, [advice["id"] for advice in advices]))
+    return created
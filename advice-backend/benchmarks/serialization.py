@@ -0,0 +1,78 @@
+"""조언 목록 직렬화 마이크로 벤치마크
+
+기존 경로(행마다 AdviceResponse 생성 → response_model 재검증 → 표준 json 인코더)와
+빠른 경로(한 번 검증 → orjson 직렬화)를 100 / 1,000 / 10,000개 조언으로 비교합니다.
+
+    cd advice-backend && python -m benchmarks.serialization
+"""
+import asyncio
+import os
+import sys
+import time
+from typing import List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# main 모듈은 import 시 Supabase 클라이언트를 만들므로 접속하지 않는 더미 값을 사용합니다
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark.dummy.key")
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from main import AdviceResponse
+from serialization import dump_models, json_response, validate_rows
+
+SIZES = (100, 1_000, 10_000)
+CONTENT = "아빠가 너에게 전하고 싶은 이야기가 있단다. " * 8
+
+def make_rows(count: int) -> List[dict]:
+    return [
+        {
+            "id": f"00000000-0000-0000-0000-{index:012d}",
+            "author_id": "father",
+            "category": "life",
+            "target_age": index % 60,
+            "content": CONTENT,
+            "media_url": None,
+            "media_type": None,
+            "media_variants": None,
+            "unlock_type": "age",
+            "password": None,
+            "is_read": index % 2 == 0,
+            "is_favorite": False,
+            "created_at": "2024-01-01T00:00:00+00:00",
+            "updated_at": "2024-01-01T00:00:00+00:00",
+        }
+        for index in range(count)
+    ]
+
+LIST_FIELD = create_response_field(name="Response_get_advices", type_=List[AdviceResponse])
+
+async def legacy_path(rows: List[dict]) -> bytes:
+    advices = [AdviceResponse(**row) for row in rows]
+    content = await serialize_response(field=LIST_FIELD, response_content=advices)
+    return JSONResponse(content).body
+
+async def fast_path(rows: List[dict]) -> bytes:
+    return json_response(dump_models(validate_rows(AdviceResponse, rows))).body
+
+async def measure(func, rows: List[dict], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func(rows)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+async def main() -> None:
+    print(f"{'advices':>8} {'legacy ms':>10} {'fast ms':>10} {'speedup':>8}")
+    for size in SIZES:
+        rows = make_rows(size)
+        repeat = max(3, 20_000 // size)
+        legacy = await measure(legacy_path, rows, repeat)
+        fast = await measure(fast_path, rows, repeat)
+        print(f"{size:>8} {legacy * 1000:>10.2f} {fast * 1000:>10.2f} {legacy / fast:>7.1f}x")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,76 @@
+"""서버 시작 시간 벤치마크 (import → lifespan 시작 → 첫 요청)
+
+새 파이썬 프로세스에서 main을 import하고 lifespan을 시작한 뒤 GET /readyz에 첫 응답이 올 때까지의
+구간별 시간을 여러 번 재서 중앙값과 최솟값을 보고합니다. Supabase에는 접속하지 않습니다.
+
+    cd advice-backend && python -m benchmarks.startup --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PHASES = ("interpreter_s", "import_s", "startup_s", "first_request_s", "total_s")
+
+def child() -> None:
+    """측정 대상 프로세스: 구간별 시간을 JSON 한 줄로 출력합니다."""
+    import asyncio
+
+    started = time.perf_counter()
+    import main
+    imported = time.perf_counter()
+
+    import httpx
+
+    async def run() -> dict:
+        async with main.app.router.lifespan_context(main.app):
+            ready = time.perf_counter()
+            transport = httpx.ASGITransport(app=main.app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://benchmark") as client:
+                response = await client.get("/readyz")
+            answered = time.perf_counter()
+        if response.status_code != 200:
+            raise SystemExit(f"/readyz returned {response.status_code}")
+        return {"import_s": imported - started, "startup_s": ready - imported, "first_request_s": answered - ready}
+
+    print(json.dumps(asyncio.run(run())), flush=True)
+
+def measure_once() -> dict:
+    env = dict(os.environ)
+    # 접속하지 않는 더미 값과 로그 최소화
+    env.setdefault("SUPABASE_URL", "http://localhost:54321")
+    env.setdefault("SUPABASE_SERVICE_ROLE_KEY", "benchmark.dummy.key")
+    env.setdefault("LOG_LEVEL", "WARNING")
+    launched = time.perf_counter()
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.startup", "--child"],
+        cwd=BACKEND_DIR, env=env, check=True, capture_output=True, text=True,
+    ).stdout
+    total = time.perf_counter() - launched
+    result = json.loads(output.strip().splitlines()[-1])
+    result["total_s"] = total
+    # 인터프리터 시작과 프로세스 종료 등 나머지 시간
+    result["interpreter_s"] = total - result["import_s"] - result["startup_s"] - result["first_request_s"]
+    return result
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        child()
+        return
+
+    results = [measure_once() for _ in range(args.runs)]
+    print(f"{'phase':<16} {'median ms':>10} {'min ms':>10}")
+    for phase in PHASES:
+        values = [result[phase] for result in results]
+        print(f"{phase:<16} {statistics.median(values) * 1000:>10.1f} {min(values) * 1000:>10.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from metrics import CACHE_EVICTIONS, CACHE_LOOKUPS
+
+class TTLCache:
+    """TTL과 최대 크기(LRU 제거)를 가진 프로세스 내 캐시입니다.
+
+    name을 주면 적중/실패/축출 횟수를 Prometheus 지표(advice_cache_*{cache=name})로도 기록합니다.
+    """
+
+    def __init__(self, max_size: int, ttl_seconds: float, name: Optional[str] = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Hashable, tuple[float, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._metrics = (
+            (CACHE_LOOKUPS.labels(name, "hit"), CACHE_LOOKUPS.labels(name, "miss"), CACHE_EVICTIONS.labels(name))
+            if name else None
+        )
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        entry = self._data.get(key)
+        if entry is None:
+            self._miss()
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._data[key]
+            self._miss()
+            return None
+        self._data.move_to_end(key)
+        self.hits += 1
+        if self._metrics:
+            self._metrics[0].inc()
+        return value
+
+    def _miss(self) -> None:
+        self.misses += 1
+        if self._metrics:
+            self._metrics[1].inc()
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.max_size <= 0:
+            return
+        self._data[key] = (time.monotonic() + self.ttl_seconds, value)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_size:
+            self._data.popitem(last=False)
+            self.evictions += 1
+            if self._metrics:
+                self._metrics[2].inc()
+
+    def invalidate(self, key: Hashable) -> None:
+        self._data.pop(key, None)
+
+    def invalidate_matching(self, predicate: Callable[[Hashable], bool]) -> int:
+        """predicate(key)가 참인 항목을 모두 제거하고 제거한 개수를 반환합니다."""
+        keys = [key for key in self._data if predicate(key)]
+        for key in keys:
+            del self._data[key]
+        return len(keys)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def stats(self) -> dict:
+        return {
+            "size": len(self._data),
+            "max_size": self.max_size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_ratio": self.hits / (self.hits + self.misses) if self.hits + self.misses else 0.0,
+        }
@@ -0,0 +1,132 @@
+import gzip
+from typing import Optional
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from cache import TTLCache
+
+try:
+    import brotli
+except ImportError:  # Brotli가 없으면 gzip만 사용
+    brotli = None
+
+# 응답 압축 (Brotli / gzip)
+# JSON·텍스트처럼 압축 효과가 큰 응답만 minimum_size 이상일 때 압축하고, 이미 압축된 이미지/영상 등은 그대로 보냅니다.
+# ETag가 있는 응답은 (ETag, 인코딩) 기준으로 압축 결과를 캐시해 같은 본문을 반복해서 압축하지 않습니다.
+
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/javascript", "application/xml", "image/svg+xml")
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Accept-Encoding에서 사용할 인코딩을 고릅니다 (br 우선, q=0은 제외)."""
+    accepted = {}
+    for item in accept_encoding.lower().split(","):
+        name, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if name:
+            accepted[name] = quality
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if accepted.get(encoding, accepted.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+def is_compressible(headers: Headers) -> bool:
+    if "content-encoding" in headers:
+        return False
+    content_type = headers.get("content-type", "").lower()
+    return content_type.startswith(COMPRESSIBLE_TYPES)
+
+class CompressionMiddleware:
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = 1024,
+        gzip_level: int = 6,
+        brotli_quality: int = 5,
+        cache_size: int = 256,
+        cache_ttl_seconds: float = 300,
+    ) -> None:
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.cache = TTLCache(max_size=cache_size, ttl_seconds=cache_ttl_seconds)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        await _CompressionResponder(self, encoding, send).run(scope, receive)
+
+    def compress(self, body: bytes, encoding: str, etag: Optional[str]) -> bytes:
+        key = (etag, encoding, len(body)) if etag else None
+        if key is not None:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return cached
+        if encoding == "br":
+            compressed = brotli.compress(body, quality=self.brotli_quality)
+        else:
+            compressed = gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+        if key is not None:
+            self.cache.set(key, compressed)
+        return compressed
+
+class _CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send) -> None:
+        self.middleware = middleware
+        self.encoding = encoding
+        self.send = send
+        self.start_message: Optional[Message] = None
+        self.passthrough = False
+
+    async def run(self, scope: Scope, receive: Receive) -> None:
+        await self.middleware.app(scope, receive, self.send_wrapper)
+
+    async def send_wrapper(self, message: Message) -> None:
+        if self.passthrough:
+            await self.send(message)
+            return
+
+        if message["type"] == "http.response.start":
+            # 본문을 보기 전까지 헤더 전송을 미룹니다
+            self.start_message = message
+            return
+
+        if message["type"] != "http.response.body":
+            await self.send(message)
+            return
+
+        body = message.get("body", b"")
+        headers = MutableHeaders(raw=self.start_message["headers"])
+        if self.start_message["status"] == 304:
+            # 304에도 200 응답에 붙였을 Vary를 그대로 보내야 캐시가 인코딩별 응답을 구분합니다
+            headers.add_vary_header("Accept-Encoding")
+        if (
+            message.get("more_body", False)  # 스트리밍 응답은 그대로 전달
+            or len(body) < self.middleware.minimum_size
+            or not is_compressible(headers)
+        ):
+            self.passthrough = True
+            await self.send(self.start_message)
+            await self.send(message)
+            return
+
+        compressed = self.middleware.compress(body, self.encoding, headers.get("etag"))
+        headers["Content-Encoding"] = self.encoding
+        headers["Content-Length"] = str(len(compressed))
+        headers.add_vary_header("Accept-Encoding")
+        await self.send(self.start_message)
+        await self.send({"type": "http.response.body", "body": compressed})
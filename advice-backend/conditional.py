@@ -0,0 +1,60 @@
+import hashlib
+from dataclasses import dataclass
+from datetime import datetime
+from email.utils import format_datetime
+from typing import Any, Optional
+
+from fastapi import Request, Response
+
+# 조건부 응답 (ETag / If-None-Match)
+# 가족별 버전(advice_family_versions.version)과 요청 범위(경로, 쿼리, 사용자)를 묶어 ETag를 만들고,
+# 클라이언트가 보낸 If-None-Match와 같으면 본문을 조회/직렬화하지 않고 304로 응답합니다.
+
+@dataclass
+class Validator:
+    etag: str
+    last_modified: Optional[datetime] = None
+    version: Optional[int] = None
+
+    def headers(self) -> dict:
+        headers = {
+            "ETag": self.etag,
+            # 캐시는 하되 매번 서버에 재검증 (사용자별 응답이므로 private)
+            "Cache-Control": "private, no-cache",
+            "Vary": "Authorization",
+        }
+        if self.last_modified is not None:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+        return headers
+
+def make_validator(request: Request, version: int, last_modified: Optional[datetime], *scope: Any) -> Validator:
+    """가족 버전과 요청 범위로 약한 ETag를 만듭니다."""
+    query = "&".join(sorted(f"{key}={value}" for key, value in request.query_params.multi_items()))
+    raw = "|".join([str(version), request.url.path, query, *(str(part) for part in scope)])
+    digest = hashlib.sha1(raw.encode()).hexdigest()[:20]
+    return Validator(etag=f'W/"{digest}"', last_modified=last_modified, version=version)
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match 헤더가 etag와 일치하는지 약한 비교로 확인합니다."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+def not_modified(request: Request, validator: Validator) -> Optional[Response]:
+    """If-None-Match가 일치하면 304 응답을, 아니면 None을 반환합니다."""
+    if etag_matches(request.headers.get("if-none-match"), validator.etag):
+        return Response(status_code=304, headers=validator.headers())
+    return None
+
+def apply_validator(response: Response, validator: Validator) -> None:
+    for key, value in validator.headers().items():
+        response.headers[key] = value
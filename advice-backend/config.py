@@ -11,5 +11,58 @@ class Settings:
     DATABASE_URL: str = os.getenv("DATABASE_URL")
     API_URL: str = os.getenv("API_URL", "https://advice-production-d210.up.railway.app")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
+    SUPABASE_MAX_WORKERS: int = int(os.getenv("SUPABASE_MAX_WORKERS", "16"))  # Supabase 호출용 스레드 수
+    USER_CACHE_TTL_SECONDS: float = float(os.getenv("USER_CACHE_TTL_SECONDS", "60"))
+    USER_CACHE_MAX_SIZE: int = int(os.getenv("USER_CACHE_MAX_SIZE", "1024"))
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", "12"))  # bcrypt cost (4-31)
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", "2"))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "32"))  # 초과 시 503
+    LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
+    LOG_LEVELS: str = os.getenv("LOG_LEVELS", "httpx=WARNING")  # 모듈별 레벨, 예: "advice.api=DEBUG,advice.db=WARNING"
+    LOG_DEBUG_SAMPLE_RATE: float = float(os.getenv("LOG_DEBUG_SAMPLE_RATE", "0.01"))  # 디버그 페이로드 샘플링 비율
+    MAX_UPLOAD_BYTES: int = int(os.getenv("MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", str(1024 * 1024)))  # 썸네일 작업용 업로드 파일 복사 청크 크기
+    RESUMABLE_UPLOAD_CHUNK_SIZE: int = int(os.getenv("RESUMABLE_UPLOAD_CHUNK_SIZE", str(5 * 1024 * 1024)))
+    MAX_RESUMABLE_UPLOAD_BYTES: int = int(os.getenv("MAX_RESUMABLE_UPLOAD_BYTES", str(200 * 1024 * 1024)))
+    RESUMABLE_UPLOAD_EXPIRE_HOURS: int = int(os.getenv("RESUMABLE_UPLOAD_EXPIRE_HOURS", "24"))
+    MEDIA_VARIANTS_ENABLED: bool = os.getenv("MEDIA_VARIANTS_ENABLED", "true").lower() == "true"
+    MEDIA_WORKERS: int = int(os.getenv("MEDIA_WORKERS", "1"))  # 썸네일 생성 프로세스 수
+    MEDIA_VARIANT_WIDTHS: str = os.getenv("MEDIA_VARIANT_WIDTHS", "320,640,1280")  # WebP 변형 너비(px)
+    MEDIA_VARIANT_QUALITY: int = int(os.getenv("MEDIA_VARIANT_QUALITY", "80"))
+    BATCH_MAX_ITEMS: int = int(os.getenv("BATCH_MAX_ITEMS", "1000"))  # 일괄 요청 한 번의 최대 항목 수
+    BATCH_WRITE_SIZE: int = int(os.getenv("BATCH_WRITE_SIZE", "200"))  # INSERT/UPDATE 한 번에 보낼 행 수
+    BATCH_IMPORT_MAX_BYTES: int = int(os.getenv("BATCH_IMPORT_MAX_BYTES", str(5 * 1024 * 1024)))
+    COMPRESSION_MIN_SIZE: int = int(os.getenv("COMPRESSION_MIN_SIZE", "1024"))  # 이보다 작은 응답은 압축하지 않음
+    GZIP_LEVEL: int = int(os.getenv("GZIP_LEVEL", "6"))  # 1-9
+    BROTLI_QUALITY: int = int(os.getenv("BROTLI_QUALITY", "5"))  # 0-11
+    COMPRESSION_CACHE_SIZE: int = int(os.getenv("COMPRESSION_CACHE_SIZE", "256"))  # ETag별 압축 결과 캐시 항목 수
+    ADVICE_CACHE_MAX_SIZE: int = int(os.getenv("ADVICE_CACHE_MAX_SIZE", "2048"))  # 가족별 조언 목록 캐시 항목 수 (0이면 비활성화)
+    ADVICE_CACHE_TTL_SECONDS: float = float(os.getenv("ADVICE_CACHE_TTL_SECONDS", "300"))
+    ADVICE_CACHE_URL: str = os.getenv("ADVICE_CACHE_URL", "")  # redis://... 지정 시 Redis 백엔드 사용
+    EVENTS_BROKER_URL: str = os.getenv("EVENTS_BROKER_URL", "")  # redis://... 지정 시 Redis pub/sub으로 워커 간 이벤트 전달
+    EVENTS_QUEUE_SIZE: int = int(os.getenv("EVENTS_QUEUE_SIZE", "100"))  # 구독자별 대기 이벤트 수 (초과 시 resync)
+    SSE_HEARTBEAT_SECONDS: float = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+    SSE_RETRY_MILLISECONDS: int = int(os.getenv("SSE_RETRY_MILLISECONDS", "3000"))
+    SEARCH_BACKEND: str = os.getenv("SEARCH_BACKEND", "postgres")  # postgres(search_advices RPC) 또는 memory(n-gram 색인)
+    QUERY_COUNT_HEADER: bool = os.getenv("QUERY_COUNT_HEADER", "false").lower() == "true"  # 응답에 X-Query-Count 헤더 추가
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "none")  # none, file, console, otlp
+    TRACE_FILE: str = os.getenv("TRACE_FILE", "traces.jsonl")  # TRACE_EXPORTER=file일 때 스팬을 기록할 파일
+    TRACE_SERVICE_NAME: str = os.getenv("TRACE_SERVICE_NAME", "advice-backend")
+    SLOW_CALL_MS: float = float(os.getenv("SLOW_CALL_MS", "500"))  # 이보다 오래 걸린 Supabase 호출은 경고 로그
+    WEB_CONCURRENCY: int = int(os.getenv("WEB_CONCURRENCY", "1"))  # 워커 프로세스 수 (gunicorn.conf.py)
+    RATE_LIMITS: str = os.getenv(
+        "RATE_LIMITS",
+        "POST /auth/login=ip:10/m;POST /auth/register=ip:5/m;POST /upload-media=user:30/m,ip:60/m;GET /advices=user:120/m,ip:600/m"
+    )  # 라우트별 토큰 버킷 (ratelimit.py 참고), 빈 값이면 비활성화
+    RATE_LIMIT_URL: str = os.getenv("RATE_LIMIT_URL", "")  # Redis 주소, 지정하면 모든 워커가 같은 버킷 사용
+    RATE_LIMIT_MAX_KEYS: int = int(os.getenv("RATE_LIMIT_MAX_KEYS", "10000"))  # 프로세스 내 버킷 수
+    TRUSTED_PROXY_HOPS: int = int(os.getenv("TRUSTED_PROXY_HOPS", "1"))  # 앞단 프록시 수, X-Forwarded-For의 오른쪽에서 이 번째 주소를 IP로 사용 (0이면 무시)
+    MAX_CONCURRENT_REQUESTS: int = int(os.getenv("MAX_CONCURRENT_REQUESTS", "200"))  # 워커당 동시 처리 요청 수, 0이면 비활성화
+    REQUEST_QUEUE_SIZE: int = int(os.getenv("REQUEST_QUEUE_SIZE", "100"))  # 초과 시 503
+    REQUEST_QUEUE_TIMEOUT_MS: float = float(os.getenv("REQUEST_QUEUE_TIMEOUT_MS", "1000"))  # 대기열에서 기다리는 최대 시간
+    ADVICES_PAGE_SIZE: int = int(os.getenv("ADVICES_PAGE_SIZE", "50"))
+    ADVICES_MAX_PAGE_SIZE: int = int(os.getenv("ADVICES_MAX_PAGE_SIZE", "200"))
+    # true면 limit/cursor 없는 GET /advices 요청에 기존처럼 전체 목록을 반환합니다
+    ADVICES_UNPAGINATED_COMPAT: bool = os.getenv("ADVICES_UNPAGINATED_COMPAT", "true").lower() == "true"
 
 settings = Settings() 
\ No newline at end of file
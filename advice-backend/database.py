@@ -0,0 +1,109 @@
+import asyncio
+import contextvars
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Optional
+
+from config import settings
+from metrics import SINGLEFLIGHT_SHARED, observe_upstream
+from singleflight import SingleFlight
+from tracing import upstream_span
+
+# Supabase 클라이언트(postgrest / storage3)는 동기 httpx 기반이므로
+# 전용 스레드 풀에서 실행해 이벤트 루프가 막히지 않도록 합니다.
+# 클라이언트 내부의 httpx.Client 커넥션 풀은 모든 워커 스레드가 공유합니다.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.SUPABASE_MAX_WORKERS,
+    thread_name_prefix="supabase",
+)
+
+class LazyClient:
+    """처음 사용할 때 클라이언트를 만드는 프록시
+
+    모듈을 import할 때는 커넥션 풀을 만들지 않으므로, gunicorn --preload로 앱을 미리 불러온 뒤
+    fork된 각 워커가 자기 클라이언트를 갖게 됩니다. lifespan에서 connect()로 미리 만들어 둘 수 있습니다.
+    """
+
+    def __init__(self, factory: Callable[[], Any]):
+        self._factory = factory
+        self._client: Optional[Any] = None
+        self._lock = threading.Lock()
+
+    @property
+    def connected(self) -> bool:
+        return self._client is not None
+
+    def connect(self) -> Any:
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    self._client = self._factory()
+        return self._client
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.connect(), name)
+
+_OPERATIONS = {"GET": "select", "POST": "insert", "PATCH": "update", "DELETE": "delete"}
+
+def describe_query(query: Any) -> tuple:
+    """PostgREST 쿼리 빌더에서 지표 라벨 (서비스, 테이블/RPC 이름, 동작)을 추출합니다."""
+    path = getattr(query, "path", "") or ""
+    if path.startswith("/rpc/"):
+        return "rpc", path[len("/rpc/"):], "call"
+    operation = _OPERATIONS.get(getattr(query, "http_method", None), "unknown")
+    if operation == "insert" and "merge-duplicates" in str(getattr(query, "headers", {}).get("Prefer", "")):
+        operation = "upsert"
+    return "postgrest", path.lstrip("/") or "unknown", operation
+
+def describe_call(func: Callable[..., Any]) -> tuple:
+    """run_sync로 실행하는 호출(주로 Storage 버킷 메서드)의 지표 라벨을 만듭니다."""
+    bucket = getattr(getattr(func, "__self__", None), "id", None)
+    if bucket is not None:
+        return "storage", bucket, func.__name__
+    return "call", getattr(func, "__qualname__", "unknown"), "call"
+
+async def _run(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+async def run_sync(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """동기 Supabase 호출을 스레드 풀에서 실행하고 결과를 기다립니다."""
+    labels = describe_call(func)
+    with observe_upstream(*labels), upstream_span(*labels):
+        return await _run(func, *args, **kwargs)
+
+class QueryCounter:
+    """한 요청에서 실행한 DB 쿼리 수"""
+
+    def __init__(self):
+        self.count = 0
+
+# 현재 요청의 쿼리 카운터 (미들웨어에서 설정)
+query_counter_var: contextvars.ContextVar[Optional[QueryCounter]] = contextvars.ContextVar("query_counter", default=None)
+
+async def execute(query: Any) -> Any:
+    """PostgREST 쿼리 빌더의 execute()를 비동기로 실행합니다."""
+    counter = query_counter_var.get()
+    if counter is not None:
+        counter.count += 1
+    labels = describe_query(query)
+    with observe_upstream(*labels), upstream_span(*labels, filters=str(getattr(query, "params", ""))) as call:
+        response = await _run(query.execute)
+        data = getattr(response, "data", None)
+        if isinstance(data, list):
+            call.set_rows(len(data))
+        return response
+
+# 동시에 들어온 같은 조회는 하나의 호출로 합칩니다 (singleflight.py 참고)
+_inflight = SingleFlight(shared_counter=SINGLEFLIGHT_SHARED)
+
+async def execute_shared(key: Hashable, query: Any) -> Any:
+    """key가 같은 조회가 이미 실행 중이면 새로 실행하지 않고 그 결과를 함께 기다립니다.
+
+    key에는 결과를 결정하는 값(테이블/RPC, 필터, 가족 버전 등)을 모두 포함해야 합니다.
+    """
+    return await _inflight.do(key, lambda: execute(query))
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False)
@@ -0,0 +1,146 @@
+import asyncio
+import logging
+from typing import Any, Dict, Optional, Set
+
+import orjson
+
+from config import settings
+
+logger = logging.getLogger("advice.events")
+
+# 가족별 실시간 이벤트 (Server-Sent Events)
+# 조언 변경 API가 publish()로 가족 채널(author_id)에 이벤트를 보내면 GET /events를 구독 중인
+# 아버지/자녀 클라이언트에게 그대로 전달됩니다. 기본 브로커는 프로세스 내 pub/sub이며,
+# 여러 워커로 실행할 때는 EVENTS_BROKER_URL로 Redis pub/sub 브로커를 사용합니다.
+
+# 사용자 행 변경 알림 채널 (워커별 사용자 캐시 무효화용, 메시지는 사용자 ID)
+USER_CHANGES_CHANNEL = "users:changed"
+
+# 구독자 큐가 가득 차면 밀린 이벤트를 버리고 전체 목록을 다시 불러오라는 이벤트를 보냅니다
+RESYNC_EVENT = b"event: resync\ndata: {}\n\n"
+
+def format_event(event: str, data: Dict[str, Any]) -> bytes:
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+def channel_name(author_id: str) -> str:
+    return f"family:{author_id}"
+
+class LocalSubscription:
+    def __init__(self, broker: "LocalBroker", channel: str, queue_size: int):
+        self.broker = broker
+        self.channel = channel
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+    def deliver(self, message: bytes) -> None:
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait(RESYNC_EVENT)
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        """다음 이벤트를 기다립니다. timeout 동안 없으면 None을 반환합니다."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+class LocalBroker:
+    """프로세스 내 pub/sub 브로커"""
+
+    def __init__(self, queue_size: int):
+        self.queue_size = queue_size
+        self._subscribers: Dict[str, Set[LocalSubscription]] = {}
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        for subscription in list(self._subscribers.get(channel, ())):
+            subscription.deliver(message)
+
+    async def subscribe(self, channel: str) -> LocalSubscription:
+        subscription = LocalSubscription(self, channel, self.queue_size)
+        self._subscribers.setdefault(channel, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: LocalSubscription) -> None:
+        subscribers = self._subscribers.get(subscription.channel)
+        if subscribers is not None:
+            subscribers.discard(subscription)
+            if not subscribers:
+                del self._subscribers[subscription.channel]
+
+    def stats(self) -> dict:
+        return {"broker": "local", "channels": len(self._subscribers), "subscribers": sum(map(len, self._subscribers.values()))}
+
+class RedisSubscription:
+    def __init__(self, pubsub: Any):
+        self.pubsub = pubsub
+
+    async def get(self, timeout: float) -> Optional[bytes]:
+        message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=timeout)
+        return message["data"] if message else None
+
+    async def close(self) -> None:
+        await self.pubsub.unsubscribe()
+        await self.pubsub.close()
+
+class RedisBroker:
+    """Redis pub/sub 브로커 (redis.asyncio.Redis 호환 클라이언트)"""
+
+    def __init__(self, client: Any):
+        self.client = client
+
+    async def publish(self, channel: str, message: bytes) -> None:
+        await self.client.publish(channel, message)
+
+    async def subscribe(self, channel: str) -> RedisSubscription:
+        pubsub = self.client.pubsub()
+        await pubsub.subscribe(channel)
+        return RedisSubscription(pubsub)
+
+    def stats(self) -> dict:
+        return {"broker": "redis"}
+
+class EventHub:
+    def __init__(self, broker):
+        self.broker = broker
+
+    async def publish(self, author_id: Optional[str], event: str, data: Dict[str, Any]) -> None:
+        """가족 채널에 이벤트를 보냅니다. 전송 실패는 기록만 하고 요청은 계속 처리합니다."""
+        if not author_id:
+            return
+        try:
+            await self.broker.publish(channel_name(author_id), format_event(event, data))
+        except Exception:
+            logger.warning("event publish failed", exc_info=True, extra={"event": event})
+
+    async def subscribe(self, author_id: str):
+        return await self.broker.subscribe(channel_name(author_id))
+
+    @property
+    def shared(self) -> bool:
+        """다른 워커에도 이벤트가 전달되는 브로커인지 여부"""
+        return isinstance(self.broker, RedisBroker)
+
+    async def publish_user_changed(self, user_id: str) -> None:
+        """사용자 행이 바뀌었음을 모든 워커에 알립니다. 전송 실패는 기록만 합니다."""
+        try:
+            await self.broker.publish(USER_CHANGES_CHANNEL, user_id.encode())
+        except Exception:
+            logger.warning("user change publish failed", exc_info=True)
+
+    async def subscribe_user_changes(self):
+        return await self.broker.subscribe(USER_CHANGES_CHANNEL)
+
+    def stats(self) -> dict:
+        return self.broker.stats()
+
+def create_event_hub() -> EventHub:
+    if settings.EVENTS_BROKER_URL:
+        import redis.asyncio as redis
+
+        return EventHub(RedisBroker(redis.Redis.from_url(settings.EVENTS_BROKER_URL)))
+    return EventHub(LocalBroker(settings.EVENTS_QUEUE_SIZE))
@@ -0,0 +1,31 @@
+import os
+
+from config import settings
+
+# 운영 서버 설정: gunicorn -c gunicorn.conf.py main:app
+# 마스터 프로세스가 앱을 한 번 불러온 뒤(preload) 워커를 fork하므로, 워커마다 모듈을 다시 import하지 않고
+# 메모리도 copy-on-write로 공유합니다. Supabase 클라이언트, 로그 리스너, 추적 스레드는 각 워커의 lifespan에서 만들어집니다.
+# 워커마다 프로세스 내 캐시와 SSE 브로커가 따로 있으므로 여러 워커로 실행할 때는
+# EVENTS_BROKER_URL(필수)과 ADVICE_CACHE_URL, RATE_LIMIT_URL, PROMETHEUS_MULTIPROC_DIR을 함께 지정하세요.
+# EVENTS_BROKER_URL이 없으면 사용자 캐시를 워커 간에 무효화할 수 없으므로 사용자 캐시가 꺼집니다 (main.user_cache).
+
+bind = f"0.0.0.0:{os.environ.get('PORT', '8080')}"
+workers = settings.WEB_CONCURRENCY
+worker_class = "uvicorn.workers.UvicornWorker"
+preload_app = True
+# SSE 연결과 긴 업로드가 있으므로 종료 시 진행 중인 요청을 기다립니다
+graceful_timeout = 30
+timeout = 60
+keepalive = 5
+accesslog = None
+# "*"로 두면 uvicorn이 X-Forwarded-For의 맨 왼쪽(클라이언트가 조작할 수 있는) 주소를 쓰므로 로컬 프록시만 신뢰합니다.
+# Railway 프록시 뒤의 클라이언트 주소는 TRUSTED_PROXY_HOPS로 오른쪽에서부터 골라냅니다 (ratelimit.client_ip).
+# FORWARDED_ALLOW_IPS를 실제 프록시 주소로 지정하면 uvicorn이 주소를 바꿔 주므로 TRUSTED_PROXY_HOPS=0으로 두세요.
+forwarded_allow_ips = os.environ.get("FORWARDED_ALLOW_IPS", "127.0.0.1")
+
+def child_exit(server, worker):
+    # 종료된 워커의 지표 파일 정리 (PROMETHEUS_MULTIPROC_DIR 사용 시)
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
@@ -0,0 +1,42 @@
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+
+from config import settings
+from metrics import PASSWORD_HASH_REJECTED, observe_password_hash
+
+# bcrypt는 해시 계산 중 GIL을 해제하므로 스레드 풀로도 여러 코어를 활용할 수 있습니다.
+# 이벤트 루프와 Supabase 스레드 풀을 막지 않도록 전용 풀을 사용합니다.
+_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="bcrypt",
+)
+_max_pending = settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE
+_pending = 0
+
+async def run_hashing(func: Callable[..., Any], *args: Any) -> Any:
+    """비밀번호 해시 작업을 전용 풀에서 실행합니다. 대기열이 가득 차면 503을 반환합니다."""
+    global _pending
+    if _pending >= _max_pending:
+        PASSWORD_HASH_REJECTED.inc()
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="요청이 많아 잠시 후 다시 시도해주세요",
+            headers={"Retry-After": "1"},
+        )
+    _pending += 1
+    try:
+        loop = asyncio.get_running_loop()
+        with observe_password_hash(func.__name__):
+            return await loop.run_in_executor(_executor, functools.partial(func, *args))
+    finally:
+        _pending -= 1
+
+def pending() -> int:
+    return _pending
+
+def shutdown() -> None:
+    _executor.shutdown(wait=False)
@@ -0,0 +1,103 @@
+import contextvars
+import copy
+import json
+import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+from config import settings
+
+# 현재 요청의 ID (미들웨어에서 설정)
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+
+# LogRecord의 기본 속성 (이 외의 속성은 extra 필드로 JSON에 포함)
+_RESERVED_ATTRS = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "request_id"}
+
+_listener: Optional[QueueListener] = None
+_listener_pid: Optional[int] = None
+
+class JsonFormatter(logging.Formatter):
+    """LogRecord를 한 줄짜리 JSON으로 직렬화합니다."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "request_id": getattr(record, "request_id", None),
+        }
+        for key, value in vars(record).items():
+            if key not in _RESERVED_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+class _RequestQueueHandler(QueueHandler):
+    """호출 스레드에서는 메시지 조립과 요청 ID 기록만 하고, 직렬화/출력은 리스너 스레드에 맡깁니다."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        record.request_id = request_id_var.get()
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+def _parse_module_levels(spec: str) -> dict:
+    """'advice.db=DEBUG,uvicorn.access=WARNING' 형식의 모듈별 로그 레벨을 파싱합니다."""
+    levels = {}
+    for item in spec.split(","):
+        if "=" not in item:
+            continue
+        name, level = item.split("=", 1)
+        levels[name.strip()] = level.strip().upper()
+    return levels
+
+def setup_logging() -> None:
+    """루트 로거에 큐 핸들러를 연결하고 백그라운드 리스너를 시작합니다.
+
+    fork된 워커에는 부모의 리스너 스레드가 없으므로, 프로세스가 바뀌었으면 새로 시작합니다.
+    """
+    global _listener, _listener_pid
+    if _listener is not None and _listener_pid == os.getpid():
+        return
+
+    log_queue: queue.SimpleQueue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(JsonFormatter())
+
+    root = logging.getLogger()
+    root.handlers = [_RequestQueueHandler(log_queue)]
+    root.setLevel(settings.LOG_LEVEL.upper())
+    for name, level in _parse_module_levels(settings.LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    _listener_pid = os.getpid()
+
+def shutdown_logging() -> None:
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def debug_sampled(logger: logging.Logger, message: str, **fields: Any) -> None:
+    """큰 디버그 페이로드를 LOG_DEBUG_SAMPLE_RATE 비율로만 기록합니다.
+
+    DEBUG가 비활성화된 운영 환경에서는 레벨 확인 한 번으로 끝납니다.
+    """
+    if not logger.isEnabledFor(logging.DEBUG):
+        return
+    if random.random() >= settings.LOG_DEBUG_SAMPLE_RATE:
+        return
+    logger.debug(message, extra=fields)
@@ -1,55 +1,195 @@
-from fastapi import FastAPI, HTTPException, Depends, status, Request, UploadFile, File, Form
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, FastAPI, HTTPException, Depends, status, Request, Response, UploadFile, File, Form, Query, BackgroundTasks
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel
-from typing import List, Optional
+from fastapi.concurrency import run_in_threadpool
+from pydantic import BaseModel, ValidationError
+from typing import Any, Dict, List, Optional, Union
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+import json
+import logging
 import os
 import uuid
+from io import BufferedReader
 from datetime import datetime, timedelta
 from jose import JWTError, jwt
 from passlib.context import CryptContext
 from supabase import create_client, Client
-from dotenv import load_dotenv
 from config import settings
+import batch
+from advice_cache import create_advice_list_cache
+from cache import TTLCache
+from compression import CompressionMiddleware
+from conditional import Validator, apply_validator, make_validator, not_modified
+from database import LazyClient, QueryCounter, execute, execute_shared, query_counter_var, run_sync, shutdown as shutdown_database
+from events import create_event_hub
+from hashing import run_hashing, shutdown as shutdown_hashing
+from logging_config import debug_sampled, request_id_var, setup_logging, shutdown_logging
+from metrics import EVENT_SUBSCRIBERS, MetricsMiddleware, UPLOAD_BYTES, render_latest
+from media import MEDIA_BUCKET, UploadLimitMiddleware, normalize_media_url, spool_copy, spool_stream, storage_reader, upload_too_large
+from media_variants import render_variants, shutdown as shutdown_media_variants
+from ratelimit import AdmissionControlMiddleware, create_concurrency_limiter, create_rate_limiter
+from repository import Repository
+import resumable
+from search import NgramIndex
+from serialization import dump_models, json_response, validate_rows
+from tracing import TracingMiddleware, setup_tracing, shutdown_tracing, span
 
-load_dotenv()
+setup_logging()
+logger = logging.getLogger("advice.api")
 
-app = FastAPI(
-    title="애비의 조언 API",
-    description="미래의 나, 그리고 우리 아이를 위한 특별한 메시지 API",
-    version="1.0.0"
-)
+# 라우트는 router에 등록하고, 앱 생성(미들웨어, 수명 주기)은 create_app()에서 합니다
+router = APIRouter()
 
-# CORS 설정
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://127.0.0.1:3000",
-        "https://advice-app-frontend.vercel.app",
-        "https://mmo-production-34bc.up.railway.app",
-        "https://advice-production-d210.up.railway.app",
-        "*"  # 모든 origin 허용 (개발용)
-    ],
-    allow_origin_regex="https://.*\\.up\\.railway\\.app",
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 워커 프로세스마다 실행됩니다 (gunicorn --preload로 fork된 뒤 로그 리스너/추적 스레드와 Supabase 클라이언트를 만듦)
+    setup_logging()
+    setup_tracing()
+    # 벤치마크 등에서 supabase를 다른 클라이언트로 바꾼 경우에는 connect()가 없습니다
+    if isinstance(supabase, LazyClient):
+        supabase.connect()
+    # 다른 워커에서 바뀐 사용자를 이 워커의 사용자 캐시에서 지움 (워커 간 브로커가 있을 때만)
+    user_watcher = asyncio.create_task(watch_user_changes()) if event_hub.shared else None
+    app.state.ready = True
+    try:
+        yield
+    finally:
+        # 종료 중에는 /readyz가 503을 반환해 새 요청이 들어오지 않게 합니다
+        app.state.ready = False
+        if user_watcher is not None:
+            user_watcher.cancel()
+        shutdown_database()
+        shutdown_hashing()
+        shutdown_media_variants()
+        shutdown_tracing()
+        shutdown_logging()
+
+# 요청 ID 설정 (로그의 request_id 필드 및 X-Request-ID 응답 헤더)
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("x-request-id") or uuid.uuid4().hex
+    token = request_id_var.set(request_id)
+    counter = QueryCounter()
+    counter_token = query_counter_var.set(counter)
+    try:
+        response = await call_next(request)
+    finally:
+        query_counter_var.reset(counter_token)
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    if settings.QUERY_COUNT_HEADER:
+        response.headers["X-Query-Count"] = str(counter.count)
+    logger.debug("request finished", extra={"path": request.url.path, "query_count": counter.count})
+    return response
+
+# /upload-media 본문 한도에 더하는 멀티파트 헤더/경계 여유분
+UPLOAD_MULTIPART_OVERHEAD = 64 * 1024
+
+def create_app() -> FastAPI:
+    """FastAPI 앱을 만듭니다. Supabase 클라이언트는 만들지 않으며 lifespan 시작 시(또는 첫 사용 시) 생성됩니다."""
+    app = FastAPI(
+        title="애비의 조언 API",
+        description="미래의 나, 그리고 우리 아이를 위한 특별한 메시지 API",
+        version="1.0.0",
+        lifespan=lifespan
+    )
+    app.state.ready = False
+
+    # 미들웨어는 나중에 등록할수록 바깥쪽에서 실행됩니다 (요청은 아래쪽 등록부터 거쳐 들어옴)
+    # 응답 압축 (Brotli/gzip, JSON·텍스트 응답만)
+    app.add_middleware(
+        CompressionMiddleware,
+        minimum_size=settings.COMPRESSION_MIN_SIZE,
+        gzip_level=settings.GZIP_LEVEL,
+        brotli_quality=settings.BROTLI_QUALITY,
+        cache_size=settings.COMPRESSION_CACHE_SIZE,
+    )
+
+    app.middleware("http")(request_id_middleware)
+
+    # 업로드 크기 제한: Content-Length로 먼저 거절하고, 본문을 받는 중에도 바이트를 세다가 한도를 넘으면 중단
+    app.add_middleware(
+        UploadLimitMiddleware,
+        paths=["/upload-media"],
+        max_bytes=settings.MAX_UPLOAD_BYTES,
+        overhead=UPLOAD_MULTIPART_OVERHEAD,
+    )
+
+    # 요청 수 제한(429)과 동시 처리 수 제한(503), 본문을 읽기 전에 거절
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiter=rate_limiter,
+        concurrency=concurrency_limiter,
+        identify_user=user_id_from_token,
+        trusted_proxy_hops=settings.TRUSTED_PROXY_HOPS,
+    )
+
+    # CORS 설정 (429/503/413처럼 미들웨어가 직접 만드는 거절 응답에도 헤더가 붙도록 그보다 바깥쪽에 등록)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=[
+            "http://localhost:3000",
+            "http://127.0.0.1:3000",
+            "https://advice-app-frontend.vercel.app",
+            "https://mmo-production-34bc.up.railway.app",
+            "https://advice-production-d210.up.railway.app",
+            "*"  # 모든 origin 허용 (개발용)
+        ],
+        allow_origin_regex="https://.*\\.up\\.railway\\.app",
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+
+    # 요청 지표 (가장 바깥쪽 미들웨어로 등록해 다른 미들웨어에서 거절한 요청도 기록)
+    app.add_middleware(MetricsMiddleware)
+
+    # 요청별 추적 스팬 (Supabase 호출과 검증/직렬화 단계가 이 스팬의 자식으로 기록됨)
+    app.add_middleware(TracingMiddleware)
+
+    app.include_router(router)
+    return app
 
 # Preflight OPTIONS 핸들러 (모든 경로)
-@app.options("/{rest_of_path:path}")
+@router.options("/{rest_of_path:path}")
 async def preflight_handler(request: Request, rest_of_path: str):
     return JSONResponse(status_code=200, content={})
 
-# Supabase 설정
-supabase: Client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+# Supabase 설정 (클라이언트는 워커가 시작될 때 만들어짐, database.LazyClient 참고)
+supabase: Client = LazyClient(lambda: create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY))
 
 # 보안 설정
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
 security = HTTPBearer()
 
+# 인증된 사용자 정보 캐시 (id -> users 행)
+# 워커마다 따로 있으므로 여러 워커로 실행할 때는 EVENTS_BROKER_URL로 다른 워커에 변경을 알려 무효화합니다 (watch_user_changes).
+# 브로커 없이 여러 워커로 실행하면 다른 워커의 나이 변경을 알 수 없으므로 캐시를 쓰지 않습니다.
+user_cache = TTLCache(
+    max_size=settings.USER_CACHE_MAX_SIZE if settings.WEB_CONCURRENCY <= 1 or settings.EVENTS_BROKER_URL else 0,
+    ttl_seconds=settings.USER_CACHE_TTL_SECONDS,
+    name="users"
+)
+
+# 업로드 후 생성된 미디어 변형 URL (media_url -> {변형 이름: URL})
+# 업로드 직후 조언이 저장되는 경우에도 변형 정보를 함께 기록하기 위해 잠시 보관합니다
+media_variant_cache = TTLCache(max_size=1024, ttl_seconds=3600)
+
+# 가족별 조언 목록 캐시 ((author_id, category, target_age) -> 검증된 조언 목록)
+advice_list_cache = create_advice_list_cache()
+
+# 검색용 n-gram 색인 ((author_id, 가족 버전) -> NgramIndex, search_advices RPC를 쓸 수 없을 때만 사용)
+search_index_cache = TTLCache(max_size=256, ttl_seconds=settings.ADVICE_CACHE_TTL_SECONDS)
+
+# 가족별 실시간 이벤트 (GET /events)
+event_hub = create_event_hub()
+
+# 라우트별 요청 수 제한과 워커당 동시 처리 수 제한 (ratelimit.py)
+rate_limiter = create_rate_limiter()
+concurrency_limiter = create_concurrency_limiter()
+
 # Pydantic 모델
 class UserCreate(BaseModel):
     user_id: str
@@ -81,6 +221,9 @@ class AdviceCreate(BaseModel):
     unlockType: Optional[str] = 'age'
     password: Optional[str] = None
 
+class AdviceIdList(BaseModel):
+    ids: List[str]
+
 class AdviceResponse(BaseModel):
     id: str
     author_id: str
@@ -89,6 +232,7 @@ class AdviceResponse(BaseModel):
     content: str
     media_url: Optional[str] = None
     media_type: Optional[str] = None
+    media_variants: Optional[Dict[str, str]] = None  # 썸네일/웹 최적화 이미지, 영상 포스터 URL
     unlock_type: Optional[str] = 'age'
     password: Optional[str] = None
     is_read: bool
@@ -96,6 +240,22 @@ class AdviceResponse(BaseModel):
     created_at: str
     updated_at: str
 
+class AdvicePage(BaseModel):
+    items: List[AdviceResponse]
+    next_cursor: Optional[str] = None
+
+class UploadSessionCreate(BaseModel):
+    filename: str
+    content_type: str
+    size: int
+
+class UploadSessionResponse(BaseModel):
+    upload_id: str
+    chunk_size: int
+    total_chunks: int
+    received: List[List[int]] = []  # 받은 바이트 구간 [시작, 끝)
+    missing_chunks: List[int] = []
+
 class Token(BaseModel):
     access_token: str
     token_type: str
@@ -107,11 +267,11 @@ class AgeUpdate(BaseModel):
     age: int
 
 # 유틸리티 함수
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await run_hashing(pwd_context.verify, plain_password, hashed_password)
 
-def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+async def get_password_hash(password: str) -> str:
+    return await run_hashing(pwd_context.hash, password)
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -123,52 +283,264 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> UserResponse:
+def encode_cursor(advice: dict) -> str:
+    """(created_at, id) 위치를 불투명한 커서 문자열로 인코딩합니다."""
+    raw = json.dumps([advice["created_at"], advice["id"]]).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_cursor(cursor: str) -> tuple:
+    """커서를 (created_at, id)로 되돌립니다. 두 값은 PostgREST 필터 문자열에 그대로 들어가므로 형식을 엄격히 확인합니다."""
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        created_at, advice_id = json.loads(raw)
+        if not isinstance(created_at, str) or not isinstance(advice_id, str):
+            raise ValueError
+        datetime.fromisoformat(created_at)
+        uuid.UUID(advice_id)
+        return created_at, advice_id
+    except (ValueError, TypeError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+
+def encode_search_cursor(offset: int) -> str:
+    """검색 결과는 관련도 순이므로 키셋 대신 위치(offset)를 커서로 사용합니다."""
+    raw = json.dumps({"offset": offset}).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+def decode_search_cursor(cursor: str) -> int:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        offset = json.loads(raw)["offset"]
+        if not isinstance(offset, int) or offset < 0:
+            raise ValueError
+        return offset
+    except (ValueError, TypeError, KeyError):
+        raise HTTPException(status_code=400, detail="잘못된 커서입니다")
+
+def apply_or_filter(query, filters: str):
+    # postgrest-py 0.13에는 or_()가 없어 PostgREST의 or 파라미터를 직접 추가합니다
+    if hasattr(query, "or_"):
+        return query.or_(filters)
+    query.params = query.params.add("or", f"({filters})")
+    return query
+
+def apply_keyset_order(query):
+    # 여러 정렬 키는 하나의 order 파라미터(created_at.desc,id.desc)로 보내야 합니다
+    if hasattr(query, "params"):
+        query.params = query.params.set("order", "created_at.desc,id.desc")
+        return query
+    return query.order("created_at", desc=True).order("id", desc=True)
+
+def get_repository() -> Repository:
+    """요청 단위 저장소 (한 요청 안의 모든 Depends(get_repository)가 같은 인스턴스를 받음)"""
+    return Repository(supabase, user_cache)
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    repository: Repository = Depends(get_repository)
+) -> UserResponse:
+    return await authenticate_token(credentials.credentials, repository)
+
+def decode_access_token(token: str) -> Optional[str]:
+    """액세스 토큰의 사용자 ID를 반환합니다. 서명이 틀렸거나 만료됐거나 다른 용도의 토큰이면 None을 반환합니다.
+
+    액세스 토큰에는 typ/aud가 없으므로, 이 값이 있는 토큰(예: 업로드 세션 upload_id)은 인증에 쓸 수 없습니다.
+    """
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=["HS256"])
+    except JWTError:
+        return None
+    if "typ" in payload or "aud" in payload:
+        return None
+    return payload.get("sub")
+
+def user_id_from_token(token: str) -> Optional[str]:
+    """토큰의 서명만 확인하고 사용자 ID를 반환합니다 (요청 수 제한용, DB는 조회하지 않음)."""
+    return decode_access_token(token)
+
+async def authenticate_token(token: str, repository: Repository) -> UserResponse:
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
         detail="Could not validate credentials",
         headers={"WWW-Authenticate": "Bearer"},
     )
-    try:
-        payload = jwt.decode(credentials.credentials, settings.SECRET_KEY, algorithms=["HS256"])
-        user_id: str = payload.get("sub")
-        if user_id is None:
-            raise credentials_exception
-        token_data = TokenData(user_id=user_id)
-    except JWTError:
+    user_id = decode_access_token(token)
+    if user_id is None:
         raise credentials_exception
+    token_data = TokenData(user_id=user_id)
     
-    # Supabase에서 사용자 정보 조회
-    response = supabase.table("users").select("*").eq("id", token_data.user_id).execute()
-    
-    if not response.data:
+    # 요청 내 identity map → 사용자 캐시 → Supabase 순서로 사용자 정보 조회
+    user_data = await repository.get_user(token_data.user_id)
+    if user_data is None:
         raise credentials_exception
     
-    user_data = response.data[0]
+    user_data = dict(user_data)
     # user_id 필드 추가 (id와 동일한 값)
     user_data["user_id"] = user_data["id"]
     return UserResponse(**user_data)
 
+def family_author_id(user: UserResponse) -> Optional[str]:
+    """사용자가 접근할 수 있는 조언의 author_id (아버지는 본인, 자녀는 아버지)"""
+    return user.user_id if user.user_type == "father" else user.father_id
+
+async def family_validator(request: Request, current_user: UserResponse) -> Optional[Validator]:
+    """가족 버전(advice_family_versions)으로 ETag를 만듭니다. 본문을 조회하기 전에 호출해야 합니다.
+
+    버전 테이블이 아직 없으면 None을 반환하고 조건부 응답 없이 동작합니다.
+    """
+    author_id = family_author_id(current_user)
+    version, last_modified = 0, None
+    if author_id:
+        try:
+            response = await execute_shared(
+                ("advice_family_versions", author_id),
+                supabase.table("advice_family_versions").select("version,updated_at").eq("author_id", author_id)
+            )
+        except Exception:
+            logger.warning("family version lookup failed", exc_info=True)
+            return None
+        if response.data:
+            version = response.data[0]["version"]
+            try:
+                last_modified = datetime.fromisoformat(response.data[0]["updated_at"])
+            except (TypeError, ValueError):
+                last_modified = None
+    # 자녀 통계는 나이에 따라 달라지므로 사용자 정보도 범위에 포함
+    return make_validator(request, version, last_modified, current_user.user_id, current_user.user_type, current_user.age)
+
+async def check_not_modified(request: Request, http_response: Response, current_user: UserResponse) -> tuple:
+    """If-None-Match가 현재 ETag와 같으면 304 응답을, 아니면 응답에 ETag/Last-Modified를 설정하고 None을 반환합니다.
+
+    (304 응답 또는 None, Validator 또는 None)을 반환합니다.
+    """
+    validator = await family_validator(request, current_user)
+    if validator is None:
+        return None, None
+    cached = not_modified(request, validator)
+    if cached is None:
+        apply_validator(http_response, validator)
+    return cached, validator
+
+async def raise_advice_write_error(advice_id: str, repository: Repository):
+    """조건부 변경이 0행이면 조언 존재 여부로 404/403을 구분합니다 (실패한 경우에만, 요청 안에서 아직 읽지 않았을 때 조회)."""
+    if await repository.get_advice(advice_id) is None:
+        raise HTTPException(status_code=404, detail="조언을 찾을 수 없습니다")
+    raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+
+def build_advice_row(advice: AdviceCreate, author_id: str) -> dict:
+    """AdviceCreate를 advices 테이블에 저장할 행으로 변환합니다."""
+    # media_url은 저장 시 한 번만 표준 형식으로 정리
+    media_url = normalize_media_url(advice.media_url)
+    return {
+        "author_id": author_id,
+        "category": advice.category,
+        "target_age": advice.target_age,
+        "content": advice.content,
+        "media_url": media_url,
+        "media_type": advice.media_type,
+        "media_variants": media_variant_cache.get(media_url) if media_url else None,
+        "unlock_type": advice.unlockType,
+        "password": advice.password,
+        "is_read": False,
+        "is_favorite": False
+    }
+
+def page_from_cached(items: list, limit: int, cursor_position: Optional[tuple]) -> Optional[tuple]:
+    """캐시된 전체 목록에서 (페이지, next_cursor)를 잘라냅니다. 커서 위치의 조언이 없으면 None을 반환합니다."""
+    start = 0
+    if cursor_position:
+        cursor_created_at, cursor_id = cursor_position
+        for index, advice in enumerate(items):
+            if advice["id"] == cursor_id and advice["created_at"] == cursor_created_at:
+                start = index + 1
+                break
+        else:
+            return None
+    page = items[start:start + limit]
+    next_cursor = encode_cursor(page[-1]) if start + limit < len(items) else None
+    return page, next_cursor
+
+def skip_invalid_advice(advice: dict, error: Exception):
+    logger.warning("skipping invalid advice row", extra={"advice_id": advice.get('id'), "error": str(error)})
+
+def advice_payload(rows: List[dict]) -> list:
+    """이벤트로 보낼 조언 목록 (GET /advices 응답과 같은 형태)"""
+    return dump_models(validate_rows(AdviceResponse, rows, on_error=skip_invalid_advice))
+
+async def advices_changed(author_id: Optional[str], event: str, data: dict):
+    """조언을 추가/수정/삭제한 뒤 호출합니다. 해당 가족의 목록 캐시를 무효화하고 구독자에게 이벤트를 보냅니다."""
+    await advice_list_cache.invalidate_family(author_id)
+    await event_hub.publish(author_id, event, data)
+
+async def user_changed(user_id: str):
+    """users 행을 바꾼 뒤 호출합니다. 이 워커의 사용자 캐시를 지우고 다른 워커에도 알립니다."""
+    user_cache.invalidate(user_id)
+    await event_hub.publish_user_changed(user_id)
+
+async def watch_user_changes():
+    """다른 워커가 알린 사용자 변경을 받아 이 워커의 사용자 캐시에서 지웁니다 (lifespan 동안 실행)."""
+    while True:
+        try:
+            subscription = await event_hub.subscribe_user_changes()
+            try:
+                while True:
+                    message = await subscription.get(settings.SSE_HEARTBEAT_SECONDS)
+                    if message is not None:
+                        user_cache.invalidate(message.decode() if isinstance(message, bytes) else message)
+            finally:
+                await subscription.close()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            # 연결이 끊긴 동안의 변경을 놓쳤을 수 있으므로 캐시를 비우고 다시 구독합니다
+            logger.warning("user change subscription failed", exc_info=True)
+            user_cache.clear()
+            await asyncio.sleep(1)
+
+def check_batch_size(count: int):
+    if count > settings.BATCH_MAX_ITEMS:
+        raise HTTPException(status_code=413, detail=f"한 번에 최대 {settings.BATCH_MAX_ITEMS}개까지 처리할 수 있습니다")
+
 # API 엔드포인트
-@app.get("/")
+@router.get("/")
 async def root():
     return {"message": "애비의 조언 API에 오신 것을 환영합니다! 👨‍👦"}
 
-@app.post("/auth/register", response_model=Token)
+@router.get("/healthz", include_in_schema=False)
+async def healthz():
+    """프로세스가 응답하는지 확인합니다 (liveness, DB는 조회하지 않음)."""
+    return {"status": "ok"}
+
+@router.get("/readyz", include_in_schema=False)
+async def readyz(request: Request):
+    """요청을 받을 준비가 됐는지 확인합니다 (readiness, DB는 조회하지 않음).
+
+    lifespan 시작이 끝나 Supabase 클라이언트가 만들어진 뒤부터 종료가 시작되기 전까지 200을 반환합니다.
+    """
+    if not request.app.state.ready or (isinstance(supabase, LazyClient) and not supabase.connected):
+        return JSONResponse(status_code=503, content={"status": "starting"})
+    return {"status": "ready"}
+
+@router.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 형식의 지표"""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+@router.post("/auth/register", response_model=Token)
 async def register(user: UserCreate):
     # 기존 사용자 확인
-    response = supabase.table("users").select("*").eq("id", user.user_id).execute()
+    response = await execute(supabase.table("users").select("*").eq("id", user.user_id))
     if response.data:
         raise HTTPException(status_code=400, detail="이미 존재하는 사용자 ID입니다")
     
     # 자녀인 경우 아버지 ID 확인
     if user.user_type == "child" and user.father_id:
-        father_response = supabase.table("users").select("*").eq("id", user.father_id).eq("user_type", "father").execute()
+        father_response = await execute(supabase.table("users").select("*").eq("id", user.father_id).eq("user_type", "father"))
         if not father_response.data:
             raise HTTPException(status_code=400, detail="존재하지 않는 아버지 ID입니다")
     
     # 비밀번호 해시화
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash(user.password)
     
     # 사용자 생성
     user_data = {
@@ -179,7 +551,8 @@ async def register(user: UserCreate):
         "father_id": user.father_id
     }
     
-    response = supabase.table("users").insert(user_data).execute()
+    response = await execute(supabase.table("users").insert(user_data))
+    await user_changed(user.user_id)
     
     if not response.data:
         raise HTTPException(status_code=500, detail="사용자 생성에 실패했습니다")
@@ -192,10 +565,10 @@ async def register(user: UserCreate):
     
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.post("/auth/login", response_model=Token)
+@router.post("/auth/login", response_model=Token)
 async def login(user_credentials: UserLogin):
     # 사용자 조회
-    response = supabase.table("users").select("*").eq("id", user_credentials.user_id).execute()
+    response = await execute(supabase.table("users").select("*").eq("id", user_credentials.user_id))
     
     if not response.data:
         raise HTTPException(status_code=401, detail="잘못된 사용자 ID 또는 비밀번호입니다")
@@ -203,7 +576,7 @@ async def login(user_credentials: UserLogin):
     user_data = response.data[0]
     
     # 비밀번호 확인
-    if not verify_password(user_credentials.password, user_data["password_hash"]):
+    if not await verify_password(user_credentials.password, user_data["password_hash"]):
         raise HTTPException(status_code=401, detail="잘못된 사용자 ID 또는 비밀번호입니다")
     
     # 토큰 생성
@@ -214,11 +587,11 @@ async def login(user_credentials: UserLogin):
     
     return {"access_token": access_token, "token_type": "bearer"}
 
-@app.get("/users/me", response_model=UserResponse)
+@router.get("/users/me", response_model=UserResponse)
 async def get_current_user_info(current_user: UserResponse = Depends(get_current_user)):
     return current_user
 
-@app.post("/advices", response_model=AdviceResponse)
+@router.post("/advices", response_model=AdviceResponse)
 async def create_advice(
     advice: AdviceCreate,
     current_user: UserResponse = Depends(get_current_user)
@@ -226,93 +599,209 @@ async def create_advice(
     if current_user.user_type != "father":
         raise HTTPException(status_code=403, detail="아버지만 조언을 작성할 수 있습니다")
     
-    # media_url에서 세미콜론 제거 (더 강력한 정리)
-    media_url = advice.media_url
-    if media_url:
-        # 세미콜론 제거 (더 강력한 정리)
-        media_url = media_url.strip()
-        # 끝에 있는 세미콜론 제거 (여러 개일 수도 있음)
-        while media_url.endswith(';'):
-            media_url = media_url[:-1]
-        media_url = media_url.strip()
-        
-        print(f"Original media_url: {advice.media_url}")
-        print(f"Cleaned media_url: {media_url}")
-        print(f"Final URL ends with semicolon: {media_url.endswith(';')}")
-    
-    advice_data = {
-        "author_id": current_user.user_id,
-        "category": advice.category,
-        "target_age": advice.target_age,
-        "content": advice.content,
-        "media_url": media_url,
-        "media_type": advice.media_type,
-        "unlock_type": advice.unlockType,
-        "password": advice.password,
-        "is_read": False,
-        "is_favorite": False
-    }
-    print(f"Creating advice with data: {advice_data}")  # 디버깅용 로그
+    advice_data = build_advice_row(advice, current_user.user_id)
+    debug_sampled(logger, "creating advice", author_id=current_user.user_id, advice_data=advice_data)
     try:
-        response = supabase.table("advices").insert(advice_data).execute()
-        print(f"Supabase response: {response}")  # 디버깅용 로그
-        print(f"Response data: {response.data}")  # 디버깅용 로그
+        response = await execute(supabase.table("advices").insert(advice_data))
+        debug_sampled(logger, "advice insert response", response_data=response.data)
         
         # Supabase 응답 구조 확인
         if hasattr(response, 'error') and response.error:
-            print(f"Supabase error: {response.error}")  # 디버깅용 로그
+            logger.error("supabase error while creating advice", extra={"error": str(response.error)})
             raise HTTPException(status_code=500, detail=f"Supabase 오류: {response.error}")
         
         # 응답에 오류가 있는지 확인 (다른 방식)
         if hasattr(response, 'data') and response.data is None:
-            print(f"No data in response")  # 디버깅용 로그
+            logger.error("advice insert returned no data")
             raise HTTPException(status_code=500, detail="조언 생성에 실패했습니다")
             
         if not response.data or len(response.data) == 0:
-            print(f"Empty data in response")  # 디버깅용 로그
+            logger.error("advice insert returned empty data")
             raise HTTPException(status_code=500, detail="조언 생성에 실패했습니다")
         
-        # 응답 데이터에서 media_url 세미콜론 제거 (최종 정리)
         advice_data = response.data[0]
-        if advice_data.get('media_url'):
-            original_url = advice_data['media_url']
-            # 세미콜론 제거 (더 강력하게)
-            cleaned_url = original_url.strip()
-            # 끝에 있는 세미콜론 제거 (여러 개일 수도 있음)
-            while cleaned_url.endswith(';'):
-                cleaned_url = cleaned_url[:-1]
-            cleaned_url = cleaned_url.strip()
-            
-            # 슬래시 정리 (advice-media/ -> advice-media//)
-            if '/advice-media/' in cleaned_url:
-                # 먼저 3개 이상의 슬래시를 2개로 정리
-                cleaned_url = cleaned_url.replace('/advice-media///', '/advice-media//')
-                # 그 다음 1개 슬래시를 2개로 변경
-                cleaned_url = cleaned_url.replace('/advice-media/', '/advice-media//')
-            
-            if cleaned_url != original_url:
-                advice_data['media_url'] = cleaned_url
-                print(f"Removed semicolon from response media_url: {original_url} -> {cleaned_url}")
-            else:
-                print(f"No semicolon found in response media_url: {original_url}")
-            
-            print(f"Final cleaned URL ends with semicolon: {cleaned_url.endswith(';')}")
-            print(f"Final cleaned URL has correct double slash: {'/advice-media//' in cleaned_url}")
-            
+        await advices_changed(current_user.user_id, "advice.created", {"advices": advice_payload([advice_data])})
         return AdviceResponse(**advice_data)
     except Exception as e:
-        print(f"Exception during advice creation: {str(e)}")  # 디버깅용 로그
+        logger.exception("advice creation failed")
         raise HTTPException(status_code=500, detail=f"조언 생성 중 오류 발생: {str(e)}")
 
-@app.get("/advices", response_model=List[AdviceResponse])
+async def insert_advices_batch(items: List[Any], author_id: str) -> dict:
+    """항목마다 AdviceCreate로 검증한 뒤, 유효한 행을 BATCH_WRITE_SIZE개씩 다중 행 INSERT로 저장합니다."""
+    check_batch_size(len(items))
+    results: List[Optional[dict]] = [None] * len(items)
+    pending = []  # (원래 위치, 저장할 행)
+    created_rows = []
+    for index, item in enumerate(items):
+        try:
+            if isinstance(item, Exception):
+                raise item
+            pending.append((index, build_advice_row(AdviceCreate.model_validate(item), author_id)))
+        except ValidationError as e:
+            results[index] = {"index": index, "status": "error", "error": e.errors(include_url=False, include_context=False)}
+        except ValueError as e:
+            results[index] = {"index": index, "status": "error", "error": str(e)}
+    
+    for chunk in batch.chunked(pending, settings.BATCH_WRITE_SIZE):
+        try:
+            response = await execute(supabase.table("advices").insert([row for _, row in chunk]))
+            inserted = response.data or []
+            if len(inserted) != len(chunk):
+                raise Exception("삽입된 행 수가 요청과 다릅니다")
+            for (index, _), row in zip(chunk, inserted):
+                results[index] = {"index": index, "status": "created", "id": row["id"]}
+            created_rows.extend(inserted)
+        except Exception as e:
+            logger.exception("batch advice insert failed", extra={"rows": len(chunk)})
+            for index, _ in chunk:
+                results[index] = {"index": index, "status": "error", "error": f"조언 생성 중 오류 발생: {str(e)}"}
+    
+    if created_rows:
+        await advices_changed(author_id, "advice.created", {"advices": advice_payload(created_rows)})
+    return {
+        "created": sum(1 for result in results if result["status"] == "created"),
+        "failed": sum(1 for result in results if result["status"] == "error"),
+        "results": results
+    }
+
+@router.post("/advices/batch")
+async def create_advices_batch(
+    items: List[Any],
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """여러 조언을 한 번에 작성합니다. 항목별 결과(created/error)를 입력 순서대로 반환합니다."""
+    if current_user.user_type != "father":
+        raise HTTPException(status_code=403, detail="아버지만 조언을 작성할 수 있습니다")
+    return await insert_advices_batch(items, current_user.user_id)
+
+@router.post("/advices/import")
+async def import_advices(
+    request: Request,
+    format: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """NDJSON(한 줄에 조언 하나) 또는 CSV 파일 본문으로 조언을 일괄 작성합니다."""
+    if current_user.user_type != "father":
+        raise HTTPException(status_code=403, detail="아버지만 조언을 작성할 수 있습니다")
+    
+    fmt = batch.detect_import_format(request.headers.get("content-type", ""), format)
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > settings.BATCH_IMPORT_MAX_BYTES:
+        raise upload_too_large(settings.BATCH_IMPORT_MAX_BYTES)
+    body = await request.body()
+    if len(body) > settings.BATCH_IMPORT_MAX_BYTES:
+        raise upload_too_large(settings.BATCH_IMPORT_MAX_BYTES)
+    
+    items = batch.parse_import_body(body, fmt)
+    return await insert_advices_batch(items, current_user.user_id)
+
+def split_advice_ids(ids: List[str]) -> tuple:
+    """중복을 제거하고, UUID 형식이 아닌 ID는 쿼리에서 제외합니다."""
+    valid, invalid = [], []
+    for advice_id in dict.fromkeys(ids):
+        try:
+            uuid.UUID(advice_id)
+            valid.append(advice_id)
+        except ValueError:
+            invalid.append(advice_id)
+    return valid, invalid
+
+@router.post("/advices/batch/read")
+async def mark_advices_as_read_batch(
+    payload: AdviceIdList,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """여러 조언을 한 번에 읽음으로 표시합니다. 접근할 수 없거나 없는 조언은 not_found로 보고합니다."""
+    check_batch_size(len(payload.ids))
+    valid_ids, _ = split_advice_ids(payload.ids)
+    
+    updated = set()
+    for chunk in batch.chunked(valid_ids, settings.BATCH_WRITE_SIZE):
+        response = await execute(
+            supabase.table("advices").update({"is_read": True})
+            .in_("id", chunk)
+            .eq("author_id", family_author_id(current_user))
+        )
+        updated.update(row["id"] for row in response.data or [])
+    
+    if updated:
+        await advices_changed(family_author_id(current_user), "advice.read", {"ids": sorted(updated)})
+    return {
+        "updated": len(updated),
+        "results": [
+            {"id": advice_id, "status": "updated" if advice_id in updated else "not_found"}
+            for advice_id in dict.fromkeys(payload.ids)
+        ]
+    }
+
+@router.post("/advices/batch/delete")
+async def delete_advices_batch(
+    payload: AdviceIdList,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """여러 조언을 한 번에 삭제합니다. 본인이 작성하지 않았거나 없는 조언은 not_found로 보고합니다."""
+    if current_user.user_type != "father":
+        raise HTTPException(status_code=403, detail="아버지만 조언을 삭제할 수 있습니다")
+    check_batch_size(len(payload.ids))
+    valid_ids, _ = split_advice_ids(payload.ids)
+    
+    deleted = set()
+    try:
+        for chunk in batch.chunked(valid_ids, settings.BATCH_WRITE_SIZE):
+            response = await execute(
+                supabase.table("advices").delete()
+                .in_("id", chunk)
+                .eq("author_id", current_user.user_id)
+            )
+            deleted.update(row["id"] for row in response.data or [])
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"조언 삭제 중 오류 발생: {str(e)}")
+    finally:
+        if deleted:
+            await advices_changed(current_user.user_id, "advice.deleted", {"ids": sorted(deleted)})
+    
+    return {
+        "deleted": len(deleted),
+        "results": [
+            {"id": advice_id, "status": "deleted" if advice_id in deleted else "not_found"}
+            for advice_id in dict.fromkeys(payload.ids)
+        ]
+    }
+
+@router.get("/advices", response_model=Union[AdvicePage, List[AdviceResponse]])
 async def get_advices(
+    request: Request,
+    http_response: Response,
     current_user: UserResponse = Depends(get_current_user),
     category: Optional[str] = None,
-    target_age: Optional[int] = None
+    target_age: Optional[int] = None,
+    limit: Optional[int] = Query(None, ge=1, le=settings.ADVICES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None
 ):
+    # limit/cursor가 없으면 기존처럼 전체 목록(배열)을 반환합니다 (호환 모드)
+    paginated = limit is not None or cursor is not None or not settings.ADVICES_UNPAGINATED_COMPAT
+    if paginated and limit is None:
+        limit = settings.ADVICES_PAGE_SIZE
+    cursor_position = decode_cursor(cursor) if cursor else None
+    
+    # 변경이 없으면 목록을 조회하지 않고 304로 응답
+    cached, validator = await check_not_modified(request, http_response, current_user)
+    if cached is not None:
+        return cached
+    
+    # 가족별 목록 캐시 (가족 버전이 같을 때만 사용)
+    author_id = family_author_id(current_user)
+    version = validator.version if validator is not None else None
+    cached_items = await advice_list_cache.get(author_id, category, target_age, version) if author_id else None
+    if cached_items is not None:
+        if not paginated:
+            return json_response(cached_items, headers=http_response.headers)
+        page = page_from_cached(cached_items, limit, cursor_position)
+        if page is not None:
+            items, next_cursor = page
+            return json_response({"items": items, "next_cursor": next_cursor}, headers=http_response.headers)
+    
     try:
-        print(f"Fetching advices for user: {current_user.user_id}, type: {current_user.user_type}, father_id: {current_user.father_id}")  # 디버깅용 로그
-        
         # Supabase 쿼리 빌더 수정
         if current_user.user_type == "father":
             response = supabase.table("advices").select("*").eq("author_id", current_user.user_id)
@@ -324,88 +813,141 @@ async def get_advices(
         if target_age:
             response = response.eq("target_age", target_age)
         
-        print(f"Executing query for user_type: {current_user.user_type}")  # 디버깅용 로그
-        response = response.order("created_at", desc=True).execute()
-        print(f"Advices response: {response.data}")  # 디버깅용 로그
-        print(f"Number of advices found: {len(response.data) if response.data else 0}")  # 디버깅용 로그
+        # 키셋 페이지네이션: (created_at, id) < 커서 위치 (OFFSET 대신 인덱스 범위 조건 사용)
+        # OR 조건만으로는 (author_id, created_at, id) 인덱스의 범위가 정해지지 않으므로 created_at <= 커서 조건을 함께 보냅니다
+        if cursor_position:
+            cursor_created_at, cursor_id = cursor_position
+            response = response.lte("created_at", cursor_created_at)
+            response = apply_or_filter(
+                response,
+                f'created_at.lt."{cursor_created_at}",'
+                f'and(created_at.eq."{cursor_created_at}",id.lt."{cursor_id}")'
+            )
         
-        if not response.data:
-            return []
+        # 캐시된 전체 목록에서 페이지를 잘라낼 수 있도록 호환 모드도 (created_at, id) 순서로 정렬
+        response = apply_keyset_order(response)
+        if paginated:
+            # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+            response = response.limit(limit + 1)
         
-        # 각 advice 데이터 검증
-        advices = []
-        for advice in response.data:
-            try:
-                # media_url에서 세미콜론 제거 및 슬래시 정리
-                if advice.get('media_url'):
-                    original_url = advice['media_url']
-                    # 강력한 세미콜론 제거
-                    cleaned_url = original_url
-                    if cleaned_url:
-                        # 앞뒤 공백 제거
-                        cleaned_url = cleaned_url.strip()
-                        # 끝에 있는 세미콜론 제거 (여러 개일 수도 있음)
-                        while cleaned_url.endswith(';'):
-                            cleaned_url = cleaned_url[:-1]
-                        # 다시 공백 제거
-                        cleaned_url = cleaned_url.strip()
-                        
-                        # 슬래시 정리 (advice-media/ -> advice-media//)
-                        if '/advice-media/' in cleaned_url:
-                            # 먼저 3개 이상의 슬래시를 2개로 정리
-                            cleaned_url = cleaned_url.replace('/advice-media///', '/advice-media//')
-                            # 그 다음 1개 슬래시를 2개로 변경
-                            cleaned_url = cleaned_url.replace('/advice-media/', '/advice-media//')
-                        
-                        if cleaned_url != original_url:
-                            advice['media_url'] = cleaned_url
-                            print(f"Cleaned media_url: {original_url} -> {cleaned_url}")
-                        else:
-                            print(f"Media URL already clean: {original_url}")
-                        print(f"Final URL ends with semicolon: {cleaned_url.endswith(';')}")
-                        print(f"Final URL has correct double slash: {'/advice-media//' in cleaned_url}")
-                
-                advice_response = AdviceResponse(**advice)
-                advices.append(advice_response)
-            except Exception as e:
-                print(f"Error parsing advice {advice.get('id', 'unknown')}: {e}")  # 디버깅용 로그
-                continue
+        # 같은 가족의 동시 요청은 하나의 조회를 공유 (가족 버전이 다르면 따로 조회)
+        response = await execute_shared(
+            ("advices", author_id, version, category, target_age, paginated, limit, cursor),
+            response
+        )
+        logger.debug("advices fetched", extra={
+            "user_id": current_user.user_id,
+            "user_type": current_user.user_type,
+            "row_count": len(response.data) if response.data else 0
+        })
+        debug_sampled(logger, "advices payload", response_data=response.data)
+        
+        rows = response.data or []
+        next_cursor = None
+        if paginated and len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_cursor(rows[-1])
         
-        return advices
+        # 각 advice 데이터는 한 번만 검증하고, response_model 재검증 없이 orjson으로 바로 직렬화
+        with span("advices.validate", row_count=len(rows)):
+            advices = validate_rows(AdviceResponse, rows, on_error=skip_invalid_advice)
+            items = dump_models(advices)
+        
+        # 전체 목록을 조회한 경우(호환 모드 또는 다음 페이지가 없는 첫 페이지)에만 캐시에 저장
+        if author_id and not cursor_position and next_cursor is None:
+            await advice_list_cache.set(author_id, category, target_age, version, items)
+        content = {"items": items, "next_cursor": next_cursor} if paginated else items
+        with span("advices.serialize", item_count=len(items)):
+            return json_response(content, headers=http_response.headers)
         
     except Exception as e:
-        print(f"Error in get_advices: {e}")  # 디버깅용 로그
-        import traceback
-        print(f"Traceback: {traceback.format_exc()}")  # 디버깅용 로그
+        logger.exception("get_advices failed")
         raise HTTPException(status_code=500, detail=f"조언을 가져오는 중 오류 발생: {str(e)}")
 
-@app.get("/advices/{advice_id}", response_model=AdviceResponse)
+async def load_family_advices(author_id: str, version: Optional[int]) -> list:
+    """가족의 전체 조언 목록(검증된 항목)을 목록 캐시에서 가져오고, 없으면 조회해 캐시에 저장합니다."""
+    items = await advice_list_cache.get(author_id, None, None, version)
+    if items is None:
+        response = await execute_shared(
+            ("advices", author_id, version, None, None, False, None, None),
+            apply_keyset_order(supabase.table("advices").select("*").eq("author_id", author_id))
+        )
+        items = advice_payload(response.data or [])
+        await advice_list_cache.set(author_id, None, None, version, items)
+    return items
+
+async def family_search_index(author_id: str, version: Optional[int]) -> NgramIndex:
+    index = search_index_cache.get((author_id, version)) if version is not None else None
+    if index is None:
+        index = NgramIndex(await load_family_advices(author_id, version))
+        if version is not None:
+            search_index_cache.set((author_id, version), index)
+    return index
+
+@router.get("/advices/search", response_model=AdvicePage)
+async def search_advices(
+    request: Request,
+    http_response: Response,
+    q: str = Query(..., min_length=1, max_length=100),
+    limit: Optional[int] = Query(None, ge=1, le=settings.ADVICES_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """조언 내용/카테고리를 검색해 관련도 순으로 반환합니다. (접근 범위는 GET /advices와 같음)"""
+    q = q.strip()
+    if not q:
+        raise HTTPException(status_code=400, detail="검색어를 입력해주세요")
+    limit = limit or settings.ADVICES_PAGE_SIZE
+    offset = decode_search_cursor(cursor) if cursor else 0
+    
+    cached, validator = await check_not_modified(request, http_response, current_user)
+    if cached is not None:
+        return cached
+    
+    author_id = family_author_id(current_user)
+    if not author_id:
+        return json_response({"items": [], "next_cursor": None}, headers=http_response.headers)
+    version = validator.version if validator is not None else None
+    
+    items = None
+    if settings.SEARCH_BACKEND == "postgres":
+        try:
+            # 다음 페이지 존재 여부 확인을 위해 1개 더 조회
+            response = await execute_shared(
+                ("search_advices", author_id, version, q, limit, offset),
+                supabase.rpc("search_advices", {
+                    "author_id_param": author_id,
+                    "query_param": q,
+                    "limit_param": limit + 1,
+                    "offset_param": offset
+                })
+            )
+            items = advice_payload(response.data or [])
+        except Exception:
+            logger.warning("search_advices RPC failed, using in-process index", exc_info=True)
+    if items is None:
+        index = await family_search_index(author_id, version)
+        items = index.search(q)[offset:offset + limit + 1]
+    
+    next_cursor = encode_search_cursor(offset + limit) if len(items) > limit else None
+    return json_response({"items": items[:limit], "next_cursor": next_cursor}, headers=http_response.headers)
+
+@router.get("/advices/{advice_id}", response_model=AdviceResponse)
 async def get_advice(
     advice_id: str,
-    current_user: UserResponse = Depends(get_current_user)
+    request: Request,
+    http_response: Response,
+    current_user: UserResponse = Depends(get_current_user),
+    repository: Repository = Depends(get_repository)
 ):
-    response = supabase.table("advices").select("*").eq("id", advice_id).execute()
-    if not response.data:
+    # 304에는 본문이 없으므로 권한 확인 전에 응답해도 다른 가족의 조언이 노출되지 않습니다
+    cached, _ = await check_not_modified(request, http_response, current_user)
+    if cached is not None:
+        return cached
+    
+    advice = await repository.get_advice(advice_id)
+    if advice is None:
         raise HTTPException(status_code=404, detail="조언을 찾을 수 없습니다")
-    advice = response.data[0]
-    
-    # media_url 정리 (세미콜론 제거 및 슬래시 정리)
-    if advice.get('media_url'):
-        original_url = advice['media_url']
-        cleaned_url = original_url.strip()
-        # 세미콜론 제거
-        while cleaned_url.endswith(';'):
-            cleaned_url = cleaned_url[:-1]
-        cleaned_url = cleaned_url.strip()
-        
-        # 슬래시 정리 (advice-media/ -> advice-media//)
-        if '/advice-media/' in cleaned_url:
-            # 먼저 3개 이상의 슬래시를 2개로 정리
-            cleaned_url = cleaned_url.replace('/advice-media///', '/advice-media//')
-            # 그 다음 1개 슬래시를 2개로 변경
-            cleaned_url = cleaned_url.replace('/advice-media/', '/advice-media//')
-        
-        advice['media_url'] = cleaned_url
     
     # 권한 확인
     if current_user.user_type == "father":
@@ -416,200 +958,330 @@ async def get_advice(
             raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
     return AdviceResponse(**advice)
 
-@app.put("/advices/{advice_id}/read")
+@router.put("/advices/{advice_id}/read")
 async def mark_advice_as_read(
     advice_id: str,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    repository: Repository = Depends(get_repository)
 ):
-    # 조언 조회
-    response = supabase.table("advices").select("*").eq("id", advice_id).execute()
-    
-    if not response.data:
-        raise HTTPException(status_code=404, detail="조언을 찾을 수 없습니다")
-    
-    advice = response.data[0]
-    
-    # 권한 확인
-    if current_user.user_type == "father":
-        if advice["author_id"] != current_user.user_id:
-            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-    else:
-        if advice["author_id"] != current_user.father_id:
-            raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-    
-    # 읽음 상태 업데이트
-    update_response = supabase.table("advices").update({"is_read": True}).eq("id", advice_id).execute()
+    # 읽음 상태 업데이트 (소유권 조건을 포함한 조건부 UPDATE 한 번으로 처리)
+    update_response = await execute(
+        supabase.table("advices").update({"is_read": True})
+        .eq("id", advice_id)
+        .eq("author_id", family_author_id(current_user))
+    )
     
     if not update_response.data:
-        raise HTTPException(status_code=500, detail="상태 업데이트에 실패했습니다")
+        await raise_advice_write_error(advice_id, repository)
     
+    await advices_changed(family_author_id(current_user), "advice.read", {"ids": [advice_id]})
     return {"message": "조언을 읽음으로 표시했습니다"}
 
-@app.post("/upload-media")
-async def upload_media(
-    file: UploadFile = File(...),
-    current_user: UserResponse = Depends(get_current_user)
-):
-    # 파일 타입 검증
-    if not file.content_type.startswith(('image/', 'video/')):
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="이미지 또는 영상 파일만 업로드 가능합니다."
-        )
-    
-    # 파일 크기 제한 (10MB)
-    if file.size and file.size > 10 * 1024 * 1024:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="파일 크기는 10MB 이하여야 합니다."
-        )
-    
+async def process_media_variants(file_stream: BufferedReader, file_name: str, media_type: str, media_url: str):
+    """업로드된 원본으로 썸네일/포스터를 만들어 Storage에 올리고 advices.media_variants에 기록합니다. 끝나면 file_stream을 닫습니다."""
+    spool_path = None
     try:
-        # 파일 내용 읽기
-        file_content = await file.read()
+        # 변환 프로세스는 경로로 원본을 읽으므로 이름 있는 임시 파일로 옮깁니다 (응답 이후라 요청 지연에는 포함되지 않음)
+        spool_path = await run_in_threadpool(spool_copy, file_stream, settings.UPLOAD_CHUNK_SIZE)
+        rendered = await render_variants(spool_path, media_type)
+        stem = os.path.splitext(file_name)[0]
+        variants = {}
+        for name, variant_file in rendered.items():
+            try:
+                extension = os.path.splitext(variant_file)[1]
+                variant_path = f"variants/{stem}/{name}{extension}"
+                content_type = "image/webp" if extension == ".webp" else "image/jpeg"
+                with open(variant_file, "rb") as variant_stream:
+                    await run_sync(
+                        supabase.storage.from_(MEDIA_BUCKET).upload,
+                        path=variant_path,
+                        file=variant_stream,
+                        file_options={"content-type": content_type}
+                    )
+                variants[name] = normalize_media_url(supabase.storage.from_(MEDIA_BUCKET).get_public_url(variant_path))
+            finally:
+                os.unlink(variant_file)
         
+        if variants:
+            media_variant_cache.set(media_url, variants)
+            # 이미 조언이 저장된 경우 해당 행에도 기록
+            response = await execute(
+                supabase.table("advices").update({"media_variants": variants}).eq("media_url", media_url)
+            )
+            for author_id in {row["author_id"] for row in response.data or []}:
+                rows = [row for row in response.data if row["author_id"] == author_id]
+                await advices_changed(author_id, "advice.updated", {"advices": advice_payload(rows)})
+        logger.info("media variants generated", extra={"file_name": file_name, "variants": sorted(variants)})
+    except Exception:
+        logger.exception("media variant generation failed", extra={"file_name": file_name})
+    finally:
+        file_stream.close()
+        if spool_path:
+            os.unlink(spool_path)
+
+async def publish_media(
+    file_stream: BufferedReader,
+    filename: str,
+    content_type: str,
+    file_size: int,
+    background_tasks: BackgroundTasks
+) -> dict:
+    """파일 내용을 Storage에 올리고 {"url", "type"}을 반환합니다. file_stream을 닫는 책임을 넘겨받습니다.
+
+    storage3는 BufferedReader가 아닌 파일 객체를 경로로 보고 open()하므로 open(..., "rb")나 storage_reader()로 연 파일을 넘겨야 합니다.
+    """
+    try:
         # 파일명 생성 (UUID + 원본 확장자)
-        file_extension = os.path.splitext(file.filename)[1]
+        file_extension = os.path.splitext(filename)[1]
         file_name = f"{uuid.uuid4()}{file_extension}"
         
         # Supabase Storage에 업로드
-        bucket_name = "advice-media"
+        bucket_name = MEDIA_BUCKET
         
         # 버킷 체크는 건너뛰고 바로 업로드 시도 (버킷이 이미 존재함)
-        print(f"Proceeding with upload to existing bucket: {bucket_name}")
         
         # 파일 업로드 시도
         try:
-            response = supabase.storage.from_(bucket_name).upload(
-                path=file_name, 
-                file=file_content,
-                file_options={"content-type": file.content_type}
+            file_stream.seek(0)
+            response = await run_sync(
+                supabase.storage.from_(bucket_name).upload,
+                path=file_name,
+                file=file_stream,
+                file_options={"content-type": content_type}
             )
-            print(f"Upload response: {response}")
-            print(f"Upload response type: {type(response)}")
+            debug_sampled(logger, "storage upload response", response=response)
             
             # 업로드 성공 여부 확인
             if hasattr(response, 'error') and response.error:
-                print(f"Upload error in response: {response.error}")
+                logger.error("storage upload error", extra={"error": str(response.error)})
                 raise Exception(f"Upload failed: {response.error}")
-            
-            print(f"File uploaded successfully to bucket: {bucket_name}")
         except Exception as upload_exception:
-            print(f"Upload exception: {upload_exception}")
+            logger.warning("storage upload failed, retrying with positional arguments", extra={"error": str(upload_exception)})
             # 다른 방법으로 시도
             try:
-                response = supabase.storage.from_(bucket_name).upload(
-                    file_name, 
-                    file_content,
-                    {"content-type": file.content_type}
+                file_stream.seek(0)
+                response = await run_sync(
+                    supabase.storage.from_(bucket_name).upload,
+                    file_name,
+                    file_stream,
+                    {"content-type": content_type}
                 )
-                print(f"Alternative upload response: {response}")
+                debug_sampled(logger, "alternative storage upload response", response=response)
             except Exception as alt_exception:
-                print(f"Alternative upload also failed: {alt_exception}")
+                logger.error("alternative storage upload failed", extra={"error": str(alt_exception)})
                 raise alt_exception
         
         # 공개 URL 생성
         try:
             media_url = supabase.storage.from_(bucket_name).get_public_url(file_name)
-            print(f"Original Supabase URL: {media_url}")
         except Exception as url_error:
-            print(f"Error getting public URL: {url_error}")
+            logger.warning("get_public_url failed, building URL manually", extra={"error": str(url_error)})
             # 수동으로 URL 생성
             media_url = f"{settings.SUPABASE_URL}/storage/v1/object/public/{bucket_name}/{file_name}"
-            print(f"Manually created URL: {media_url}")
         
         # URL 정리 (세미콜론 제거 및 올바른 슬래시 형식)
-        if media_url:
-            # 세미콜론 제거
-            media_url = media_url.strip()
-            while media_url.endswith(';'):
-                media_url = media_url[:-1]
-            media_url = media_url.strip()
-            
-            # 슬래시 정리 (advice-media/ -> advice-media//)
-            if '/advice-media/' in media_url:
-                media_url = media_url.replace('/advice-media/', '/advice-media//')
-            
-            print(f"Cleaned media_url: {media_url}")
-            print(f"URL ends with semicolon: {media_url.endswith(';')}")
-            print(f"URL has correct double slash: {'/advice-media//' in media_url}")
+        media_url = normalize_media_url(media_url)
+        
+        media_type = "image" if content_type.startswith("image/") else "video"
         
-        media_type = "image" if file.content_type.startswith("image/") else "video"
+        # 썸네일/포스터 생성은 응답 이후 백그라운드에서 처리 (파일은 작업이 닫음)
+        if settings.MEDIA_VARIANTS_ENABLED:
+            background_tasks.add_task(process_media_variants, file_stream, file_name, media_type, media_url)
+            file_stream = None
         
-        print(f"File uploaded successfully: {media_url}")
-        print(f"Supabase URL: {settings.SUPABASE_URL}")
-        print(f"Bucket name: {bucket_name}")
-        print(f"File name: {file_name}")
+        logger.info("media uploaded", extra={
+            "bucket": bucket_name,
+            "file_name": file_name,
+            "media_type": media_type,
+            "size_bytes": file_size
+        })
         
         return {
             "url": media_url,
             "type": media_type
         }
-        
+    finally:
+        if file_stream:
+            file_stream.close()
+
+@router.post("/upload-media")
+async def upload_media(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    current_user: UserResponse = Depends(get_current_user)
+):
+    # 파일 타입 검증
+    if not file.content_type.startswith(('image/', 'video/')):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="이미지 또는 영상 파일만 업로드 가능합니다."
+        )
+    
+    # 파일 크기 제한 (본문 전체 크기는 UploadLimitMiddleware가 받는 중에 이미 제한함)
+    # 멀티파트 파서가 기록한 임시 파일(file.file)을 복사하지 않고 읽기 전용으로 다시 열어 Storage에 올립니다
+    # (FastAPI는 백그라운드 작업이 끝난 뒤 폼 파일을 닫으므로 썸네일 작업에서도 같은 파일을 읽을 수 있음)
+    if file.size > settings.MAX_UPLOAD_BYTES:
+        raise upload_too_large(settings.MAX_UPLOAD_BYTES)
+    UPLOAD_BYTES.labels("upload-media").inc(file.size)
+    
+    try:
+        return await publish_media(storage_reader(file.file), file.filename, file.content_type, file.size, background_tasks)
     except Exception as e:
-        print(f"General error in upload_media: {str(e)}")
+        logger.exception("upload_media failed")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"파일 업로드에 실패했습니다: {str(e)}"
         )
 
-@app.put("/advices/{advice_id}/favorite")
-async def toggle_advice_favorite(
-    advice_id: str,
+async def list_received_chunks(session: dict) -> List[int]:
+    """Storage에 저장된 청크 번호 목록을 조회합니다."""
+    objects = await run_sync(
+        supabase.storage.from_(MEDIA_BUCKET).list,
+        resumable.chunk_folder(session),
+        {"limit": resumable.total_chunks(session) + 10}
+    )
+    return [int(item["name"]) for item in objects or [] if item.get("name", "").isdigit()]
+
+def upload_session_response(session: dict, upload_id: str, received_indexes: List[int]) -> UploadSessionResponse:
+    return UploadSessionResponse(
+        upload_id=upload_id,
+        chunk_size=session["chunk_size"],
+        total_chunks=resumable.total_chunks(session),
+        received=resumable.received_ranges(session, received_indexes),
+        missing_chunks=resumable.missing_chunks(session, received_indexes)
+    )
+
+@router.post("/uploads", response_model=UploadSessionResponse)
+async def create_upload_session(
+    upload: UploadSessionCreate,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """재개 가능한 업로드 세션을 만듭니다. 이후 청크를 PUT하고 /complete로 마무리합니다."""
+    resumable.validate_new_upload(upload.content_type, upload.size)
+    session = resumable.create_upload_id(current_user.user_id, upload.filename, upload.content_type, upload.size)
+    return upload_session_response(session, session["upload_id"], [])
+
+@router.get("/uploads/{upload_id}", response_model=UploadSessionResponse)
+async def get_upload_session(
+    upload_id: str,
     current_user: UserResponse = Depends(get_current_user)
 ):
-    # 조언 조회
-    response = supabase.table("advices").select("*").eq("id", advice_id).execute()
+    """지금까지 받은 바이트 구간과 누락된 청크 번호를 반환합니다."""
+    session = resumable.decode_upload_id(upload_id, current_user.user_id)
+    return upload_session_response(session, upload_id, await list_received_chunks(session))
+
+@router.put("/uploads/{upload_id}/chunks/{index}")
+async def upload_chunk(
+    upload_id: str,
+    index: int,
+    request: Request,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """index번째 청크(요청 본문 전체)를 저장합니다. 같은 청크를 다시 보내면 덮어씁니다."""
+    session = resumable.decode_upload_id(upload_id, current_user.user_id)
+    expected_length = resumable.chunk_length(session, index)
     
-    if not response.data:
-        raise HTTPException(status_code=404, detail="조언을 찾을 수 없습니다")
+    spool_path, chunk_size = await spool_stream(request.stream(), expected_length)
+    UPLOAD_BYTES.labels("upload-chunk").inc(chunk_size)
+    try:
+        if chunk_size != expected_length:
+            raise HTTPException(
+                status_code=400,
+                detail=f"청크 크기가 올바르지 않습니다 (기대값 {expected_length}바이트, 받은 크기 {chunk_size}바이트)"
+            )
+        with open(spool_path, "rb") as chunk_stream:
+            await run_sync(
+                supabase.storage.from_(MEDIA_BUCKET).upload,
+                path=resumable.chunk_path(session, index),
+                file=chunk_stream,
+                file_options={"content-type": "application/octet-stream", "x-upsert": "true"}
+            )
+    finally:
+        os.unlink(spool_path)
+    
+    return {"index": index, "size": chunk_size}
+
+@router.post("/uploads/{upload_id}/complete")
+async def complete_upload_session(
+    upload_id: str,
+    background_tasks: BackgroundTasks,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """모든 청크가 도착하면 하나의 파일로 합쳐 저장하고 /upload-media와 같은 {"url", "type"}을 반환합니다."""
+    session = resumable.decode_upload_id(upload_id, current_user.user_id)
+    received_indexes = await list_received_chunks(session)
+    missing = resumable.missing_chunks(session, received_indexes)
+    if missing:
+        raise HTTPException(status_code=409, detail={"message": "아직 받지 못한 청크가 있습니다", "missing_chunks": missing})
+    
+    chunk_paths = [resumable.chunk_path(session, index) for index in range(resumable.total_chunks(session))]
     
-    advice = response.data[0]
+    # 청크를 하나씩 내려받아 임시 파일에 이어 붙임 (메모리에는 청크 하나만 유지)
+    async def download_chunks():
+        for path in chunk_paths:
+            yield await run_sync(supabase.storage.from_(MEDIA_BUCKET).download, path)
     
+    spool_path, file_size = await spool_stream(download_chunks(), session["size"])
+    try:
+        if file_size != session["size"]:
+            raise HTTPException(status_code=409, detail="합친 파일 크기가 세션 정보와 다릅니다")
+        # 읽기 전용으로 열어 둔 파일은 경로를 지워도 닫을 때까지 읽을 수 있음
+        file_stream = open(spool_path, "rb")
+    finally:
+        os.unlink(spool_path)
+    try:
+        result = await publish_media(file_stream, session["filename"], session["content_type"], file_size, background_tasks)
+    except Exception as e:
+        logger.exception("complete_upload_session failed")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"파일 업로드에 실패했습니다: {str(e)}"
+        )
+    
+    # 합친 뒤 청크 정리 (실패해도 업로드 결과에는 영향 없음)
+    try:
+        await run_sync(supabase.storage.from_(MEDIA_BUCKET).remove, chunk_paths)
+    except Exception:
+        logger.warning("failed to remove upload chunks", extra={"session_id": session["sid"]})
+    
+    return result
+
+@router.put("/advices/{advice_id}/favorite")
+async def toggle_advice_favorite(
+    advice_id: str,
+    current_user: UserResponse = Depends(get_current_user),
+    repository: Repository = Depends(get_repository)
+):
     # 권한 확인 (자녀만 즐겨찾기 가능)
     if current_user.user_type != "child":
         raise HTTPException(status_code=403, detail="자녀만 즐겨찾기를 사용할 수 있습니다")
     
-    if advice["author_id"] != current_user.father_id:
-        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-    
-    # 즐겨찾기 상태 토글
-    new_favorite_state = not advice["is_favorite"]
-    update_response = supabase.table("advices").update({"is_favorite": new_favorite_state}).eq("id", advice_id).execute()
+    # 즐겨찾기 상태 토글 (toggle_advice_favorite RPC가 SQL에서 값을 뒤집고 변경된 행을 반환)
+    update_response = await execute(supabase.rpc("toggle_advice_favorite", {
+        "advice_id_param": advice_id,
+        "author_id_param": current_user.father_id
+    }))
     
     if not update_response.data:
-        raise HTTPException(status_code=500, detail="상태 업데이트에 실패했습니다")
+        await raise_advice_write_error(advice_id, repository)
     
+    new_favorite_state = update_response.data[0]["is_favorite"]
+    await advices_changed(current_user.father_id, "advice.favorited", {"advices": advice_payload(update_response.data)})
     return {"message": f"즐겨찾기를 {'추가' if new_favorite_state else '제거'}했습니다"}
 
-@app.put("/advices/{advice_id}")
+@router.put("/advices/{advice_id}")
 async def update_advice(
     advice_id: str,
     advice_update: AdviceCreate,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    repository: Repository = Depends(get_repository)
 ):
     # 아버지만 수정 가능
     if current_user.user_type != "father":
         raise HTTPException(status_code=403, detail="아버지만 조언을 수정할 수 있습니다")
     
-    # 조언 조회
-    response = supabase.table("advices").select("*").eq("id", advice_id).execute()
-    if not response.data:
-        raise HTTPException(status_code=404, detail="조언을 찾을 수 없습니다")
-    advice = response.data[0]
-    
-    # 권한 확인
-    if advice["author_id"] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-    
-    # 조언 업데이트
-    # media_url에서 세미콜론 제거
-    media_url = advice_update.media_url
-    if media_url:
-        # 세미콜론 제거
-        media_url = media_url.rstrip(';')
-        print(f"Original media_url: {advice_update.media_url}")
-        print(f"Cleaned media_url: {media_url}")
+    # 조언 업데이트 (media_url은 저장 시 표준 형식으로 정리)
+    media_url = normalize_media_url(advice_update.media_url)
     
     update_data = {
         "category": advice_update.category,
@@ -620,77 +1292,130 @@ async def update_advice(
         "unlock_type": advice_update.unlockType,
         "password": advice_update.password
     }
+    # 변형 정보는 업로드 직후라 이 워커가 알고 있거나 미디어가 없을 때만 함께 기록합니다
+    # (media_variant_cache는 워커마다 따로 있고 1시간 뒤 사라지므로, 없다고 해서 기존 값을 지우면 안 됨)
+    variants = media_variant_cache.get(media_url) if media_url else None
+    if variants is not None or media_url is None:
+        update_data["media_variants"] = variants
+    
+    def owned_advice_update(changes: dict):
+        # 본인이 작성한 조언만 수정 (소유권 조건을 포함한 조건부 UPDATE)
+        return supabase.table("advices").update(changes).eq("id", advice_id).eq("author_id", current_user.user_id)
     
     try:
-        response = supabase.table("advices").update(update_data).eq("id", advice_id).execute()
-        if not response.data:
-            raise HTTPException(status_code=500, detail="조언 수정에 실패했습니다")
-        return AdviceResponse(**response.data[0])
+        if "media_variants" in update_data:
+            response = await execute(owned_advice_update(update_data))
+        else:
+            # media_url이 그대로면 기존 변형을 유지하고, 변형을 모르는 새 URL로 바뀐 경우에만 변형을 비웁니다
+            response = await execute(owned_advice_update(update_data).eq("media_url", media_url))
+            if not response.data:
+                response = await execute(owned_advice_update({**update_data, "media_variants": None}))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"조언 수정 중 오류 발생: {str(e)}")
+    
+    if not response.data:
+        await raise_advice_write_error(advice_id, repository)
+    await advices_changed(current_user.user_id, "advice.updated", {"advices": advice_payload(response.data)})
+    return AdviceResponse(**response.data[0])
 
-@app.delete("/advices/{advice_id}")
+@router.delete("/advices/{advice_id}")
 async def delete_advice(
     advice_id: str,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    repository: Repository = Depends(get_repository)
 ):
     # 아버지만 삭제 가능
     if current_user.user_type != "father":
         raise HTTPException(status_code=403, detail="아버지만 조언을 삭제할 수 있습니다")
     
-    # 조언 조회
-    response = supabase.table("advices").select("*").eq("id", advice_id).execute()
-    if not response.data:
-        raise HTTPException(status_code=404, detail="조언을 찾을 수 없습니다")
-    advice = response.data[0]
-    
-    # 권한 확인
-    if advice["author_id"] != current_user.user_id:
-        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
-    
-    # 조언 삭제
+    # 본인이 작성한 조언만 삭제 (소유권 조건을 포함한 조건부 DELETE)
     try:
-        supabase.table("advices").delete().eq("id", advice_id).execute()
-        return {"message": "조언이 성공적으로 삭제되었습니다"}
+        response = await execute(
+            supabase.table("advices").delete()
+            .eq("id", advice_id)
+            .eq("author_id", current_user.user_id)
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"조언 삭제 중 오류 발생: {str(e)}")
+    
+    if not response.data:
+        await raise_advice_write_error(advice_id, repository)
+    await advices_changed(current_user.user_id, "advice.deleted", {"ids": [advice_id]})
+    return {"message": "조언이 성공적으로 삭제되었습니다"}
 
-@app.get("/stats")
-async def get_stats(current_user: UserResponse = Depends(get_current_user)):
+@router.get("/stats")
+async def get_stats(
+    request: Request,
+    http_response: Response,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    cached, validator = await check_not_modified(request, http_response, current_user)
+    if cached is not None:
+        return cached
+    
+    # 같은 가족의 동시 요청은 하나의 RPC 호출을 공유
+    version = validator.version if validator is not None else None
     if current_user.user_type == "father":
-        # 아버지 통계
-        response = supabase.table("advices").select("*").eq("author_id", current_user.user_id).execute()
-        advices = response.data
+        # 아버지 통계 (집계는 get_advice_stats RPC에서 처리)
+        response = await execute_shared(
+            ("get_advice_stats", current_user.user_id, version, None),
+            supabase.rpc("get_advice_stats", {"author_id_param": current_user.user_id})
+        )
+        stats = response.data
         
         return {
-            "total_advices": len(advices),
-            "read_advices": len([a for a in advices if a["is_read"]]),
-            "unread_advices": len([a for a in advices if not a["is_read"]])
+            "total_advices": stats["total_advices"],
+            "read_advices": stats["read_advices"],
+            "unread_advices": stats["unread_advices"]
         }
     else:
-        # 자녀 통계
-        response = supabase.table("advices").select("*").eq("author_id", current_user.father_id).execute()
-        advices = response.data
-        
-        # 사용자의 현재 나이 가져오기
-        user_response = supabase.table("users").select("age").eq("id", current_user.id).execute()
-        current_age = user_response.data[0].get("age") if user_response.data and user_response.data[0].get("age") is not None else 25
+        # 사용자의 현재 나이 (get_current_user가 읽은 행을 그대로 사용)
+        current_age = current_user.age if current_user.age is not None else 25
         
-        available_advices = [a for a in advices if a["target_age"] <= current_age]
-        future_advices = [a for a in advices if a["target_age"] > current_age]
-        favorite_advices = [a for a in advices if a["is_favorite"]]
+        # 자녀 통계
+        response = await execute_shared(
+            ("get_advice_stats", current_user.father_id, version, current_age),
+            supabase.rpc("get_advice_stats", {
+                "author_id_param": current_user.father_id,
+                "current_age_param": current_age
+            })
+        )
+        stats = response.data
         
         return {
-            "available_advices": len(available_advices),
-            "future_advices": len(future_advices),
-            "favorite_advices": len(favorite_advices),
+            "available_advices": stats["available_advices"],
+            "future_advices": stats["future_advices"],
+            "favorite_advices": stats["favorite_advices"],
             "current_age": current_age
         }
 
-@app.put("/users/age")
+async def publish_unlocked_advices(child: UserResponse, new_age: int):
+    """나이 변경으로 새로 열람 가능해진 조언을 advice.unlocked 이벤트로 알립니다."""
+    previous_age = child.age if child.age is not None else 25
+    if new_age <= previous_age or not child.father_id:
+        return
+    try:
+        response = await execute(
+            supabase.table("advices").select("*")
+            .eq("author_id", child.father_id)
+            .gt("target_age", previous_age)
+            .lte("target_age", new_age)
+        )
+    except Exception:
+        logger.warning("unlocked advice lookup failed", exc_info=True)
+        return
+    if response.data:
+        await event_hub.publish(child.father_id, "advice.unlocked", {
+            "user_id": child.id,
+            "age": new_age,
+            "advices": advice_payload(response.data)
+        })
+
+@router.put("/users/age")
 async def update_user_age(
     age_update: AgeUpdate,
-    current_user: UserResponse = Depends(get_current_user)
+    current_user: UserResponse = Depends(get_current_user),
+    repository: Repository = Depends(get_repository)
 ):
     """자녀의 나이를 업데이트합니다."""
     if current_user.user_type != "child":
@@ -700,57 +1425,92 @@ async def update_user_age(
         raise HTTPException(status_code=400, detail="유효한 나이를 입력해주세요 (0-120세)")
     
     try:
-        response = supabase.table("users").update({"age": age_update.age}).eq("id", current_user.id).execute()
+        response = await execute(supabase.table("users").update({"age": age_update.age}).eq("id", current_user.id))
+        await user_changed(current_user.id)
         if not response.data:
             raise HTTPException(status_code=500, detail="나이 업데이트에 실패했습니다")
+        # 갱신된 행으로 사용자 캐시를 채워 다음 요청의 재조회를 생략
+        repository.remember_user(response.data[0])
         
+        await publish_unlocked_advices(current_user, age_update.age)
         return {"message": "나이가 성공적으로 업데이트되었습니다", "age": age_update.age}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"나이 업데이트 중 오류 발생: {str(e)}")
 
-@app.get("/stats/age-distribution")
-async def get_age_distribution(current_user: UserResponse = Depends(get_current_user)):
+async def event_stream(author_id: str):
+    subscription = await event_hub.subscribe(author_id)
+    EVENT_SUBSCRIBERS.inc()
+    try:
+        # 연결 직후 재연결 간격을 알리고, 이벤트가 없어도 주기적으로 주석 줄을 보내 프록시 타임아웃을 막습니다
+        yield f"retry: {settings.SSE_RETRY_MILLISECONDS}\n\n".encode()
+        while True:
+            message = await subscription.get(settings.SSE_HEARTBEAT_SECONDS)
+            yield message if message is not None else b": keep-alive\n\n"
+    finally:
+        EVENT_SUBSCRIBERS.dec()
+        await subscription.close()
+
+@router.get("/events")
+async def stream_events(request: Request, token: Optional[str] = None):
+    """가족의 조언 변경 이벤트를 Server-Sent Events로 전달합니다.
+
+    브라우저 EventSource는 헤더를 지정할 수 없으므로 Authorization 헤더 대신 ?token=<access_token>도 허용합니다.
+    """
+    authorization = request.headers.get("authorization", "")
+    if authorization.lower().startswith("bearer "):
+        token = authorization[7:]
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+    current_user = await authenticate_token(token, get_repository())
+    
+    author_id = family_author_id(current_user)
+    if not author_id:
+        raise HTTPException(status_code=400, detail="연결된 아버지 계정이 없습니다")
+    return StreamingResponse(
+        event_stream(author_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/stats/age-distribution")
+async def get_age_distribution(
+    request: Request,
+    http_response: Response,
+    current_user: UserResponse = Depends(get_current_user)
+):
     """연령별 메시지 분포 통계를 반환합니다."""
+    cached, validator = await check_not_modified(request, http_response, current_user)
+    if cached is not None:
+        return cached
+    
     if current_user.user_type == "father":
         # 아버지가 자신이 작성한 메시지들의 연령별 분포 확인
-        response = supabase.table("advices").select("*").eq("author_id", current_user.user_id).execute()
+        author_id = current_user.user_id
     else:
         # 자녀가 아버지가 작성한 메시지들의 연령별 분포 확인
-        response = supabase.table("advices").select("*").eq("author_id", current_user.father_id).execute()
-    
-    advices = response.data
+        author_id = current_user.father_id
     
-    # 연령별 분포 계산
-    age_distribution = {}
-    for advice in advices:
-        age = advice["target_age"]
-        if age not in age_distribution:
-            age_distribution[age] = 0
-        age_distribution[age] += 1
-    
-    # 연령순으로 정렬
-    sorted_distribution = dict(sorted(age_distribution.items()))
+    # 연령별 분포 및 연령대 구간은 get_advice_age_distribution RPC에서 한 번에 집계
+    response = await execute_shared(
+        ("get_advice_age_distribution", author_id, validator.version if validator is not None else None),
+        supabase.rpc("get_advice_age_distribution", {"author_id_param": author_id})
+    )
+    distribution = response.data
     
-    # 현재 사용자의 나이 정보 가져오기
-    user_response = supabase.table("users").select("age").eq("id", current_user.id).execute()
-    current_age = user_response.data[0].get("age") if user_response.data else None
+    # 현재 사용자의 나이 정보 (get_current_user가 읽은 행을 그대로 사용)
+    current_age = current_user.age
     
     return {
-        "age_distribution": sorted_distribution,
-        "total_messages": len(advices),
+        "age_distribution": distribution["age_distribution"],
+        "total_messages": distribution["total_messages"],
         "current_age": current_age,
-        "age_ranges": {
-            "childhood": sum(1 for a in advices if a["target_age"] <= 12),
-            "teenage": sum(1 for a in advices if 13 <= a["target_age"] <= 19),
-            "twenties": sum(1 for a in advices if 20 <= a["target_age"] <= 29),
-            "thirties": sum(1 for a in advices if 30 <= a["target_age"] <= 39),
-            "forties": sum(1 for a in advices if 40 <= a["target_age"] <= 49),
-            "fifties": sum(1 for a in advices if 50 <= a["target_age"] <= 59),
-            "sixties_plus": sum(1 for a in advices if a["target_age"] >= 60)
-        }
+        "age_ranges": distribution["age_ranges"]
     }
 
+app = create_app()
+
 if __name__ == "__main__":
+    # 개발용 실행 (운영은 gunicorn.conf.py 참고)
     import uvicorn
     port = int(os.environ.get("PORT", 8080))
-    uvicorn.run(app, host="0.0.0.0", port=port) 
\ No newline at end of file
+    uvicorn.run("main:app", host="0.0.0.0", port=port, workers=settings.WEB_CONCURRENCY) 
\ No newline at end of file
@@ -0,0 +1,133 @@
+import io
+import os
+import re
+import shutil
+import tempfile
+from typing import AsyncIterator, BinaryIO, Iterable, Optional, Tuple
+
+import anyio
+from fastapi import HTTPException, status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+MEDIA_BUCKET = "advice-media"
+
+_TRAILING_JUNK = re.compile(r"[\s;]+$")
+_BUCKET_PATH = re.compile(rf"/{MEDIA_BUCKET}/+")
+
+def normalize_media_url(media_url: Optional[str]) -> Optional[str]:
+    """media_url을 저장용 표준 형식으로 정리합니다.
+
+    - 앞뒤 공백과 끝의 세미콜론(여러 개 포함) 제거
+    - /advice-media/ 뒤의 슬래시 개수를 항상 2개(/advice-media//)로 맞춤
+    - 빈 문자열은 None으로 저장
+
+    쓰기(조언 생성/수정, 업로드) 시에만 호출하며, 조회 시에는 저장된 값을 그대로 반환합니다.
+    normalize_media_urls.sql의 백필 쿼리와 동일한 규칙입니다.
+    """
+    if media_url is None:
+        return None
+    media_url = _TRAILING_JUNK.sub("", media_url.strip())
+    if not media_url:
+        return None
+    return _BUCKET_PATH.sub(f"/{MEDIA_BUCKET}//", media_url)
+
+def upload_too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"파일 크기는 {max_bytes // (1024 * 1024)}MB 이하여야 합니다."
+    )
+
+async def write_chunks(chunks: AsyncIterator[bytes], spool: BinaryIO, max_bytes: int) -> int:
+    """바이트 청크 스트림을 spool에 기록하고 바이트 수를 반환합니다. 누적 크기가 max_bytes를 넘는 즉시 413으로 중단합니다."""
+    size = 0
+    async for chunk in chunks:
+        size += len(chunk)
+        if size > max_bytes:
+            raise upload_too_large(max_bytes)
+        spool.write(chunk)
+    return size
+
+async def spool_stream(chunks: AsyncIterator[bytes], max_bytes: int) -> Tuple[str, int]:
+    """바이트 청크 스트림을 임시 파일에 기록하고 (경로, 바이트 수)를 반환합니다.
+
+    전체 내용을 메모리에 올리지 않으며, 누적 크기가 max_bytes를 넘는 즉시 413으로 중단합니다.
+    반환된 임시 파일은 호출한 쪽에서 삭제해야 합니다.
+    """
+    fd, path = tempfile.mkstemp(prefix="advice-upload-")
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            size = await write_chunks(chunks, spool, max_bytes)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path, size
+
+def storage_reader(stream: BinaryIO) -> io.BufferedReader:
+    """Storage 업로드에 넘길 읽기 전용 BufferedReader를 반환합니다.
+
+    storage3의 upload는 BufferedReader/FileIO/bytes만 내용으로 보내고 그 밖의 객체는 경로로 보고 open()하므로,
+    멀티파트 파서의 SpooledTemporaryFile은 같은 파일 디스크립터를 다시 열어 복사 없이 넘깁니다.
+    반환된 파일을 닫아도 원래 파일은 닫히지 않습니다.
+    """
+    return open(stream.fileno(), "rb", closefd=False)
+
+def spool_copy(stream: BinaryIO, chunk_size: int) -> str:
+    """파일 객체의 내용을 이름 있는 임시 파일로 복사하고 경로를 반환합니다 (다른 프로세스가 경로로 읽어야 할 때).
+
+    반환된 임시 파일은 호출한 쪽에서 삭제해야 합니다.
+    """
+    fd, path = tempfile.mkstemp(prefix="advice-upload-")
+    try:
+        with os.fdopen(fd, "wb") as spool:
+            stream.seek(0)
+            shutil.copyfileobj(stream, spool, chunk_size)
+    except BaseException:
+        os.unlink(path)
+        raise
+    return path
+
+class UploadLimitMiddleware:
+    """지정한 경로의 요청 본문 크기를 제한합니다.
+
+    Content-Length가 한도를 넘으면 본문을 읽기 전에 413을 반환하고, 길이를 알 수 없거나(chunked) 실제 본문이 더 길면
+    받은 바이트를 세다가 한도를 넘는 순간 413으로 중단합니다. 멀티파트 파서가 본문 전체를 임시 파일에 쓰기 전에 멈춥니다.
+    한도는 파일 크기(max_bytes)에 멀티파트 헤더/경계 여유분(overhead)을 더한 값입니다.
+    """
+
+    def __init__(self, app: ASGIApp, paths: Iterable[str], max_bytes: int, overhead: int = 0) -> None:
+        self.app = app
+        self.paths = set(paths)
+        self.max_bytes = max_bytes
+        self.limit = max_bytes + overhead
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+
+        for key, value in scope["headers"]:
+            if key == b"content-length" and value.isdigit() and int(value) > self.limit:
+                error = upload_too_large(self.max_bytes)
+                response = JSONResponse(status_code=error.status_code, content={"detail": error.detail})
+                await response(scope, receive, send)
+                return
+
+        received = 0
+        exceeded = False
+
+        async def limited_receive() -> Message:
+            nonlocal received, exceeded
+            if exceeded:
+                # 중단한 본문은 더 읽지 않습니다. 413 응답을 보내는 동안 연결 종료를 기다리는 쪽은 응답이 끝나면 취소됩니다
+                await anyio.sleep_forever()
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.limit:
+                    exceeded = True
+                    # 본문을 파싱하는 FastAPI가 HTTPException을 그대로 413 응답으로 바꿉니다
+                    raise upload_too_large(self.max_bytes)
+            return message
+
+        await self.app(scope, limited_receive, send)
@@ -0,0 +1,83 @@
+import asyncio
+import logging
+import multiprocessing
+import os
+import shutil
+import subprocess
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Optional
+
+from config import settings
+
+logger = logging.getLogger("advice.media")
+
+# 썸네일/포스터 생성은 CPU를 많이 쓰므로 별도 프로세스 풀에서 실행합니다.
+# 웹 서버 프로세스에는 스레드(Supabase 풀, 로그 리스너)가 있으므로 fork 대신 spawn을 사용합니다.
+_executor: Optional[ProcessPoolExecutor] = None
+
+def _get_executor() -> ProcessPoolExecutor:
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=settings.MEDIA_WORKERS,
+            mp_context=multiprocessing.get_context("spawn"),
+        )
+    return _executor
+
+def _variant_widths() -> list:
+    return sorted(int(width) for width in settings.MEDIA_VARIANT_WIDTHS.split(",") if width.strip())
+
+def render_image_variants(source_path: str, widths: list, quality: int) -> Dict[str, str]:
+    """원본 이미지에서 너비별 WebP 변형을 만들고 {이름: 임시 파일 경로}를 반환합니다. (워커 프로세스에서 실행)"""
+    from PIL import Image, ImageOps
+
+    variants = {}
+    with Image.open(source_path) as image:
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA" if "transparency" in image.info else "RGB")
+        for width in widths:
+            if width >= image.width and variants:
+                # 원본보다 큰 변형은 만들지 않습니다 (가장 작은 변형은 항상 생성)
+                break
+            height = max(1, round(image.height * min(width, image.width) / image.width))
+            resized = image.resize((min(width, image.width), height), Image.LANCZOS)
+            fd, path = tempfile.mkstemp(prefix="advice-variant-", suffix=".webp")
+            with os.fdopen(fd, "wb") as output:
+                resized.save(output, format="WEBP", quality=quality, method=4)
+            variants[f"w{width}"] = path
+    return variants
+
+def render_video_poster(source_path: str, width: int) -> Dict[str, str]:
+    """ffmpeg로 영상의 대표 프레임을 JPEG 포스터로 추출합니다. ffmpeg가 없으면 빈 결과를 반환합니다. (워커 프로세스에서 실행)"""
+    ffmpeg = shutil.which("ffmpeg")
+    if ffmpeg is None:
+        return {}
+    fd, path = tempfile.mkstemp(prefix="advice-poster-", suffix=".jpg")
+    os.close(fd)
+    result = subprocess.run(
+        [ffmpeg, "-y", "-loglevel", "error", "-i", source_path,
+         "-vf", f"thumbnail,scale={width}:-2", "-frames:v", "1", path],
+        capture_output=True,
+        timeout=60,
+    )
+    if result.returncode != 0 or os.path.getsize(path) == 0:
+        os.unlink(path)
+        return {}
+    return {"poster": path}
+
+async def render_variants(source_path: str, media_type: str) -> Dict[str, str]:
+    """미디어 종류에 맞는 변형 파일을 프로세스 풀에서 생성합니다."""
+    loop = asyncio.get_running_loop()
+    if media_type == "image":
+        return await loop.run_in_executor(
+            _get_executor(), render_image_variants, source_path, _variant_widths(), settings.MEDIA_VARIANT_QUALITY
+        )
+    return await loop.run_in_executor(
+        _get_executor(), render_video_poster, source_path, max(_variant_widths(), default=640)
+    )
+
+def shutdown() -> None:
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,163 @@
+import os
+import time
+from contextlib import contextmanager
+from typing import Iterator
+
+from prometheus_client import CONTENT_TYPE_LATEST, CollectorRegistry, Counter, Gauge, Histogram, REGISTRY, generate_latest
+from prometheus_client import multiprocess
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Prometheus 지표 (GET /metrics)
+# 요청 지연은 라우트 템플릿(/advices/{advice_id}) 기준으로 기록해 ID별로 라벨이 늘어나지 않게 합니다.
+# Supabase 호출은 서비스(postgrest/rpc/storage), 대상(테이블/RPC/버킷), 동작별로 나눠 기록하므로
+# 지연이 bcrypt, PostgREST, Storage 중 어디서 생기는지 비교할 수 있습니다.
+# 여러 워커로 실행할 때는 PROMETHEUS_MULTIPROC_DIR을 지정하면 모든 워커의 지표를 합산해 보여줍니다.
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+HTTP_REQUEST_DURATION = Histogram(
+    "advice_http_request_duration_seconds",
+    "HTTP 요청 처리 시간",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    "advice_http_requests_in_flight",
+    "처리 중인 HTTP 요청 수",
+    multiprocess_mode="livesum",
+)
+UPSTREAM_DURATION = Histogram(
+    "advice_upstream_duration_seconds",
+    "Supabase 호출 시간 (스레드 풀 대기 포함)",
+    ["service", "target", "operation"],
+    buckets=LATENCY_BUCKETS,
+)
+UPSTREAM_ERRORS = Counter(
+    "advice_upstream_errors_total",
+    "실패한 Supabase 호출 수",
+    ["service", "target", "operation"],
+)
+UPSTREAM_IN_FLIGHT = Gauge(
+    "advice_upstream_in_flight",
+    "진행 중인 Supabase 호출 수",
+    ["service"],
+    multiprocess_mode="livesum",
+)
+PASSWORD_HASH_DURATION = Histogram(
+    "advice_password_hash_duration_seconds",
+    "bcrypt 해시/검증 시간 (대기열 포함)",
+    ["operation"],
+    buckets=LATENCY_BUCKETS,
+)
+PASSWORD_HASH_REJECTED = Counter(
+    "advice_password_hash_rejected_total",
+    "해시 대기열이 가득 차 503으로 거절한 요청 수",
+)
+RATE_LIMITED = Counter(
+    "advice_rate_limited_total",
+    "요청 수 제한으로 429를 반환한 요청 수",
+    ["route", "scope"],
+)
+LOAD_SHED = Counter(
+    "advice_load_shed_total",
+    "동시 처리 수 제한으로 503을 반환한 요청 수",
+)
+CACHE_LOOKUPS = Counter(
+    "advice_cache_lookups_total",
+    "캐시 조회 수 (stale은 적중했지만 가족 버전이 달라 버린 조회)",
+    ["cache", "result"],
+)
+CACHE_EVICTIONS = Counter(
+    "advice_cache_evictions_total",
+    "크기 제한으로 제거된 캐시 항목 수",
+    ["cache"],
+)
+SINGLEFLIGHT_SHARED = Counter(
+    "advice_singleflight_shared_total",
+    "진행 중인 같은 조회의 결과를 공유한 요청 수",
+)
+EVENT_SUBSCRIBERS = Gauge(
+    "advice_event_subscribers",
+    "연결된 SSE 구독자 수",
+    multiprocess_mode="livesum",
+)
+UPLOAD_BYTES = Counter(
+    "advice_upload_bytes_total",
+    "업로드로 받은 바이트 수",
+    ["endpoint"],
+)
+
+@contextmanager
+def observe_upstream(service: str, target: str, operation: str) -> Iterator[None]:
+    UPSTREAM_IN_FLIGHT.labels(service).inc()
+    started = time.perf_counter()
+    try:
+        yield
+    except BaseException:
+        UPSTREAM_ERRORS.labels(service, target, operation).inc()
+        raise
+    finally:
+        UPSTREAM_DURATION.labels(service, target, operation).observe(time.perf_counter() - started)
+        UPSTREAM_IN_FLIGHT.labels(service).dec()
+
+@contextmanager
+def observe_password_hash(operation: str) -> Iterator[None]:
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        PASSWORD_HASH_DURATION.labels(operation).observe(time.perf_counter() - started)
+
+def route_template(scope: Scope) -> str:
+    route = scope.get("route")
+    # 매칭되지 않은 경로(404)는 하나의 라벨로 묶습니다
+    return getattr(route, "path", None) or "unmatched"
+
+class MetricsMiddleware:
+    """요청별 처리 시간과 상태 코드를 라우트 템플릿 기준으로 기록합니다."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        finished = False
+
+        def finish() -> None:
+            # 응답 본문을 다 보낸 시점까지 기록합니다 (이후의 BackgroundTasks 시간은 제외)
+            nonlocal finished
+            if finished:
+                return
+            finished = True
+            HTTP_REQUESTS_IN_FLIGHT.dec()
+            HTTP_REQUEST_DURATION.labels(scope["method"], route_template(scope), str(status_code)).observe(
+                time.perf_counter() - started
+            )
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                finish()
+
+        HTTP_REQUESTS_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            finish()
+
+def render_latest() -> tuple:
+    """(본문, Content-Type)을 반환합니다."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
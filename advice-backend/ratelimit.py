@@ -0,0 +1,333 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from collections import OrderedDict, deque
+from typing import Any, Callable, Deque, List, NamedTuple, Optional, Tuple
+
+import orjson
+from starlette.routing import compile_path
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+from metrics import LOAD_SHED, RATE_LIMITED
+
+logger = logging.getLogger("advice.ratelimit")
+
+# 요청 수 제한과 과부하 시 빠른 거절 (admission control)
+# 1) 라우트별 토큰 버킷: RATE_LIMITS에 지정한 라우트는 사용자/IP별 버킷에서 토큰을 하나씩 꺼내고, 비어 있으면 429를 반환합니다.
+#    버킷은 기본적으로 프로세스 메모리에 있으며, RATE_LIMIT_URL(Redis)을 지정하면 모든 워커가 같은 버킷을 씁니다.
+# 2) 전체 동시 처리 수 제한: MAX_CONCURRENT_REQUESTS개를 넘으면 REQUEST_QUEUE_SIZE개까지만 잠시 기다리게 하고,
+#    대기열이 가득 찼거나 REQUEST_QUEUE_TIMEOUT_MS 안에 차례가 오지 않으면 바로 503을 반환합니다.
+# 본문을 읽기 전에 판단하므로 거절된 업로드는 버퍼링되지 않습니다.
+
+# 동시 처리 수에 포함하지 않는 경로 (상태 확인, 지표, 오래 연결되는 SSE)
+EXEMPT_PATHS = {"/healthz", "/readyz", "/metrics", "/events"}
+
+PERIODS = {"s": 1, "m": 60, "h": 3600}
+_LIMIT_PATTERN = re.compile(r"^(user|ip):(\d+)/(\d*)([smh])$")
+
+class Limit(NamedTuple):
+    scope: str  # user 또는 ip
+    capacity: int  # 버킷 크기 (연속으로 허용하는 요청 수)
+    rate: float  # 초당 채워지는 토큰 수
+
+class RateLimitRule(NamedTuple):
+    method: str
+    route: str
+    pattern: re.Pattern
+    limits: Tuple[Limit, ...]
+
+def parse_limit(text: str) -> Limit:
+    """user:120/m → 사용자별로 1분에 120개 (10/30s처럼 기간 앞에 숫자를 붙일 수 있음)"""
+    match = _LIMIT_PATTERN.match(text.strip())
+    if not match:
+        raise ValueError(f"잘못된 요청 제한 형식입니다: {text!r}")
+    scope, count, multiplier, unit = match.groups()
+    period = int(multiplier or 1) * PERIODS[unit]
+    return Limit(scope, int(count), int(count) / period)
+
+def parse_rules(spec: str) -> List[RateLimitRule]:
+    """RATE_LIMITS 값을 규칙 목록으로 바꿉니다.
+
+    형식: "METHOD /route=scope:count/period[,scope:count/period];..."
+    예: "POST /auth/login=ip:10/m;GET /advices=user:120/m" (route는 라우트 템플릿, METHOD와 route에 * 사용 가능)
+    """
+    rules = []
+    for item in spec.split(";"):
+        if not item.strip():
+            continue
+        target, _, limits = item.partition("=")
+        method, _, route = target.strip().partition(" ")
+        route = route.strip()
+        pattern = re.compile(".*") if route == "*" else compile_path(route)[0]
+        rules.append(RateLimitRule(
+            method.upper(),
+            route,
+            pattern,
+            tuple(parse_limit(limit) for limit in limits.split(",") if limit.strip()),
+        ))
+    return rules
+
+def take_token(state: Optional[List[float]], limit: Limit, now: float) -> Tuple[List[float], float]:
+    """토큰 버킷에서 토큰 하나를 꺼냅니다. (새 상태 [tokens, updated_at], 다시 시도할 때까지 기다릴 초)를 반환하며 0초면 허용입니다."""
+    tokens, updated_at = state if state is not None else (limit.capacity, now)
+    tokens = min(limit.capacity, tokens + max(0.0, now - updated_at) * limit.rate)
+    if tokens >= 1:
+        return [tokens - 1, now], 0.0
+    return [tokens, now], (1 - tokens) / limit.rate
+
+class LocalRateLimitBackend:
+    """프로세스 내 토큰 버킷 저장소 (오래 쓰지 않은 키부터 max_keys개까지만 유지)"""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    async def take(self, key: str, limit: Limit) -> float:
+        state, retry_after = take_token(self._buckets.get(key), limit, time.monotonic())
+        self._buckets[key] = state
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+    def stats(self) -> dict:
+        return {"backend": "local", "keys": len(self._buckets)}
+
+# Redis 서버 시간으로 계산하므로 워커 간 시계 차이의 영향을 받지 않습니다
+_TOKEN_BUCKET_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+local tokens = tonumber(state[1]) or capacity
+local updated_at = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated_at) * rate)
+local retry_after = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    retry_after = (1 - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tokens, 'updated_at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(retry_after)
+"""
+
+class RedisRateLimitBackend:
+    """여러 워커가 공유하는 Redis 토큰 버킷 (redis.asyncio.Redis 호환 클라이언트, 키마다 해시 하나)"""
+
+    def __init__(self, client: Any, prefix: str = "ratelimit"):
+        self.client = client
+        self.prefix = prefix
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def take(self, key: str, limit: Limit) -> float:
+        retry_after = await self._script(keys=[f"{self.prefix}:{key}"], args=[limit.capacity, limit.rate])
+        return float(retry_after)
+
+    def stats(self) -> dict:
+        return {"backend": "redis"}
+
+class RateLimiter:
+    def __init__(self, backend, rules: List[RateLimitRule]):
+        self.backend = backend
+        self.rules = rules
+
+    def match(self, method: str, path: str) -> Optional[RateLimitRule]:
+        for rule in self.rules:
+            if rule.method in (method, "*") and rule.pattern.match(path):
+                return rule
+        return None
+
+    async def check(self, rule: RateLimitRule, user_id: Optional[str], client_ip: str) -> float:
+        """규칙의 모든 버킷에서 토큰을 꺼냅니다. 하나라도 비어 있으면 기다려야 할 초를, 모두 허용이면 0을 반환합니다.
+
+        로그인하지 않은 요청의 user 제한은 IP 기준으로 적용합니다.
+        저장소 오류가 나면 기록만 하고 요청을 허용합니다.
+        """
+        for index, limit in enumerate(rule.limits):
+            subject = f"user:{user_id}" if limit.scope == "user" and user_id else f"ip:{client_ip}"
+            key = f"{rule.method} {rule.route}:{index}:{subject}"
+            try:
+                retry_after = await self.backend.take(key, limit)
+            except Exception:
+                logger.warning("rate limit backend failed", exc_info=True)
+                return 0.0
+            if retry_after > 0:
+                RATE_LIMITED.labels(rule.route, limit.scope).inc()
+                return retry_after
+        return 0.0
+
+    def stats(self) -> dict:
+        return self.backend.stats()
+
+class ConcurrencyLimiter:
+    """동시에 처리하는 요청 수를 제한합니다. 자리가 없으면 대기열에서 잠시 기다리고, 그것도 안 되면 거절합니다."""
+
+    def __init__(self, limit: int, queue_size: int, queue_timeout: float):
+        self.limit = limit
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.rejected = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+
+    async def acquire(self) -> bool:
+        if self.active < self.limit and not self._waiters:
+            self.active += 1
+            return True
+        if len(self._waiters) >= self.queue_size:
+            self.rejected += 1
+            return False
+
+        loop = asyncio.get_running_loop()
+        waiter = loop.create_future()
+        self._waiters.append(waiter)
+        timer = loop.call_later(self.queue_timeout, lambda: waiter.done() or waiter.set_result(False))
+        try:
+            acquired = await waiter
+        except asyncio.CancelledError:
+            # 자리를 넘겨받은 직후 취소된 경우 자리를 돌려줍니다
+            if waiter.done() and not waiter.cancelled() and waiter.result():
+                self.release()
+            raise
+        finally:
+            timer.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        if not acquired:
+            self.rejected += 1
+        return acquired
+
+    def release(self) -> None:
+        # 기다리는 요청이 있으면 자리를 바로 넘겨줍니다 (active는 그대로)
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(True)
+                return
+        self.active -= 1
+
+    def stats(self) -> dict:
+        return {"limit": self.limit, "active": self.active, "waiting": len(self._waiters), "rejected": self.rejected}
+
+def client_ip(scope: Scope, trusted_hops: int = 0) -> str:
+    """요청 수 제한에 쓸 클라이언트 주소
+
+    X-Forwarded-For의 왼쪽 항목은 클라이언트가 마음대로 넣을 수 있으므로, 신뢰하는 프록시 수(trusted_hops)만큼
+    오른쪽에서 센 항목을 씁니다. 프록시가 없거나(0) 항목이 모자라면 연결한 상대 주소를 씁니다.
+    """
+    if trusted_hops > 0:
+        hops = [
+            host.strip()
+            for key, value in scope["headers"] if key == b"x-forwarded-for"
+            for host in value.decode("latin-1").split(",")
+        ]
+        if len(hops) >= trusted_hops and hops[-trusted_hops]:
+            return hops[-trusted_hops]
+    client = scope.get("client")
+    return client[0] if client else "unknown"
+
+def bearer_token(scope: Scope) -> Optional[str]:
+    for key, value in scope["headers"]:
+        if key == b"authorization":
+            scheme, _, token = value.decode("latin-1").partition(" ")
+            return token if scheme.lower() == "bearer" and token else None
+    return None
+
+class AdmissionControlMiddleware:
+    """요청 본문을 읽기 전에 요청 수 제한(429)과 동시 처리 수 제한(503)을 적용합니다.
+
+    identify_user는 Bearer 토큰에서 사용자 ID를 꺼내는 함수로, DB를 조회하지 않아야 합니다.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        limiter: RateLimiter,
+        concurrency: Optional[ConcurrencyLimiter],
+        identify_user: Callable[[str], Optional[str]],
+        trusted_proxy_hops: int = 0,
+    ) -> None:
+        self.app = app
+        self.limiter = limiter
+        self.concurrency = concurrency
+        self.identify_user = identify_user
+        self.trusted_proxy_hops = trusted_proxy_hops
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        rule = self.limiter.match(scope["method"], scope["path"])
+        if rule is not None:
+            token = bearer_token(scope)
+            user_id = self.identify_user(token) if token else None
+            retry_after = await self.limiter.check(rule, user_id, client_ip(scope, self.trusted_proxy_hops))
+            if retry_after > 0:
+                await self._reject(send, 429, "요청이 너무 많습니다. 잠시 후 다시 시도해주세요", retry_after)
+                return
+
+        if self.concurrency is None or scope["path"] in EXEMPT_PATHS:
+            await self.app(scope, receive, send)
+            return
+
+        if not await self.concurrency.acquire():
+            LOAD_SHED.inc()
+            await self._reject(send, 503, "서버가 혼잡합니다. 잠시 후 다시 시도해주세요", 1)
+            return
+
+        # 응답 본문을 다 보내면 바로 자리를 돌려줍니다 (이후의 BackgroundTasks는 동시 처리 수에 넣지 않음)
+        released = False
+
+        def release() -> None:
+            nonlocal released
+            if not released:
+                released = True
+                self.concurrency.release()
+
+        async def send_wrapper(message: Message) -> None:
+            await send(message)
+            if message["type"] == "http.response.body" and not message.get("more_body", False):
+                release()
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            release()
+
+    async def _reject(self, send: Send, status_code: int, detail: str, retry_after: float) -> None:
+        # HTTPException과 같은 {"detail": ...} 형식
+        body = orjson.dumps({"detail": detail})
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+                (b"retry-after", str(max(1, math.ceil(retry_after))).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+def create_rate_limiter() -> RateLimiter:
+    rules = parse_rules(settings.RATE_LIMITS)
+    if settings.RATE_LIMIT_URL:
+        import redis.asyncio as redis
+
+        return RateLimiter(RedisRateLimitBackend(redis.Redis.from_url(settings.RATE_LIMIT_URL)), rules)
+    return RateLimiter(LocalRateLimitBackend(settings.RATE_LIMIT_MAX_KEYS), rules)
+
+def create_concurrency_limiter() -> Optional[ConcurrencyLimiter]:
+    if settings.MAX_CONCURRENT_REQUESTS <= 0:
+        return None
+    return ConcurrencyLimiter(
+        settings.MAX_CONCURRENT_REQUESTS,
+        settings.REQUEST_QUEUE_SIZE,
+        settings.REQUEST_QUEUE_TIMEOUT_MS / 1000,
+    )
@@ -0,0 +1,42 @@
+from typing import Any, Dict, Optional
+
+from cache import TTLCache
+from database import execute
+
+# 요청 단위 저장소 (identity map)
+# 한 요청 안에서 이미 읽은 users/advices 행은 id 기준으로 보관해 다시 조회하지 않습니다.
+# get_current_user가 읽은 사용자 행도 여기에 담기므로, 핸들러는 같은 사용자 정보를 다시 SELECT하지 않고 사용합니다.
+# FastAPI는 요청마다 의존성 결과를 캐시하므로 Depends(get_repository)는 한 요청 안에서 같은 인스턴스를 반환합니다.
+
+class Repository:
+    def __init__(self, client: Any, user_cache: TTLCache):
+        self.client = client
+        self.user_cache = user_cache
+        self.users: Dict[str, dict] = {}
+        self.advices: Dict[str, Optional[dict]] = {}
+
+    async def get_user(self, user_id: str) -> Optional[dict]:
+        """users 행을 identity map → 프로세스 공용 사용자 캐시 → DB 순서로 찾습니다."""
+        if user_id in self.users:
+            return self.users[user_id]
+        user = self.user_cache.get(user_id)
+        if user is None:
+            response = await execute(self.client.table("users").select("*").eq("id", user_id))
+            if not response.data:
+                return None
+            user = response.data[0]
+            self.user_cache.set(user_id, user)
+        self.users[user_id] = user
+        return user
+
+    def remember_user(self, user: dict) -> None:
+        """변경된 사용자 행으로 identity map과 공용 캐시를 갱신합니다."""
+        self.users[user["id"]] = user
+        self.user_cache.set(user["id"], user)
+
+    async def get_advice(self, advice_id: str) -> Optional[dict]:
+        """advices 행을 id로 찾습니다. 없는 조언도 한 요청 안에서는 다시 조회하지 않습니다."""
+        if advice_id not in self.advices:
+            response = await execute(self.client.table("advices").select("*").eq("id", advice_id))
+            self.advices[advice_id] = response.data[0] if response.data else None
+        return self.advices[advice_id]
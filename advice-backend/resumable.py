@@ -0,0 +1,95 @@
+import hashlib
+import hmac
+import uuid
+from datetime import datetime, timedelta
+from typing import Iterable, List
+
+from fastapi import HTTPException, status
+from jose import JWTError, jwt
+
+from config import settings
+
+# 재개 가능한 업로드 세션
+# 세션 정보(소유자, 파일 정보, 청크 크기)는 서명된 upload_id 토큰에 담아 별도 저장소 없이
+# 여러 워커에서 검증하고, 받은 청크는 Storage의 uploads/<session_id>/ 아래에 보관합니다.
+# upload_id는 URL에 들어가고 액세스 토큰보다 오래 유효하므로, 액세스 토큰과 다른 키와 audience로 서명해
+# Bearer 토큰으로 쓸 수 없게 합니다 (main.decode_access_token도 typ/aud가 있는 토큰을 거절).
+
+UPLOAD_TOKEN_TYPE = "resumable-upload"
+CHUNK_PREFIX = "uploads"
+
+def _signing_key() -> str:
+    # SECRET_KEY에서 업로드 세션 전용 키를 파생합니다
+    return hmac.new(settings.SECRET_KEY.encode(), UPLOAD_TOKEN_TYPE.encode(), hashlib.sha256).hexdigest()
+
+def create_upload_id(owner_id: str, filename: str, content_type: str, size: int) -> dict:
+    session = {
+        "typ": UPLOAD_TOKEN_TYPE,
+        "aud": UPLOAD_TOKEN_TYPE,
+        "sid": uuid.uuid4().hex,
+        "sub": owner_id,
+        "filename": filename,
+        "content_type": content_type,
+        "size": size,
+        "chunk_size": settings.RESUMABLE_UPLOAD_CHUNK_SIZE,
+        "exp": datetime.utcnow() + timedelta(hours=settings.RESUMABLE_UPLOAD_EXPIRE_HOURS),
+    }
+    session["upload_id"] = jwt.encode(session, _signing_key(), algorithm="HS256")
+    return session
+
+def decode_upload_id(upload_id: str, owner_id: str) -> dict:
+    try:
+        session = jwt.decode(upload_id, _signing_key(), algorithms=["HS256"], audience=UPLOAD_TOKEN_TYPE)
+    except JWTError:
+        raise HTTPException(status_code=404, detail="업로드 세션을 찾을 수 없거나 만료되었습니다")
+    if session.get("typ") != UPLOAD_TOKEN_TYPE:
+        raise HTTPException(status_code=404, detail="업로드 세션을 찾을 수 없거나 만료되었습니다")
+    if session.get("sub") != owner_id:
+        raise HTTPException(status_code=403, detail="접근 권한이 없습니다")
+    return session
+
+def total_chunks(session: dict) -> int:
+    return max(1, -(-session["size"] // session["chunk_size"]))
+
+def chunk_length(session: dict, index: int) -> int:
+    """index번째 청크가 가져야 하는 바이트 수 (마지막 청크만 짧을 수 있음)"""
+    if index < 0 or index >= total_chunks(session):
+        raise HTTPException(status_code=400, detail="잘못된 청크 번호입니다")
+    start = index * session["chunk_size"]
+    return min(session["chunk_size"], session["size"] - start)
+
+def chunk_folder(session: dict) -> str:
+    return f"{CHUNK_PREFIX}/{session['sid']}"
+
+def chunk_path(session: dict, index: int) -> str:
+    return f"{chunk_folder(session)}/{index:05d}"
+
+def received_ranges(session: dict, indexes: Iterable[int]) -> List[List[int]]:
+    """받은 청크 번호들을 [시작, 끝) 바이트 구간 목록으로 병합합니다."""
+    ranges: List[List[int]] = []
+    for index in sorted(set(indexes)):
+        start = index * session["chunk_size"]
+        end = start + chunk_length(session, index)
+        if ranges and ranges[-1][1] == start:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+    return ranges
+
+def missing_chunks(session: dict, indexes: Iterable[int]) -> List[int]:
+    received = set(indexes)
+    return [index for index in range(total_chunks(session)) if index not in received]
+
+def validate_new_upload(content_type: str, size: int) -> None:
+    if not content_type.startswith(("image/", "video/")):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="이미지 또는 영상 파일만 업로드 가능합니다."
+        )
+    if size <= 0:
+        raise HTTPException(status_code=400, detail="파일 크기가 올바르지 않습니다")
+    if size > settings.MAX_RESUMABLE_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"파일 크기는 {settings.MAX_RESUMABLE_UPLOAD_BYTES // (1024 * 1024)}MB 이하여야 합니다."
+        )
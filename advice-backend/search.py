@@ -0,0 +1,64 @@
+import unicodedata
+from collections import defaultdict
+from typing import Dict, List, Set
+
+# 조언 검색 (프로세스 내 대체 구현)
+# Supabase에 search_advices RPC(supabase_search_functions.sql)가 없거나 SEARCH_BACKEND=memory인 경우,
+# 가족의 조언 목록으로 글자 n-gram 역색인을 만들어 검색합니다.
+# 한국어는 어절에 조사가 붙으므로 형태소 대신 글자 2-gram으로 부분 일치를 찾습니다.
+
+NGRAM_SIZE = 2
+
+def normalize(text: str) -> str:
+    # 호환 문자(전각 등)를 통일하고 대소문자와 공백 차이를 무시합니다
+    return "".join(unicodedata.normalize("NFKC", text).lower().split())
+
+def ngrams(text: str, size: int = NGRAM_SIZE) -> Set[str]:
+    text = normalize(text)
+    if len(text) < size:
+        return {text} if text else set()
+    return {text[index:index + size] for index in range(len(text) - size + 1)}
+
+class NgramIndex:
+    """조언 목록(GET /advices 항목 형태)에 대한 글자 n-gram 역색인"""
+
+    def __init__(self, items: List[dict]):
+        self.items = items
+        self._texts = [normalize(item["content"]) for item in items]
+        self._categories = [normalize(item["category"]) for item in items]
+        self._postings: Dict[str, Set[int]] = defaultdict(set)
+        for position, item in enumerate(items):
+            for gram in ngrams(item["content"]) | ngrams(item["category"]):
+                self._postings[gram].add(position)
+            for char in self._texts[position] + self._categories[position]:
+                # 한 글자 검색어용
+                self._postings[char].add(position)
+
+    def search(self, query: str, min_score: float = 0.5) -> List[dict]:
+        """검색어와 관련도가 높은 순서(같으면 최신순)로 조언을 반환합니다.
+
+        관련도 = 검색어 n-gram 중 조언에 포함된 비율 + 내용/카테고리에 검색어가 그대로 포함된 경우 가산점
+        (search_advices RPC의 순위와 같은 방식)
+        """
+        needle = normalize(query)
+        grams = ngrams(query)
+        if not grams:
+            return []
+
+        matches: Dict[int, int] = defaultdict(int)
+        for gram in grams:
+            for position in self._postings.get(gram, ()):
+                matches[position] += 1
+
+        scored = []
+        for position, count in matches.items():
+            score = count / len(grams)
+            if needle in self._texts[position]:
+                score += 1
+            if needle in self._categories[position]:
+                score += 0.5
+            if score >= min_score:
+                item = self.items[position]
+                scored.append((score, item["created_at"], item["id"], item))
+        scored.sort(key=lambda entry: entry[:3], reverse=True)
+        return [entry[3] for entry in scored]
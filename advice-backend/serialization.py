@@ -0,0 +1,28 @@
+from typing import Iterable, List, Mapping, Optional, Type
+
+import orjson
+from fastapi import Response
+from pydantic import BaseModel
+
+# 조언 목록 전용 빠른 직렬화 경로
+# 행마다 모델 검증을 한 번만 하고, response_model의 재검증과 표준 json 인코더를 거치지 않고
+# 검증된 필드 값을 orjson으로 곧바로 bytes로 직렬화합니다.
+
+def validate_rows(model: Type[BaseModel], rows: Iterable[dict], on_error=None) -> List[BaseModel]:
+    """DB 행을 모델로 한 번만 검증합니다. 검증에 실패한 행은 on_error(row, error)를 호출하고 건너뜁니다."""
+    validated = []
+    validate = model.model_validate
+    for row in rows:
+        try:
+            validated.append(validate(row))
+        except Exception as e:
+            if on_error is not None:
+                on_error(row, e)
+    return validated
+
+def dump_models(models: Iterable[BaseModel]) -> list:
+    # 검증된 모델의 __dict__에는 선언된 필드만 JSON 호환 타입으로 들어 있어 model_dump()를 생략할 수 있습니다
+    return [model.__dict__ for model in models]
+
+def json_response(content, headers: Optional[Mapping[str, str]] = None) -> Response:
+    return Response(content=orjson.dumps(content), media_type="application/json", headers=dict(headers or {}))
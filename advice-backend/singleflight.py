@@ -0,0 +1,52 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+# 동시에 들어온 같은 조회를 하나의 upstream 호출로 합칩니다 (single-flight).
+# 예: 아버지가 조언을 작성한 직후 가족의 자녀들이 동시에 같은 목록/통계를 다시 불러오는 경우.
+# - 결과와 예외는 기다리던 모든 호출자에게 그대로 전달됩니다.
+# - 한 호출자가 취소되어도 다른 호출자가 남아 있으면 upstream 호출은 계속되고,
+#   마지막 호출자까지 취소되면 upstream 호출도 취소합니다.
+# - 호출이 끝나면 키를 바로 지우므로 결과를 캐시하지 않습니다.
+
+class _Call:
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+class SingleFlight:
+    def __init__(self, shared_counter: Optional[Any] = None):
+        # shared_counter: 공유할 때마다 inc()할 Prometheus Counter (선택)
+        self._calls: Dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.shared = 0
+        self.shared_counter = shared_counter
+
+    async def do(self, key: Hashable, func: Callable[[], Awaitable[Any]]) -> Any:
+        call = self._calls.get(key)
+        if call is None:
+            call = _Call(asyncio.ensure_future(func()))
+            self._calls[key] = call
+            call.task.add_done_callback(lambda _: self._forget(key, call))
+            self.calls += 1
+        else:
+            self.shared += 1
+            if self.shared_counter is not None:
+                self.shared_counter.inc()
+
+        call.waiters += 1
+        try:
+            # shield: 이 호출자가 취소되어도 공유 중인 upstream 호출은 취소되지 않도록 보호
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+            if call.waiters == 0 and not call.task.done():
+                # 기다리는 호출자가 없으면 upstream 호출도 취소
+                self._forget(key, call)
+                call.task.cancel()
+
+    def _forget(self, key: Hashable, call: _Call) -> None:
+        if self._calls.get(key) is call:
+            del self._calls[key]
+
+    def stats(self) -> dict:
+        return {"in_flight": len(self._calls), "calls": self.calls, "shared": self.shared}
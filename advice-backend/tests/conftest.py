@@ -0,0 +1,45 @@
+import os
+import sys
+import uuid
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# main 모듈은 import 시 설정을 읽으므로 접속하지 않는 더미 값과 테스트용 설정을 먼저 지정합니다
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test.dummy.key")
+os.environ.setdefault("MEDIA_VARIANTS_ENABLED", "false")
+os.environ.setdefault("LOG_LEVEL", "WARNING")
+os.environ.setdefault("RATE_LIMITS", "")
+
+import httpx
+import pytest
+
+import main
+from benchmarks.fake_supabase import FakeSupabase
+from benchmarks.seed import Family, seed_families
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+@pytest.fixture
+def backend(monkeypatch) -> FakeSupabase:
+    """main.supabase를 메모리 Supabase로 바꿉니다."""
+    fake = FakeSupabase()
+    monkeypatch.setattr(main, "supabase", fake)
+    return fake
+
+@pytest.fixture
+def family(backend: FakeSupabase) -> Family:
+    # 테스트마다 사용자 ID를 바꿔 프로세스 내 캐시(사용자, 목록, ETag)가 섞이지 않게 합니다
+    return seed_families(backend, "unused-hash", advices_per_family=20, prefix=f"test-{uuid.uuid4().hex[:8]}")[0]
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=main.app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as http_client:
+        yield http_client
+
+@pytest.fixture
+def bearer():
+    """사용자 ID → Authorization 헤더"""
+    return lambda user_id: {"Authorization": f"Bearer {main.create_access_token({'sub': user_id})}"}
@@ -0,0 +1,137 @@
+import uuid
+
+import pytest
+from prometheus_client import REGISTRY
+
+import main
+from advice_cache import AdviceListCache, LocalAdviceListBackend, RedisAdviceListBackend
+from benchmarks.fake_redis import FakeRedis
+from benchmarks.seed import seed_families
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(params=["local", "redis"])
+def list_cache(request, monkeypatch) -> AdviceListCache:
+    # 같은 테스트를 프로세스 내 백엔드와 Redis 백엔드(메모리 Redis)로 각각 실행합니다
+    if request.param == "local":
+        cache = AdviceListCache(LocalAdviceListBackend(max_size=64, ttl_seconds=60))
+    else:
+        cache = AdviceListCache(RedisAdviceListBackend(FakeRedis(), ttl_seconds=60))
+    monkeypatch.setattr(main, "advice_list_cache", cache)
+    return cache
+
+@pytest.fixture
+def families(backend):
+    return seed_families(backend, "unused-hash", families=2, advices_per_family=5, prefix=f"test-{uuid.uuid4().hex[:8]}")
+
+def cached_families(cache: AdviceListCache) -> set:
+    backend = cache.backend
+    if isinstance(backend, LocalAdviceListBackend):
+        return {author_id for author_id, _ in backend.cache._data}
+    return {key.split(":", 1)[1] for key in backend.client.hashes}
+
+def lookups(result: str) -> float:
+    return REGISTRY.get_sample_value("advice_cache_lookups_total", {"cache": "advice_lists", "result": result}) or 0.0
+
+async def list_advices(client, headers: dict) -> list:
+    response = await client.get("/advices", params={"limit": 50}, headers=headers)
+    assert response.status_code == 200
+    return response.json()["items"]
+
+async def test_second_request_is_served_from_cache(list_cache, backend, family, client, bearer):
+    headers = bearer(family.father_id)
+    hits, misses = lookups("hit"), lookups("miss")
+    first = await list_advices(client, headers)
+    second = await list_advices(client, headers)
+
+    assert second == first
+    assert backend.calls["postgrest", "advices", "select"] == 1
+    assert cached_families(list_cache) == {family.father_id}
+    assert list_cache.backend.stats()["hits"] == 1
+    assert (lookups("hit") - hits, lookups("miss") - misses) == (1, 1)
+
+async def test_child_shares_the_family_entry(list_cache, backend, family, client, bearer):
+    await list_advices(client, bearer(family.father_id))
+    await list_advices(client, bearer(family.child_ids[0]))
+    assert backend.calls["postgrest", "advices", "select"] == 1
+
+MUTATIONS = {
+    "create": lambda family: ("POST", "/advices", family.father_id, {"category": "life", "target_age": 3, "content": "새 조언"}),
+    "update": lambda family: ("PUT", f"/advices/{family.advice_ids[0]}", family.father_id, {
+        "category": "life", "target_age": 3, "content": "고친 조언", "media_url": None, "media_type": None,
+    }),
+    "delete": lambda family: ("DELETE", f"/advices/{family.advice_ids[0]}", family.father_id, None),
+    "read": lambda family: ("PUT", f"/advices/{family.advice_ids[0]}/read", family.child_ids[0], None),
+}
+
+@pytest.mark.parametrize("mutation", sorted(MUTATIONS))
+async def test_mutation_invalidates_only_that_family(mutation, list_cache, backend, families, client, bearer):
+    changed, other = families
+    await list_advices(client, bearer(changed.father_id))
+    await list_advices(client, bearer(other.father_id))
+    assert cached_families(list_cache) == {changed.father_id, other.father_id}
+
+    method, path, user_id, body = MUTATIONS[mutation](changed)
+    response = await client.request(method, path, json=body, headers=bearer(user_id))
+    assert response.status_code == 200
+    assert cached_families(list_cache) == {other.father_id}
+
+    # 변경된 가족은 다시 조회하고, 다른 가족은 계속 캐시에서 응답합니다
+    selects = backend.calls["postgrest", "advices", "select"]
+    items = await list_advices(client, bearer(changed.father_id))
+    await list_advices(client, bearer(other.father_id))
+    assert backend.calls["postgrest", "advices", "select"] == selects + 1
+    by_id = {item["id"]: item for item in items}
+    if mutation == "create":
+        assert len(items) == len(changed.advice_ids) + 1
+    elif mutation == "update":
+        assert by_id[changed.advice_ids[0]]["content"] == "고친 조언"
+    elif mutation == "delete":
+        assert changed.advice_ids[0] not in by_id
+    else:
+        assert by_id[changed.advice_ids[0]]["is_read"] is True
+
+async def test_entry_from_an_older_family_version_is_not_used(list_cache, backend, family, client, bearer):
+    headers = bearer(family.father_id)
+    await list_advices(client, headers)
+    stale = lookups("stale")
+    # 다른 워커에서 변경된 경우: 이 워커의 캐시는 그대로지만 가족 버전이 올라감
+    for row in backend.tables["advice_family_versions"]:
+        if row["author_id"] == family.father_id:
+            row["version"] += 1
+    await list_advices(client, headers)
+    assert backend.calls["postgrest", "advices", "select"] == 2
+    assert list_cache.stale == 1
+    assert lookups("stale") - stale == 1
+
+async def test_redis_entries_expire_and_failures_fall_back_to_the_database(monkeypatch, backend, family, client, bearer):
+    redis = FakeRedis()
+    cache = AdviceListCache(RedisAdviceListBackend(redis, ttl_seconds=60))
+    monkeypatch.setattr(main, "advice_list_cache", cache)
+    headers = bearer(family.father_id)
+
+    await list_advices(client, headers)
+    assert 0 < redis.ttl(f"advices:{family.father_id}") <= 60
+
+    redis.down = True
+    assert len(await list_advices(client, headers)) == len(family.advice_ids)
+    assert cache.backend.stats()["errors"] == 2  # 읽기와 쓰기 실패
+    assert backend.calls["postgrest", "advices", "select"] == 2
+
+async def test_local_backend_records_evictions():
+    evictions = REGISTRY.get_sample_value("advice_cache_evictions_total", {"cache": "advice_lists"}) or 0.0
+    cache = AdviceListCache(LocalAdviceListBackend(max_size=1, ttl_seconds=60))
+    await cache.set("father-a", None, None, 1, [])
+    await cache.set("father-b", None, None, 1, [])
+    assert await cache.get("father-a", None, None, 1) is None
+    assert cache.stats()["evictions"] == 1
+    assert REGISTRY.get_sample_value("advice_cache_evictions_total", {"cache": "advice_lists"}) - evictions == 1
+
+async def test_cache_metrics_are_exported(client):
+    response = await client.get("/metrics")
+    assert "advice_cache_lookups_total" in response.text
+    assert "advice_cache_evictions_total" in response.text
+
+async def test_cache_stats_endpoint_is_gone(family, client, bearer):
+    response = await client.get("/stats/cache", headers=bearer(family.child_ids[0]))
+    assert response.status_code != 200
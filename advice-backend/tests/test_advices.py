@@ -0,0 +1,61 @@
+import pytest
+
+import main
+
+pytestmark = pytest.mark.anyio
+
+MEDIA_URL = "http://localhost:54321/storage/v1/object/public/advice-media//photo.jpg"
+VARIANTS = {"w320": "http://localhost:54321/storage/v1/object/public/advice-media//variants/photo/w320.webp"}
+
+@pytest.fixture
+def advice(backend, family) -> dict:
+    row = next(row for row in backend.tables["advices"] if row["id"] == family.advice_ids[0])
+    row.update(media_url=MEDIA_URL, media_type="image", media_variants=VARIANTS)
+    return row
+
+def edit(advice: dict, **changes) -> dict:
+    return {
+        "category": advice["category"],
+        "target_age": advice["target_age"],
+        "content": advice["content"],
+        "media_url": advice["media_url"],
+        "media_type": advice["media_type"],
+        **changes,
+    }
+
+async def test_text_edit_keeps_media_variants(advice, family, client, bearer):
+    response = await client.put(f"/advices/{advice['id']}", json=edit(advice, content="고친 내용"), headers=bearer(family.father_id))
+    assert response.status_code == 200
+    assert response.json()["content"] == "고친 내용"
+    assert response.json()["media_variants"] == VARIANTS
+
+async def test_new_media_url_without_known_variants_clears_them(advice, family, client, bearer):
+    new_url = MEDIA_URL.replace("photo.jpg", "other.jpg")
+    response = await client.put(f"/advices/{advice['id']}", json=edit(advice, media_url=new_url), headers=bearer(family.father_id))
+    assert response.status_code == 200
+    assert response.json()["media_url"] == new_url
+    assert response.json()["media_variants"] is None
+
+async def test_new_media_url_uses_variants_from_recent_upload(monkeypatch, advice, family, client, bearer):
+    new_url = MEDIA_URL.replace("photo.jpg", "fresh.jpg")
+    fresh = {"w320": new_url.replace("fresh.jpg", "variants/fresh/w320.webp")}
+    monkeypatch.setattr(main, "media_variant_cache", main.TTLCache(max_size=16, ttl_seconds=60))
+    main.media_variant_cache.set(new_url, fresh)
+    response = await client.put(f"/advices/{advice['id']}", json=edit(advice, media_url=new_url), headers=bearer(family.father_id))
+    assert response.json()["media_variants"] == fresh
+
+async def test_removing_media_clears_variants(advice, family, client, bearer):
+    response = await client.put(
+        f"/advices/{advice['id']}", json=edit(advice, media_url=None, media_type=None), headers=bearer(family.father_id)
+    )
+    assert response.json()["media_url"] is None
+    assert response.json()["media_variants"] is None
+
+async def test_edit_by_other_father_is_forbidden(backend, advice, client, bearer):
+    backend.load("users", [{
+        "id": "intruder", "password_hash": "unused", "user_type": "father", "name": "intruder",
+        "created_at": "2024-01-01T00:00:00.000000+00:00", "updated_at": "2024-01-01T00:00:00.000000+00:00",
+    }])
+    response = await client.put(f"/advices/{advice['id']}", json=edit(advice, content="x"), headers=bearer("intruder"))
+    assert response.status_code == 403
+    assert advice["media_variants"] == VARIANTS
@@ -0,0 +1,38 @@
+from datetime import datetime, timedelta
+
+import pytest
+from jose import jwt
+
+import main
+from config import settings
+
+pytestmark = pytest.mark.anyio
+
+async def test_access_token_authenticates(family, client, bearer):
+    response = await client.get("/users/me", headers=bearer(family.father_id))
+    assert response.status_code == 200
+    assert response.json()["id"] == family.father_id
+
+async def test_upload_id_is_not_a_bearer_token(family, client, bearer):
+    created = await client.post(
+        "/uploads", json={"filename": "video.mp4", "content_type": "video/mp4", "size": 1024},
+        headers=bearer(family.father_id),
+    )
+    assert created.status_code == 200
+    upload_id = created.json()["upload_id"]
+
+    response = await client.get("/users/me", headers={"Authorization": f"Bearer {upload_id}"})
+    assert response.status_code == 401
+    assert main.user_id_from_token(upload_id) is None
+    # 세션 자체는 계속 사용할 수 있음
+    session = await client.get(f"/uploads/{upload_id}", headers=bearer(family.father_id))
+    assert session.status_code == 200
+
+@pytest.mark.parametrize("claims", [{"typ": "resumable-upload"}, {"aud": "resumable-upload"}])
+async def test_tokens_for_other_purposes_are_rejected(family, client, claims):
+    token = jwt.encode(
+        {"sub": family.father_id, "exp": datetime.utcnow() + timedelta(hours=24), **claims},
+        settings.SECRET_KEY, algorithm="HS256",
+    )
+    response = await client.get("/users/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 401
@@ -0,0 +1,148 @@
+import math
+import uuid
+
+import orjson
+import pytest
+
+import main
+from advice_cache import AdviceListCache, LocalAdviceListBackend
+from benchmarks.seed import seed_families
+from config import settings
+from events import EventHub, LocalBroker
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def families(backend):
+    return seed_families(backend, "unused-hash", families=2, advices_per_family=5, prefix=f"test-{uuid.uuid4().hex[:8]}")
+
+@pytest.fixture
+def hub(monkeypatch) -> EventHub:
+    event_hub = EventHub(LocalBroker(queue_size=10))
+    monkeypatch.setattr(main, "event_hub", event_hub)
+    return event_hub
+
+@pytest.fixture
+def list_cache(monkeypatch) -> AdviceListCache:
+    cache = AdviceListCache(LocalAdviceListBackend(max_size=64, ttl_seconds=60))
+    monkeypatch.setattr(main, "advice_list_cache", cache)
+    return cache
+
+def rows_by_id(backend) -> dict:
+    return {row["id"]: row for row in backend.tables["advices"]}
+
+def advice(index: int) -> dict:
+    return {"category": "life", "target_age": index % 60, "content": f"조언 {index}"}
+
+async def test_batch_read_reports_each_id_in_request_order(backend, families, client, bearer):
+    family, other = families
+    missing = str(uuid.uuid4())
+    for row in backend.tables["advices"]:
+        row["is_read"] = False
+    ids = [family.advice_ids[0], other.advice_ids[0], missing, "not-a-uuid", family.advice_ids[1], family.advice_ids[0]]
+
+    response = await client.post("/advices/batch/read", json={"ids": ids}, headers=bearer(family.child_ids[0]))
+    assert response.status_code == 200
+    assert response.json() == {
+        "updated": 2,
+        "results": [
+            {"id": family.advice_ids[0], "status": "updated"},
+            {"id": other.advice_ids[0], "status": "not_found"},
+            {"id": missing, "status": "not_found"},
+            {"id": "not-a-uuid", "status": "not_found"},
+            {"id": family.advice_ids[1], "status": "updated"},
+        ],
+    }
+    rows = rows_by_id(backend)
+    assert rows[family.advice_ids[0]]["is_read"] and rows[family.advice_ids[1]]["is_read"]
+    # 다른 가족의 조언은 바뀌지 않습니다
+    assert not rows[other.advice_ids[0]]["is_read"]
+    assert backend.calls["postgrest", "advices", "update"] == 1
+
+async def test_batch_delete_only_removes_own_advices(backend, families, client, bearer):
+    family, other = families
+    ids = [family.advice_ids[0], other.advice_ids[0], "not-a-uuid"]
+    response = await client.post("/advices/batch/delete", json={"ids": ids}, headers=bearer(family.father_id))
+    assert response.json()["deleted"] == 1
+    assert [result["status"] for result in response.json()["results"]] == ["deleted", "not_found", "not_found"]
+    rows = rows_by_id(backend)
+    assert family.advice_ids[0] not in rows
+    assert other.advice_ids[0] in rows
+
+    forbidden = await client.post("/advices/batch/delete", json={"ids": ids}, headers=bearer(family.child_ids[0]))
+    assert forbidden.status_code == 403
+
+@pytest.mark.parametrize("count", [1, 200, 201, 401])
+async def test_batch_read_sends_one_update_per_chunk(backend, client, bearer, count):
+    family = seed_families(backend, "unused-hash", advices_per_family=count, prefix=f"test-{uuid.uuid4().hex[:8]}")[0]
+    response = await client.post("/advices/batch/read", json={"ids": family.advice_ids}, headers=bearer(family.father_id))
+    assert response.json()["updated"] == count
+    assert backend.calls["postgrest", "advices", "update"] == math.ceil(count / settings.BATCH_WRITE_SIZE)
+
+@pytest.mark.parametrize("count", [200, 201, 401])
+async def test_batch_create_sends_one_insert_per_chunk(backend, family, client, bearer, count):
+    items = [advice(index) for index in range(count)]
+    response = await client.post("/advices/batch", json=items, headers=bearer(family.father_id))
+    body = response.json()
+    assert (body["created"], body["failed"]) == (count, 0)
+    assert backend.calls["postgrest", "advices", "insert"] == math.ceil(count / settings.BATCH_WRITE_SIZE)
+    # 결과는 입력 순서대로, 저장된 행과 같은 ID
+    rows = rows_by_id(backend)
+    assert [rows[result["id"]]["content"] for result in body["results"]] == [item["content"] for item in items]
+
+async def test_batch_create_keeps_valid_items_when_some_are_invalid(backend, family, client, bearer):
+    items = [advice(0), {"category": "life"}, "not an object", advice(3)]
+    body = (await client.post("/advices/batch", json=items, headers=bearer(family.father_id))).json()
+    assert (body["created"], body["failed"]) == (2, 2)
+    assert [result["status"] for result in body["results"]] == ["created", "error", "error", "created"]
+    assert [result["index"] for result in body["results"]] == [0, 1, 2, 3]
+    assert backend.calls["postgrest", "advices", "insert"] == 1
+
+async def test_batch_over_the_item_limit_is_rejected(monkeypatch, family, client, bearer):
+    monkeypatch.setattr(settings, "BATCH_MAX_ITEMS", 3)
+    response = await client.post("/advices/batch", json=[advice(index) for index in range(4)], headers=bearer(family.father_id))
+    assert response.status_code == 413
+
+@pytest.mark.parametrize("content_type, body", [
+    ("application/x-ndjson", b'{"category": "life", "target_age": 1, "content": "a"}\n{broken\n\n{"category": "love", "target_age": 2, "content": "b"}\n'),
+    ("text/csv", "category,target_age,content\nlife,1,a\nlife,나이,x\nlove,2,b\n".encode()),
+])
+async def test_import_creates_rows_and_reports_bad_lines(backend, family, client, bearer, content_type, body):
+    response = await client.post(
+        "/advices/import", content=body, headers={**bearer(family.father_id), "Content-Type": content_type}
+    )
+    result = response.json()
+    assert (result["created"], result["failed"]) == (2, 1)
+    assert [item["status"] for item in result["results"]] == ["created", "error", "created"]
+    assert backend.calls["postgrest", "advices", "insert"] == 1
+
+async def test_batch_writes_invalidate_the_family_once_and_publish_one_event(hub, list_cache, backend, families, client, bearer):
+    family, other = families
+    for target in (family, other):
+        assert (await client.get("/advices", params={"limit": 50}, headers=bearer(target.father_id))).status_code == 200
+    subscription = await hub.subscribe(family.father_id)
+    other_subscription = await hub.subscribe(other.father_id)
+    try:
+        ids = family.advice_ids[:3] + [other.advice_ids[0]]
+        await client.post("/advices/batch/read", json={"ids": ids}, headers=bearer(family.child_ids[0]))
+        # 변경된 가족의 캐시만 지워집니다
+        assert {author_id for author_id, _ in list_cache.backend.cache._data} == {other.father_id}
+
+        message = await subscription.get(timeout=1)
+        event, _, data = message.decode().strip().partition("\ndata: ")
+        assert event == "event: advice.read"
+        assert orjson.loads(data) == {"ids": sorted(family.advice_ids[:3])}
+
+        created = await client.post("/advices/batch", json=[advice(0), advice(1)], headers=bearer(family.father_id))
+        message = await subscription.get(timeout=1)
+        assert message.startswith(b"event: advice.created\n")
+        assert len(orjson.loads(message.decode().split("data: ", 1)[1])["advices"]) == 2
+        assert created.json()["created"] == 2
+
+        # 바뀐 행이 없으면 이벤트를 보내지 않습니다
+        await client.post("/advices/batch/read", json={"ids": [str(uuid.uuid4())]}, headers=bearer(family.child_ids[0]))
+        assert await subscription.get(timeout=0.05) is None
+        assert await other_subscription.get(timeout=0.05) is None
+    finally:
+        await subscription.close()
+        await other_subscription.close()
@@ -0,0 +1,126 @@
+import gzip
+
+import brotli
+import httpx
+import pytest
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse, PlainTextResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+import main
+from compression import CompressionMiddleware, choose_encoding
+
+pytestmark = pytest.mark.anyio
+
+LARGE_TEXT = "아빠의 조언 " * 400
+
+@pytest.mark.parametrize("accept_encoding, expected", [
+    ("br, gzip", "br"),
+    ("gzip, deflate, br", "br"),
+    ("gzip", "gzip"),
+    ("br;q=0, gzip;q=0.5", "gzip"),
+    ("*", "br"),
+    ("*, br;q=0", "gzip"),
+    ("identity", None),
+    ("gzip;q=0, br;q=0", None),
+    ("", None),
+])
+def test_choose_encoding(accept_encoding, expected):
+    assert choose_encoding(accept_encoding) == expected
+
+@pytest.fixture
+def small_app():
+    async def large(request):
+        return PlainTextResponse(LARGE_TEXT)
+
+    async def small(request):
+        return JSONResponse({"ok": True})
+
+    async def image(request):
+        return Response(b"\x89PNG" + b"\x00" * 4096, media_type="image/png")
+
+    async def stream(request):
+        async def chunks():
+            for _ in range(3):
+                yield LARGE_TEXT.encode()
+        return StreamingResponse(chunks(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route(f"/{endpoint.__name__}", endpoint) for endpoint in (large, small, image, stream)])
+    return CompressionMiddleware(app, minimum_size=1024)
+
+async def get(app, path: str, **headers) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # httpx의 자동 해제를 피하기 위해 스트리밍으로 받고 raw 바이트를 읽습니다
+        async with client.stream("GET", path, headers=headers) as response:
+            response._raw = b"".join([chunk async for chunk in response.aiter_raw()])
+            return response
+
+def raw_body(response: httpx.Response) -> bytes:
+    encoding = response.headers.get("content-encoding")
+    if encoding == "br":
+        return brotli.decompress(response._raw)
+    if encoding == "gzip":
+        return gzip.decompress(response._raw)
+    return response._raw
+
+@pytest.mark.parametrize("accept_encoding, encoding", [("br", "br"), ("gzip", "gzip"), ("identity", None)])
+async def test_large_text_is_compressed_with_the_negotiated_encoding(small_app, accept_encoding, encoding):
+    response = await get(small_app, "/large", **{"Accept-Encoding": accept_encoding})
+    assert response.headers.get("content-encoding") == encoding
+    assert raw_body(response) == LARGE_TEXT.encode()
+    assert int(response.headers["content-length"]) == len(response._raw)
+    if encoding:
+        assert len(response._raw) < len(LARGE_TEXT.encode()) / 10
+        assert "Accept-Encoding" in response.headers["vary"]
+
+async def test_small_responses_are_sent_as_is(small_app):
+    response = await get(small_app, "/small", **{"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
+    assert response._raw == b'{"ok":true}'
+
+async def test_already_compressed_types_are_sent_as_is(small_app):
+    response = await get(small_app, "/image", **{"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
+    assert len(response._raw) == 4100
+
+async def test_streaming_responses_are_not_buffered(small_app):
+    response = await get(small_app, "/stream", **{"Accept-Encoding": "br, gzip"})
+    assert "content-encoding" not in response.headers
+    assert response._raw == LARGE_TEXT.encode() * 3
+
+async def list_advices(client, headers: dict, **extra) -> httpx.Response:
+    async with client.stream("GET", "/advices", params={"limit": 50}, headers={**headers, **extra}) as response:
+        response._raw = b"".join([chunk async for chunk in response.aiter_raw()])
+        return response
+
+async def test_list_keeps_etag_and_304_when_compressed(family, client, bearer):
+    headers = bearer(family.father_id)
+    identity = await list_advices(client, headers, **{"Accept-Encoding": "identity"})
+    compressed = await list_advices(client, headers, **{"Accept-Encoding": "br"})
+
+    assert compressed.headers["content-encoding"] == "br"
+    assert raw_body(compressed) == identity._raw
+    assert compressed.headers["etag"] == identity.headers["etag"]
+    assert compressed.headers["etag"].startswith('W/"')
+    assert "Accept-Encoding" in compressed.headers["vary"]
+
+    # 압축된 응답에서 받은 ETag로 다시 요청하면 본문 없이 304
+    not_modified = await list_advices(
+        client, headers, **{"Accept-Encoding": "gzip", "If-None-Match": compressed.headers["etag"]}
+    )
+    assert not_modified.status_code == 304
+    assert not_modified._raw == b""
+    assert "content-encoding" not in not_modified.headers
+    assert not_modified.headers["etag"] == compressed.headers["etag"]
+    assert "Accept-Encoding" in not_modified.headers["vary"]
+
+async def test_repeated_list_responses_reuse_the_compressed_body(family, client, bearer):
+    middleware = main.app.middleware_stack
+    while not isinstance(middleware, CompressionMiddleware):
+        middleware = middleware.app
+    headers = bearer(family.father_id)
+    first = await list_advices(client, headers, **{"Accept-Encoding": "gzip"})
+    hits = middleware.cache.hits
+    second = await list_advices(client, headers, **{"Accept-Encoding": "gzip"})
+    assert second._raw == first._raw
+    assert middleware.cache.hits == hits + 1
@@ -0,0 +1,127 @@
+import asyncio
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+import pytest
+from supabase import create_client
+
+import database
+import main
+from benchmarks.fake_supabase import FakeSupabase
+
+pytestmark = pytest.mark.anyio
+
+LATENCY = 0.2
+CALLS = 8
+
+async def test_slow_queries_overlap():
+    backend = FakeSupabase(latency=LATENCY)
+    started = time.perf_counter()
+    await asyncio.gather(*(
+        database.execute(backend.table("users").select("*").eq("id", f"user-{index}"))
+        for index in range(CALLS)
+    ))
+    elapsed = time.perf_counter() - started
+    # 순서대로 실행하면 CALLS * LATENCY(1.6초)가 걸립니다
+    assert elapsed < LATENCY * 3
+    assert backend.calls["postgrest", "users", "select"] == CALLS
+
+async def test_slow_requests_overlap(backend, client, bearer):
+    backend.latency = LATENCY
+    users = [f"overlap-{index}" for index in range(CALLS)]
+    backend.load("users", [
+        {"id": user_id, "password_hash": "unused", "user_type": "father", "name": user_id,
+         "created_at": "2024-01-01T00:00:00.000000+00:00", "updated_at": "2024-01-01T00:00:00.000000+00:00"}
+        for user_id in users
+    ])
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(client.get("/users/me", headers=bearer(user_id)) for user_id in users))
+    elapsed = time.perf_counter() - started
+    assert [response.status_code for response in responses] == [200] * CALLS
+    assert elapsed < LATENCY * 3
+
+class FakePostgrest(ThreadingHTTPServer):
+    """users 테이블 조회만 응답하는 로컬 PostgREST 흉내 서버 (요청마다 LATENCY만큼 대기, 최대 동시 요청 수 기록)"""
+
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), FakePostgrestHandler)
+        self.lock = threading.Lock()
+        self.active = 0
+        self.max_active = 0
+        self.requests = 0
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+class FakePostgrestHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: FakePostgrest
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        with self.server.lock:
+            self.server.active += 1
+            self.server.requests += 1
+            self.server.max_active = max(self.server.max_active, self.server.active)
+        try:
+            time.sleep(LATENCY)
+            user_id = parse_qs(url.query).get("id", ["eq."])[0][len("eq."):]
+            rows = [{
+                "id": user_id, "password_hash": "unused", "user_type": "father", "name": user_id,
+                "father_id": None, "age": None,
+                "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00",
+            }] if url.path == "/rest/v1/users" and user_id else []
+            body = json.dumps(rows).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        finally:
+            with self.server.lock:
+                self.server.active -= 1
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def postgrest():
+    server = FakePostgrest()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+# create_client는 JWT 형태의 키만 받습니다
+DUMMY_KEY = "eyJhbGciOiJIUzI1NiJ9.e30.dummy"
+
+async def test_shared_client_runs_queries_in_parallel_over_http(postgrest):
+    # 실제 supabase/postgrest-py 클라이언트 하나(httpx 커넥션 풀 하나)를 여러 스레드가 함께 씁니다
+    client = create_client(postgrest.url, DUMMY_KEY)
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(
+        database.execute(client.table("users").select("*").eq("id", f"user-{index}"))
+        for index in range(CALLS)
+    ))
+    elapsed = time.perf_counter() - started
+    assert [response.data[0]["id"] for response in responses] == [f"user-{index}" for index in range(CALLS)]
+    assert postgrest.max_active > 1
+    assert elapsed < LATENCY * 3
+
+async def test_requests_share_the_lazy_client_over_http(monkeypatch, postgrest, client, bearer):
+    lazy = database.LazyClient(lambda: create_client(postgrest.url, DUMMY_KEY))
+    monkeypatch.setattr(main, "supabase", lazy)
+    users = [f"http-{index}" for index in range(CALLS)]
+    started = time.perf_counter()
+    responses = await asyncio.gather(*(client.get("/users/me", headers=bearer(user_id)) for user_id in users))
+    elapsed = time.perf_counter() - started
+    assert [response.json()["id"] for response in responses] == users
+    assert postgrest.max_active > 1
+    assert elapsed < LATENCY * 3
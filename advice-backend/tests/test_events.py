@@ -0,0 +1,139 @@
+import asyncio
+import uuid
+from typing import Optional
+
+import orjson
+import pytest
+from prometheus_client import REGISTRY
+
+import main
+from benchmarks.fake_redis import FakeRedis
+from benchmarks.seed import seed_families
+from events import EventHub, LocalBroker, RedisBroker
+
+pytestmark = pytest.mark.anyio
+
+class EventStream:
+    """GET /events를 ASGI로 직접 호출해 받은 본문 조각을 하나씩 읽습니다.
+
+    httpx의 ASGITransport는 응답이 끝날 때까지 기다리므로 끝나지 않는 SSE 응답에는 쓸 수 없습니다.
+    """
+
+    def __init__(self, app, query: str):
+        self.app = app
+        self.query = query
+        self.status: Optional[int] = None
+        self.chunks: asyncio.Queue = asyncio.Queue()
+        self.disconnected = asyncio.Event()
+        self.task: Optional[asyncio.Task] = None
+
+    async def __aenter__(self) -> "EventStream":
+        scope = {
+            "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "GET", "scheme": "http",
+            "path": "/events", "raw_path": b"/events", "root_path": "", "query_string": self.query.encode(),
+            "headers": [(b"host", b"test")], "client": ("127.0.0.1", 1234), "server": ("test", 80),
+        }
+        self.task = asyncio.create_task(self.app(scope, self._receive, self._send))
+        self.first = await self.next()
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        # 클라이언트 연결 종료
+        self.disconnected.set()
+        await asyncio.wait_for(self.task, 1)
+
+    async def _receive(self) -> dict:
+        await self.disconnected.wait()
+        return {"type": "http.disconnect"}
+
+    async def _send(self, message: dict) -> None:
+        if message["type"] == "http.response.start":
+            self.status = message["status"]
+        elif message.get("body"):
+            await self.chunks.put(message["body"])
+
+    async def next(self, timeout: float = 1) -> Optional[bytes]:
+        try:
+            return await asyncio.wait_for(self.chunks.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+def parse_event(chunk: bytes) -> tuple:
+    lines = dict(line.split(": ", 1) for line in chunk.decode().strip().split("\n"))
+    return lines["event"], orjson.loads(lines["data"])
+
+@pytest.fixture(params=["local", "redis"])
+def hub(request, monkeypatch) -> EventHub:
+    # 같은 테스트를 프로세스 내 브로커와 Redis 브로커(메모리 Redis)로 각각 실행합니다
+    broker = LocalBroker(queue_size=10) if request.param == "local" else RedisBroker(FakeRedis())
+    event_hub = EventHub(broker)
+    monkeypatch.setattr(main, "event_hub", event_hub)
+    return event_hub
+
+@pytest.fixture
+def families(backend):
+    return seed_families(backend, "unused-hash", families=2, advices_per_family=3, prefix=f"test-{uuid.uuid4().hex[:8]}")
+
+def token(user_id: str) -> str:
+    return "token=" + main.create_access_token({"sub": user_id})
+
+def subscribers() -> float:
+    return REGISTRY.get_sample_value("advice_event_subscribers") or 0.0
+
+async def test_family_events_fan_out_to_every_member_only(hub, families, client, bearer):
+    family, other = families
+    async with EventStream(main.app, token(family.father_id)) as father, \
+            EventStream(main.app, token(family.child_ids[0])) as child, \
+            EventStream(main.app, token(other.child_ids[0])) as outsider:
+        assert father.status == 200
+        assert father.first.startswith(b"retry: ")
+
+        response = await client.post(
+            "/advices", json={"category": "life", "target_age": 7, "content": "새 조언"}, headers=bearer(family.father_id)
+        )
+        assert response.status_code == 200
+        for stream in (father, child):
+            event, data = parse_event(await stream.next())
+            assert event == "advice.created"
+            assert [advice["id"] for advice in data["advices"]] == [response.json()["id"]]
+
+        read = await client.put(f"/advices/{family.advice_ids[0]}/read", headers=bearer(family.child_ids[0]))
+        assert read.status_code == 200
+        assert parse_event(await father.next()) == ("advice.read", {"ids": [family.advice_ids[0]]})
+
+        # 다른 가족에게는 전달되지 않습니다
+        assert await outsider.next(timeout=0.1) is None
+
+async def test_disconnect_unsubscribes(hub, family):
+    before = subscribers()
+    async with EventStream(main.app, token(family.father_id)):
+        assert subscribers() == before + 1
+    assert subscribers() == before
+    if isinstance(hub.broker, LocalBroker):
+        assert hub.broker.stats()["subscribers"] == 0
+    else:
+        assert not hub.broker.client.subscribers
+
+async def test_idle_stream_sends_keep_alive(monkeypatch, hub, family):
+    monkeypatch.setattr(main.settings, "SSE_HEARTBEAT_SECONDS", 0.01)
+    async with EventStream(main.app, token(family.father_id)) as stream:
+        assert await stream.next() == b": keep-alive\n\n"
+
+async def test_slow_subscriber_gets_resync(monkeypatch, family):
+    event_hub = EventHub(LocalBroker(queue_size=2))
+    monkeypatch.setattr(main, "event_hub", event_hub)
+    subscription = await event_hub.subscribe(family.father_id)
+    for index in range(3):
+        await event_hub.publish(family.father_id, "advice.read", {"ids": [str(index)]})
+    assert await subscription.get(timeout=1) == b"event: resync\ndata: {}\n\n"
+    await subscription.close()
+
+async def test_events_require_a_token_and_a_family(backend, client):
+    assert (await client.get("/events")).status_code == 401
+    backend.load("users", [{
+        "id": "lonely-child", "password_hash": "unused", "user_type": "child", "name": "lonely",
+        "father_id": None, "age": 10,
+        "created_at": "2024-01-01T00:00:00.000000+00:00", "updated_at": "2024-01-01T00:00:00.000000+00:00",
+    }])
+    response = await client.get("/events", params={"token": main.create_access_token({"sub": "lonely-child"})})
+    assert response.status_code == 400
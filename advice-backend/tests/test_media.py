@@ -0,0 +1,27 @@
+import pytest
+
+from media import normalize_media_url
+
+BASE = "https://project.supabase.co/storage/v1/object/public"
+
+@pytest.mark.parametrize("raw, expected", [
+    (f"{BASE}/advice-media//photo.jpg", f"{BASE}/advice-media//photo.jpg"),
+    (f"{BASE}/advice-media/photo.jpg", f"{BASE}/advice-media//photo.jpg"),
+    (f"{BASE}/advice-media///photo.jpg", f"{BASE}/advice-media//photo.jpg"),
+    (f"{BASE}/advice-media//photo.jpg;", f"{BASE}/advice-media//photo.jpg"),
+    (f"{BASE}/advice-media//photo.jpg;;", f"{BASE}/advice-media//photo.jpg"),
+    (f"{BASE}/advice-media/photo.jpg ; ", f"{BASE}/advice-media//photo.jpg"),
+    (f"  {BASE}/advice-media//photo.jpg\n", f"{BASE}/advice-media//photo.jpg"),
+    (f"{BASE}/advice-media/variants/abc/w320.webp", f"{BASE}/advice-media//variants/abc/w320.webp"),
+    ("https://example.com/other/photo.jpg", "https://example.com/other/photo.jpg"),
+    ("", None),
+    ("   ", None),
+    (";", None),
+    (None, None),
+])
+def test_normalize_media_url(raw, expected):
+    assert normalize_media_url(raw) == expected
+
+def test_normalize_media_url_is_idempotent():
+    once = normalize_media_url(f"{BASE}/advice-media///photo.jpg; ")
+    assert normalize_media_url(once) == once
@@ -0,0 +1,36 @@
+import base64
+import json
+
+import pytest
+
+pytestmark = pytest.mark.anyio
+
+def make_cursor(*values) -> str:
+    return base64.urlsafe_b64encode(json.dumps(list(values)).encode()).decode().rstrip("=")
+
+async def test_pages_cover_all_advices_in_order(backend, family, client, bearer):
+    headers = bearer(family.child_ids[0])
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 7, **({"cursor": cursor} if cursor else {})}
+        response = await client.get("/advices", params=params, headers=headers)
+        assert response.status_code == 200
+        page = response.json()
+        seen.extend(item["id"] for item in page["items"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    expected = sorted(backend.tables["advices"], key=lambda row: (row["created_at"], row["id"]), reverse=True)
+    assert seen == [row["id"] for row in expected]
+
+@pytest.mark.parametrize("cursor", [
+    "not-base64!",
+    make_cursor("2024-01-01T00:00:00+00:00"),
+    make_cursor(1, 2),
+    make_cursor('2024-01-01T00:00:00+00:00")', "7c3bd6ee-0a4f-4b8e-9a53-6a3e5f0f0a11"),
+    make_cursor("2024-01-01T00:00:00+00:00", 'x",id.gt."0'),
+    make_cursor("2024-01-01T00:00:00+00:00", "7c3bd6ee-0a4f-4b8e-9a53-6a3e5f0f0a11)"),
+])
+async def test_malformed_cursor_is_rejected(family, client, bearer, cursor):
+    response = await client.get("/advices", params={"limit": 5, "cursor": cursor}, headers=bearer(family.father_id))
+    assert response.status_code == 400
@@ -0,0 +1,54 @@
+import uuid
+
+import pytest
+
+from config import settings
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture(autouse=True)
+def query_count_header(monkeypatch):
+    monkeypatch.setattr(settings, "QUERY_COUNT_HEADER", True)
+
+def query_count(response) -> int:
+    return int(response.headers["X-Query-Count"])
+
+async def test_stats_queries_with_cold_and_warm_user_cache(family, client, bearer):
+    headers = bearer(family.child_ids[0])
+    # 사용자 조회 + 가족 버전 + get_advice_stats RPC
+    cold = await client.get("/stats", headers=headers)
+    assert cold.status_code == 200
+    assert query_count(cold) == 3
+    # 사용자 캐시 적중
+    warm = await client.get("/stats", headers=headers)
+    assert query_count(warm) == 2
+    # 변경이 없으면 가족 버전만 확인하고 304
+    not_modified = await client.get("/stats", headers={**headers, "If-None-Match": warm.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert query_count(not_modified) == 1
+
+async def test_mutation_is_a_single_conditional_write(family, client, bearer):
+    headers = bearer(family.child_ids[0])
+    await client.get("/users/me", headers=headers)
+    response = await client.put(f"/advices/{family.advice_ids[0]}/read", headers=headers)
+    assert response.status_code == 200
+    assert query_count(response) == 1
+
+async def test_mutation_not_found_looks_up_the_advice_once(family, client, bearer):
+    headers = bearer(family.father_id)
+    await client.get("/users/me", headers=headers)
+    response = await client.put(f"/advices/{uuid.uuid4()}/read", headers=headers)
+    assert response.status_code == 404
+    # 조건부 UPDATE(0행) + 존재 여부 확인
+    assert query_count(response) == 2
+
+async def test_mutation_forbidden_looks_up_the_advice_once(backend, family, client, bearer):
+    backend.load("users", [{
+        "id": f"other-{family.father_id}", "password_hash": "unused", "user_type": "father", "name": "other",
+        "created_at": "2024-01-01T00:00:00.000000+00:00", "updated_at": "2024-01-01T00:00:00.000000+00:00",
+    }])
+    headers = bearer(f"other-{family.father_id}")
+    await client.get("/users/me", headers=headers)
+    response = await client.delete(f"/advices/{family.advice_ids[0]}", headers=headers)
+    assert response.status_code == 403
+    assert query_count(response) == 2
@@ -0,0 +1,177 @@
+import math
+
+import httpx
+import pytest
+from fastapi import BackgroundTasks, FastAPI
+
+import main
+from benchmarks.fake_redis import FakeRedis
+from metrics import HTTP_REQUESTS_IN_FLIGHT, MetricsMiddleware
+from ratelimit import (
+    _TOKEN_BUCKET_SCRIPT,
+    AdmissionControlMiddleware,
+    ConcurrencyLimiter,
+    Limit,
+    LocalRateLimitBackend,
+    RateLimiter,
+    RedisRateLimitBackend,
+    client_ip,
+    parse_limit,
+    parse_rules,
+    take_token,
+)
+
+pytestmark = pytest.mark.anyio
+
+ORIGIN = "https://advice-app-frontend.vercel.app"
+
+async def test_rejected_responses_carry_cors_headers(monkeypatch, family, bearer):
+    limiter = RateLimiter(LocalRateLimitBackend(100), parse_rules("GET /advices=user:1/m"))
+    monkeypatch.setattr(main, "rate_limiter", limiter)
+    app = main.create_app()
+    headers = {**bearer(family.father_id), "Origin": ORIGIN}
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/advices", headers=headers)).status_code == 200
+        response = await client.get("/advices", headers=headers)
+    assert response.status_code == 429
+    assert "retry-after" in response.headers
+    assert "access-control-allow-origin" in response.headers
+
+@pytest.mark.parametrize("forwarded, hops, expected", [
+    ([b"203.0.113.7"], 1, "203.0.113.7"),
+    ([b"1.2.3.4, 203.0.113.7"], 1, "203.0.113.7"),
+    ([b"1.2.3.4", b"203.0.113.7"], 1, "203.0.113.7"),
+    ([b"1.2.3.4, 203.0.113.7, 10.0.0.2"], 2, "203.0.113.7"),
+    ([b"1.2.3.4, 203.0.113.7"], 0, "10.0.0.1"),
+    ([], 1, "10.0.0.1"),
+    ([b"203.0.113.7"], 2, "10.0.0.1"),
+])
+def test_client_ip_uses_the_trusted_hop(forwarded, hops, expected):
+    scope = {"client": ("10.0.0.1", 443), "headers": [(b"x-forwarded-for", value) for value in forwarded]}
+    assert client_ip(scope, hops) == expected
+
+async def test_spoofed_forwarded_for_does_not_change_the_bucket(monkeypatch, backend):
+    limiter = RateLimiter(LocalRateLimitBackend(100), parse_rules("POST /auth/login=ip:1/m"))
+    monkeypatch.setattr(main, "rate_limiter", limiter)
+    monkeypatch.setattr(main.settings, "TRUSTED_PROXY_HOPS", 1)
+    app = main.create_app()
+    statuses = []
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        # 프록시가 덧붙인 맨 오른쪽 주소가 같으면 왼쪽 항목을 바꿔도 같은 버킷
+        for forwarded in ("1.1.1.1, 203.0.113.7", "2.2.2.2, 203.0.113.7", "1.1.1.1, 198.51.100.9"):
+            response = await client.post(
+                "/auth/login", json={"user_id": "nobody", "password": "x"}, headers={"X-Forwarded-For": forwarded}
+            )
+            statuses.append(response.status_code)
+    assert statuses[0] != 429
+    assert statuses[1] == 429
+    assert statuses[2] != 429
+
+async def test_background_tasks_do_not_hold_the_concurrency_slot():
+    concurrency = ConcurrencyLimiter(limit=1, queue_size=0, queue_timeout=0)
+    observed = {}
+    app = FastAPI()
+
+    def after_response() -> None:
+        observed["active"] = concurrency.active
+        observed["in_flight"] = HTTP_REQUESTS_IN_FLIGHT._value.get()
+
+    @app.get("/work")
+    async def work(background_tasks: BackgroundTasks):
+        background_tasks.add_task(after_response)
+        return {"ok": True}
+
+    app.add_middleware(MetricsMiddleware)
+    app.add_middleware(
+        AdmissionControlMiddleware,
+        limiter=RateLimiter(LocalRateLimitBackend(10), []),
+        concurrency=concurrency,
+        identify_user=lambda token: None,
+    )
+    in_flight = HTTP_REQUESTS_IN_FLIGHT._value.get()
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        assert (await client.get("/work")).status_code == 200
+    assert observed == {"active": 0, "in_flight": in_flight}
+    assert concurrency.active == 0
+
+def lua_number(value: float) -> bytes:
+    # Lua의 tostring과 같은 형식 (%.14g)
+    return b"%.14g" % value
+
+def token_bucket_script(redis: FakeRedis, keys: list, args: list) -> bytes:
+    """_TOKEN_BUCKET_SCRIPT를 한 줄씩 옮긴 것 (FakeRedis는 Lua를 실행할 수 없음)"""
+    capacity, rate = float(args[0]), float(args[1])
+    now = redis.time()
+    state = redis.hmget_now(keys[0], ["tokens", "updated_at"])
+    tokens = float(state[0]) if state[0] is not None else capacity
+    updated_at = float(state[1]) if state[1] is not None else now
+    tokens = min(capacity, tokens + max(0, now - updated_at) * rate)
+    retry_after = 0
+    if tokens >= 1:
+        tokens = tokens - 1
+    else:
+        retry_after = (1 - tokens) / rate
+    redis.hset_now(keys[0], {"tokens": lua_number(tokens), "updated_at": lua_number(now)})
+    redis.pexpire_now(keys[0], math.ceil(capacity / rate * 1000))
+    return lua_number(retry_after)
+
+@pytest.fixture
+def redis() -> FakeRedis:
+    fake = FakeRedis(scripts={_TOKEN_BUCKET_SCRIPT: token_bucket_script})
+    fake.now = 1_700_000_000.0
+    return fake
+
+def test_token_bucket_refills_at_the_limit_rate():
+    limit = parse_limit("user:3/30s")
+    assert limit == Limit("user", 3, 0.1)
+    state = None
+    for _ in range(3):
+        state, retry_after = take_token(state, limit, 100.0)
+        assert retry_after == 0
+    state, retry_after = take_token(state, limit, 100.0)
+    assert retry_after == pytest.approx(10)
+    # 5초 뒤에는 토큰 0.5개가 채워져 5초를 더 기다려야 합니다
+    state, retry_after = take_token(state, limit, 105.0)
+    assert retry_after == pytest.approx(5)
+    state, retry_after = take_token(state, limit, 110.0)
+    assert retry_after == 0
+    # 오래 쉬어도 버킷 크기 이상은 쌓이지 않습니다
+    state, _ = take_token(state, limit, 1000.0)
+    assert state == [2, 1000.0]
+
+async def test_redis_backend_matches_the_local_bucket(redis):
+    backend = RedisRateLimitBackend(redis)
+    limit = parse_limit("ip:2/m")
+    state = None
+    for now in (0.0, 0.0, 0.0, 10.0, 29.0, 30.0, 31.0):
+        redis.now = 1_700_000_000.0 + now
+        state, expected = take_token(state, limit, redis.now)
+        retry_after = await backend.take("POST /auth/login:0:ip:203.0.113.7", limit)
+        assert retry_after == pytest.approx(expected)
+        assert isinstance(retry_after, float)
+
+    key = "ratelimit:POST /auth/login:0:ip:203.0.113.7"
+    assert float(redis.hmget_now(key, ["updated_at"])[0]) == redis.now
+    # 버킷이 가득 찰 시간(capacity / rate = 60초)이 지나면 키가 사라집니다
+    assert redis.ttl(key) == pytest.approx(60)
+    redis.now += 60
+    assert redis.hmget_now(key, ["tokens"]) == [None]
+    assert redis.calls["evalsha"] == 7
+
+async def test_workers_share_the_redis_bucket(redis):
+    # 워커마다 따로 만든 백엔드라도 같은 Redis 키를 씁니다
+    workers = [RateLimiter(RedisRateLimitBackend(redis), parse_rules("GET /advices=user:2/m")) for _ in range(2)]
+    rule = workers[0].match("GET", "/advices")
+    results = [await workers[index % 2].check(rule, "father-1", "10.0.0.1") for index in range(3)]
+    assert results[:2] == [0, 0]
+    assert results[2] == pytest.approx(30)
+    # 다른 사용자는 다른 버킷
+    assert await workers[1].check(rule, "father-2", "10.0.0.1") == 0
+    assert set(redis.hashes) == {"ratelimit:GET /advices:0:user:father-1", "ratelimit:GET /advices:0:user:father-2"}
+
+async def test_redis_failure_lets_requests_through(redis):
+    limiter = RateLimiter(RedisRateLimitBackend(redis), parse_rules("GET /advices=user:1/m"))
+    rule = limiter.match("GET", "/advices")
+    assert await limiter.check(rule, "father-1", "10.0.0.1") == 0
+    redis.down = True
+    assert await limiter.check(rule, "father-1", "10.0.0.1") == 0
@@ -0,0 +1,53 @@
+import pytest
+
+from config import settings
+from media import MEDIA_BUCKET
+
+pytestmark = pytest.mark.anyio
+
+CHUNK_SIZE = 64 * 1024
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(settings, "RESUMABLE_UPLOAD_CHUNK_SIZE", CHUNK_SIZE)
+
+async def create_session(client, headers: dict, size: int) -> dict:
+    response = await client.post(
+        "/uploads", json={"filename": "video.mp4", "content_type": "video/mp4", "size": size}, headers=headers
+    )
+    assert response.status_code == 200
+    return response.json()
+
+async def test_chunked_upload_is_assembled_and_published(backend, family, client, bearer):
+    headers = bearer(family.father_id)
+    body = bytes(range(256)) * (CHUNK_SIZE * 5 // 2 // 256)
+    session = await create_session(client, headers, len(body))
+    upload_id = session["upload_id"]
+    assert session["total_chunks"] == 3
+
+    # 순서와 상관없이 받고, 빠진 청크를 알려줍니다
+    for index in (2, 0):
+        chunk = body[index * CHUNK_SIZE:(index + 1) * CHUNK_SIZE]
+        response = await client.put(f"/uploads/{upload_id}/chunks/{index}", content=chunk, headers=headers)
+        assert response.status_code == 200
+    incomplete = await client.post(f"/uploads/{upload_id}/complete", headers=headers)
+    assert incomplete.status_code == 409
+    assert incomplete.json()["detail"]["missing_chunks"] == [1]
+
+    response = await client.put(f"/uploads/{upload_id}/chunks/1", content=body[CHUNK_SIZE:2 * CHUNK_SIZE], headers=headers)
+    assert response.status_code == 200
+    completed = await client.post(f"/uploads/{upload_id}/complete", headers=headers)
+    assert completed.status_code == 200
+    assert completed.json()["type"] == "video"
+
+    # 합친 파일 하나만 남고 청크는 정리됩니다
+    stored = backend.objects[MEDIA_BUCKET]
+    assert list(stored.values()) == [body]
+    assert completed.json()["url"].endswith(next(iter(stored)))
+
+async def test_chunk_with_wrong_length_is_rejected(backend, family, client, bearer):
+    headers = bearer(family.father_id)
+    session = await create_session(client, headers, CHUNK_SIZE + 10)
+    response = await client.put(f"/uploads/{session['upload_id']}/chunks/1", content=b"\x00" * 9, headers=headers)
+    assert response.status_code == 400
+    assert not backend.objects.get(MEDIA_BUCKET)
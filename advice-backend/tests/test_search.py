@@ -0,0 +1,139 @@
+import random
+import uuid
+
+import pytest
+
+import main
+from benchmarks.fake_supabase import timestamp
+from benchmarks.seed import EPOCH, make_advice, seed_families
+from config import settings
+from search import NgramIndex
+
+pytestmark = pytest.mark.anyio
+
+CONTENTS = [
+    # (내용, 카테고리)
+    ("사랑한다 우리 아들", "life"),
+    ("사랑은 표현해야 한다", "love"),
+    ("매일 조금씩이라도 책을 읽는 습관을 들이렴", "study"),
+    ("돈보다 사람을 먼저 생각하렴", "money"),
+    ("사랑한다", "family"),
+]
+
+@pytest.fixture(autouse=True)
+def memory_search(monkeypatch):
+    monkeypatch.setattr(settings, "SEARCH_BACKEND", "memory")
+
+@pytest.fixture
+def searchable(backend):
+    """CONTENTS 순서대로(나중 항목이 최신) 조언을 가진 가족과, 같은 글을 가진 다른 가족"""
+    family, other = seed_families(backend, "unused-hash", families=2, advices_per_family=0, prefix=f"test-{uuid.uuid4().hex[:8]}")
+    rng = random.Random(0)
+    for target in (family, other):
+        rows = []
+        for index, (content, category) in enumerate(CONTENTS):
+            row = make_advice(rng, target.father_id, index)
+            row.update(content=content, category=category, target_age=index * 10)
+            row["created_at"] = row["updated_at"] = timestamp(EPOCH.replace(minute=index))
+            rows.append(row)
+        backend.load("advices", rows)
+        target.advice_ids = [row["id"] for row in rows]
+    return family, other
+
+async def search(client, headers: dict, **params):
+    return await client.get("/advices/search", params=params, headers=headers)
+
+async def test_results_are_ordered_by_relevance_then_recency(searchable, client, bearer):
+    family, _ = searchable
+    response = await search(client, bearer(family.father_id), q="사랑한다")
+    assert response.status_code == 200
+    ids = [item["id"] for item in response.json()["items"]]
+    # 그대로 포함된 두 조언(최신순) 다음에 일부 n-gram만 겹치는 조언
+    assert ids == [family.advice_ids[4], family.advice_ids[0], family.advice_ids[1]]
+
+async def test_query_with_a_typo_still_matches(searchable, client, bearer):
+    family, _ = searchable
+    response = await search(client, bearer(family.father_id), q="책을 잃는 습관")
+    assert [item["id"] for item in response.json()["items"]] == [family.advice_ids[2]]
+
+async def test_category_is_searched(searchable, client, bearer):
+    family, _ = searchable
+    response = await search(client, bearer(family.father_id), q="MONEY")
+    assert [item["id"] for item in response.json()["items"]] == [family.advice_ids[3]]
+
+async def test_pages_follow_the_cursor_to_the_end(searchable, client, bearer):
+    family, _ = searchable
+    headers = bearer(family.father_id)
+    everything = (await search(client, headers, q="사랑")).json()["items"]
+    assert len(everything) == 3
+
+    pages, cursor = [], None
+    while True:
+        params = {"q": "사랑", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = (await search(client, headers, **params)).json()
+        pages.append(body["items"])
+        cursor = body["next_cursor"]
+        if cursor is None:
+            break
+    assert [len(page) for page in pages] == [2, 1]
+    assert [item for page in pages for item in page] == everything
+
+    past_end = await search(client, headers, q="사랑", limit=2, cursor=main.encode_search_cursor(10))
+    assert past_end.json() == {"items": [], "next_cursor": None}
+
+@pytest.mark.parametrize("params, status_code", [
+    ({"q": "사랑", "limit": 0}, 422),
+    ({"q": "사랑", "limit": settings.ADVICES_MAX_PAGE_SIZE + 1}, 422),
+    ({"q": "사랑", "cursor": "not-a-cursor"}, 400),
+    ({"q": "사랑", "cursor": main.encode_search_cursor(-1)}, 400),
+])
+async def test_invalid_page_parameters_are_rejected(searchable, client, bearer, params, status_code):
+    family, _ = searchable
+    assert (await search(client, bearer(family.father_id), **params)).status_code == status_code
+
+async def test_results_are_scoped_to_the_callers_family(searchable, client, bearer):
+    family, other = searchable
+    father = (await search(client, bearer(family.father_id), q="사랑")).json()["items"]
+    other_father = (await search(client, bearer(other.father_id), q="사랑")).json()["items"]
+    assert {item["author_id"] for item in father} == {family.father_id}
+    assert {item["author_id"] for item in other_father} == {other.father_id}
+
+async def test_child_sees_the_same_scope_as_the_advice_list(searchable, backend, client, bearer):
+    family, _ = searchable
+    child_id = family.child_ids[0]
+    for row in backend.tables["users"]:
+        if row["id"] == child_id:
+            row["age"] = 5
+    headers = bearer(child_id)
+    results = (await search(client, headers, q="사랑")).json()["items"]
+    listed = (await client.get("/advices", params={"limit": 50}, headers=headers)).json()["items"]
+
+    # 검색은 GET /advices와 같은 범위를 보여주며, 나이에 따른 열람 잠금은 목록과 마찬가지로 클라이언트가 target_age로 판단합니다
+    assert {item["id"] for item in results} <= {item["id"] for item in listed}
+    assert any(item["target_age"] > 5 for item in results)
+    assert results == (await search(client, bearer(family.father_id), q="사랑")).json()["items"]
+
+async def test_child_without_a_father_gets_no_results(backend, client, bearer):
+    backend.load("users", [{
+        "id": "orphan-child", "password_hash": "unused", "user_type": "child", "name": "orphan",
+        "father_id": None, "age": 10,
+        "created_at": "2024-01-01T00:00:00.000000+00:00", "updated_at": "2024-01-01T00:00:00.000000+00:00",
+    }])
+    response = await search(client, bearer("orphan-child"), q="사랑")
+    assert response.json() == {"items": [], "next_cursor": None}
+
+@pytest.mark.parametrize("query, status_code", [("", 422), ("   ", 400), ("가" * 101, 422)])
+async def test_empty_or_oversized_query_is_rejected(searchable, client, bearer, query, status_code):
+    family, _ = searchable
+    assert (await search(client, bearer(family.father_id), q=query)).status_code == status_code
+
+async def test_single_character_query_matches(searchable, client, bearer):
+    family, _ = searchable
+    response = await search(client, bearer(family.father_id), q="돈")
+    assert [item["id"] for item in response.json()["items"]] == [family.advice_ids[3]]
+
+def test_index_ignores_width_case_and_spacing():
+    index = NgramIndex([{"id": "a", "content": "ＡＢＣ 사랑", "category": "life", "created_at": "2024"}])
+    assert [item["id"] for item in index.search("abc사랑")] == ["a"]
+    assert index.search("전혀 다른 말") == []
+    assert index.search(" ") == []
@@ -0,0 +1,99 @@
+import asyncio
+
+import pytest
+
+from singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+CALLERS = 10
+
+class Upstream:
+    """호출 수를 세고, release가 설정될 때까지 끝나지 않는 가짜 upstream 호출"""
+
+    def __init__(self, result="rows", error: Exception = None):
+        self.calls = 0
+        self.cancelled = False
+        self.release = asyncio.Event()
+        self.result = result
+        self.error = error
+
+    async def __call__(self):
+        self.calls += 1
+        try:
+            await self.release.wait()
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+async def start(flight: SingleFlight, upstream: Upstream, count: int) -> list:
+    tasks = [asyncio.ensure_future(flight.do("key", upstream)) for _ in range(count)]
+    await asyncio.sleep(0)
+    return tasks
+
+async def test_concurrent_callers_share_one_call():
+    flight, upstream = SingleFlight(), Upstream()
+    tasks = await start(flight, upstream, CALLERS)
+    upstream.release.set()
+    assert await asyncio.gather(*tasks) == ["rows"] * CALLERS
+    assert upstream.calls == 1
+    assert flight.stats() == {"in_flight": 0, "calls": 1, "shared": CALLERS - 1}
+
+async def test_finished_call_is_not_cached():
+    flight = SingleFlight()
+    for _ in range(2):
+        upstream = Upstream()
+        upstream.release.set()
+        assert await flight.do("key", upstream) == "rows"
+    assert flight.stats()["calls"] == 2
+
+async def test_error_reaches_every_caller():
+    flight, upstream = SingleFlight(), Upstream(error=RuntimeError("boom"))
+    tasks = await start(flight, upstream, CALLERS)
+    upstream.release.set()
+    results = await asyncio.gather(*tasks, return_exceptions=True)
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert upstream.calls == 1
+    assert flight.stats()["in_flight"] == 0
+
+async def test_cancelling_one_caller_keeps_the_shared_call():
+    flight, upstream = SingleFlight(), Upstream()
+    tasks = await start(flight, upstream, 3)
+    tasks[0].cancel()
+    await asyncio.sleep(0)
+    upstream.release.set()
+    assert await asyncio.gather(*tasks[1:]) == ["rows", "rows"]
+    assert tasks[0].cancelled()
+    assert not upstream.cancelled
+    assert upstream.calls == 1
+
+async def test_cancelling_every_caller_cancels_the_call():
+    flight, upstream = SingleFlight(), Upstream()
+    tasks = await start(flight, upstream, 3)
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    await asyncio.sleep(0)
+    assert upstream.cancelled
+    assert flight.stats()["in_flight"] == 0
+    # 다음 호출은 새로 실행됩니다
+    retry = Upstream()
+    retry.release.set()
+    assert await flight.do("key", retry) == "rows"
+    assert retry.calls == 1
+
+async def test_concurrent_stats_requests_make_one_rpc(backend, family, client, bearer):
+    backend.latency = 0.05
+    headers = bearer(family.father_id)
+    # 사용자 캐시를 먼저 채워 동시 요청에서는 통계 조회만 겹치게 합니다
+    assert (await client.get("/users/me", headers=headers)).status_code == 200
+    backend.calls.clear()
+
+    responses = await asyncio.gather(*(client.get("/stats", headers=headers) for _ in range(CALLERS)))
+    assert {response.status_code for response in responses} == {200}
+    assert len({response.text for response in responses}) == 1
+    assert backend.calls["rpc", "get_advice_stats", "call"] == 1
+    assert backend.calls["postgrest", "advice_family_versions", "select"] == 1
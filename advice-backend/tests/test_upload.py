@@ -0,0 +1,110 @@
+import tempfile
+import tracemalloc
+
+import httpx
+import pytest
+from storage3._sync.file_api import SyncBucketProxy
+from storage3.utils import SyncClient
+
+import main
+from config import settings
+from media import MEDIA_BUCKET, storage_reader
+
+pytestmark = pytest.mark.anyio
+
+MAX_UPLOAD_BYTES = 1024 * 1024
+CHUNK = 64 * 1024
+BOUNDARY = "test-boundary"
+
+def multipart_body(sent: list, total: int):
+    """total바이트 파일을 담은 멀티파트 본문을 CHUNK 단위로 보내는 스트림 (Content-Length 없이 전송됨)"""
+    async def chunks():
+        head = (
+            f"--{BOUNDARY}\r\n"
+            'Content-Disposition: form-data; name="file"; filename="big.jpg"\r\n'
+            "Content-Type: image/jpeg\r\n\r\n"
+        ).encode()
+        yield head
+        for _ in range(total // CHUNK):
+            sent[0] += CHUNK
+            yield b"\xff" * CHUNK
+        yield f"\r\n--{BOUNDARY}--\r\n".encode()
+    return chunks()
+
+@pytest.fixture
+def upload_app(monkeypatch):
+    # 미들웨어는 앱을 만들 때 한도를 읽으므로 설정을 바꾼 뒤 새 앱을 만듭니다
+    monkeypatch.setattr(settings, "MAX_UPLOAD_BYTES", MAX_UPLOAD_BYTES)
+    return main.create_app()
+
+async def post_streamed(app, headers: dict, total: int, sent: list) -> httpx.Response:
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        return await client.post(
+            "/upload-media",
+            content=multipart_body(sent, total),
+            headers={**headers, "Content-Type": f"multipart/form-data; boundary={BOUNDARY}"},
+        )
+
+async def test_oversized_streamed_upload_aborts_with_bounded_memory(upload_app, family, bearer):
+    headers = {**bearer(family.father_id), "Origin": "https://advice-app-frontend.vercel.app"}
+    # 첫 요청에서 생기는 import/캐시 할당이 측정에 섞이지 않도록 한 번 먼저 보냅니다
+    await post_streamed(upload_app, headers, 2 * MAX_UPLOAD_BYTES, [0])
+
+    total = 32 * MAX_UPLOAD_BYTES
+    sent = [0]
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        response = await post_streamed(upload_app, headers, total, sent)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert response.status_code == 413
+    assert "access-control-allow-origin" in response.headers
+    # 한도를 넘은 직후 본문 읽기를 멈추고, 본문 전체를 메모리나 임시 파일에 모으지 않습니다
+    assert sent[0] < 2 * MAX_UPLOAD_BYTES
+    assert peak < 3 * MAX_UPLOAD_BYTES
+
+async def test_content_length_over_limit_is_rejected_before_reading(upload_app, family, bearer):
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=upload_app), base_url="http://test") as client:
+        response = await client.post(
+            "/upload-media",
+            files={"file": ("big.jpg", b"\xff" * (2 * MAX_UPLOAD_BYTES), "image/jpeg")},
+            headers=bearer(family.father_id),
+        )
+    assert response.status_code == 413
+
+async def test_upload_within_limit_is_stored_once(backend, upload_app, family, bearer):
+    body = b"\xff\xd8" + b"\x00" * (MAX_UPLOAD_BYTES // 2)
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=upload_app), base_url="http://test") as client:
+        response = await client.post(
+            "/upload-media",
+            files={"file": ("photo.jpg", body, "image/jpeg")},
+            headers=bearer(family.father_id),
+        )
+    assert response.status_code == 200
+    assert response.json()["type"] == "image"
+    stored = backend.objects["advice-media"]
+    assert list(stored.values()) == [body]
+
+def test_storage_reader_is_accepted_by_storage3():
+    received = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        received.append(request.read())
+        return httpx.Response(200, json={"Key": f"{MEDIA_BUCKET}/photo.jpg"})
+
+    # 실제 storage3 버킷 클라이언트 (HTTP 요청만 MockTransport로 받음)
+    bucket = SyncBucketProxy(MEDIA_BUCKET, SyncClient(base_url="http://storage.test", transport=httpx.MockTransport(handler)))
+    body = b"\xff\xd8" + b"\x01" * 4096
+    with tempfile.SpooledTemporaryFile(max_size=1024 * 1024) as spooled:
+        spooled.write(body)
+        # 멀티파트 파서의 파일 객체를 그대로 넘기면 storage3가 경로로 보고 open()합니다
+        with pytest.raises(TypeError):
+            bucket.upload("photo.jpg", spooled, {"content-type": "image/jpeg"})
+        with storage_reader(spooled) as reader:
+            reader.seek(0)
+            bucket.upload("photo.jpg", reader, {"content-type": "image/jpeg"})
+        assert not spooled.closed
+    assert body in received[-1]
@@ -0,0 +1,48 @@
+import asyncio
+
+import pytest
+
+import main
+from events import EventHub, LocalBroker
+
+pytestmark = pytest.mark.anyio
+
+@pytest.fixture
+def hub(monkeypatch) -> EventHub:
+    # 프로세스 내 브로커로 다른 워커와의 pub/sub을 흉내 냅니다
+    event_hub = EventHub(LocalBroker(queue_size=10))
+    monkeypatch.setattr(main, "event_hub", event_hub)
+    return event_hub
+
+async def test_age_update_is_visible_on_next_request(family, client, bearer):
+    headers = bearer(family.child_ids[0])
+    before = await client.get("/stats", headers=headers)
+    response = await client.put("/users/age", json={"age": 61}, headers=headers)
+    assert response.status_code == 200
+    after = await client.get("/stats", headers=headers)
+    assert after.json()["current_age"] == 61
+    assert after.headers["ETag"] != before.headers["ETag"]
+
+async def test_user_change_from_another_worker_invalidates_cache(hub, family):
+    child_id = family.child_ids[0]
+    main.user_cache.set(child_id, {"id": child_id, "age": 10})
+    watcher = asyncio.create_task(main.watch_user_changes())
+    try:
+        await asyncio.sleep(0)
+        await hub.publish_user_changed(child_id)
+        for _ in range(100):
+            if main.user_cache.get(child_id) is None:
+                break
+            await asyncio.sleep(0.01)
+        assert main.user_cache.get(child_id) is None
+    finally:
+        watcher.cancel()
+
+async def test_age_update_notifies_other_workers(hub, family, client, bearer):
+    subscription = await hub.subscribe_user_changes()
+    try:
+        response = await client.put("/users/age", json={"age": 30}, headers=bearer(family.child_ids[0]))
+        assert response.status_code == 200
+        assert await subscription.get(timeout=1) == family.child_ids[0].encode()
+    finally:
+        await subscription.close()
@@ -0,0 +1,137 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from opentelemetry import propagate, trace
+from opentelemetry.sdk.resources import Resource
+from opentelemetry.sdk.trace import TracerProvider
+from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from config import settings
+from metrics import route_template
+
+logger = logging.getLogger("advice.trace")
+
+# OpenTelemetry 추적
+# 요청마다 서버 스팬을 만들고, 그 아래에 Supabase 호출과 검증/직렬화 단계를 자식 스팬으로 기록합니다.
+# TRACE_EXPORTER로 내보낼 곳을 정합니다: none(기본값), file(TRACE_FILE에 JSON 한 줄씩), console, otlp(OTLP/HTTP).
+# 외부 수집기 없이 file로 기록하고, 필요하면 로컬 OTLP 수집기(Jaeger 등)로 보낼 수 있습니다.
+
+tracer = trace.get_tracer("advice")
+_provider: Optional[TracerProvider] = None
+
+def _create_exporter():
+    exporter = settings.TRACE_EXPORTER.lower()
+    if exporter == "file":
+        output = open(settings.TRACE_FILE, "a", encoding="utf-8")
+        return ConsoleSpanExporter(out=output, formatter=lambda span: span.to_json(indent=None) + "\n")
+    if exporter == "console":
+        return ConsoleSpanExporter()
+    if exporter == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+
+        # 주소는 OTEL_EXPORTER_OTLP_ENDPOINT (기본값 http://localhost:4318)
+        return OTLPSpanExporter()
+    return None
+
+def setup_tracing() -> None:
+    global _provider
+    if _provider is not None:
+        return
+    exporter = _create_exporter()
+    if exporter is None:
+        return
+    _provider = TracerProvider(resource=Resource.create({"service.name": settings.TRACE_SERVICE_NAME}))
+    _provider.add_span_processor(BatchSpanProcessor(exporter))
+    trace.set_tracer_provider(_provider)
+
+def shutdown_tracing() -> None:
+    global _provider
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+@contextmanager
+def span(name: str, **attributes: Any) -> Iterator[trace.Span]:
+    """현재 스팬의 자식 스팬을 만듭니다. 추적이 꺼져 있으면 아무 일도 하지 않는 스팬입니다."""
+    with tracer.start_as_current_span(name, attributes=attributes) as current:
+        yield current
+
+class UpstreamCall:
+    """upstream_span이 돌려주는 호출 정보. 결과를 받은 뒤 set_rows()로 행 수를 기록합니다."""
+
+    def __init__(self, span: trace.Span):
+        self.span = span
+        self.row_count: Optional[int] = None
+
+    def set_rows(self, row_count: int) -> None:
+        self.row_count = row_count
+        self.span.set_attribute("db.row_count", row_count)
+
+@contextmanager
+def upstream_span(service: str, target: str, operation: str, filters: str = "") -> Iterator[UpstreamCall]:
+    """Supabase 호출 스팬. SLOW_CALL_MS 이상 걸린 호출은 대상, 필터, 행 수와 함께 경고 로그로 남깁니다."""
+    started = time.perf_counter()
+    with tracer.start_as_current_span(
+        f"supabase {service} {target}",
+        kind=SpanKind.CLIENT,
+        attributes={"db.system": "postgrest", "db.operation": operation, "supabase.service": service, "supabase.target": target},
+    ) as current:
+        call = UpstreamCall(current)
+        try:
+            yield call
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            if elapsed_ms >= settings.SLOW_CALL_MS:
+                logger.warning("slow supabase call", extra={
+                    "service": service,
+                    "target": target,
+                    "operation": operation,
+                    "filters": filters,
+                    "row_count": call.row_count,
+                    "duration_ms": round(elapsed_ms, 1),
+                })
+
+class TracingMiddleware:
+    """요청마다 서버 스팬을 만듭니다. traceparent 헤더가 있으면 상위 추적에 이어 붙입니다."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {key.decode("latin-1"): value.decode("latin-1") for key, value in scope["headers"]}
+        context = propagate.extract(carrier)
+        status_code = 500
+        request_id = None
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code, request_id
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                for key, value in message.get("headers", ()):
+                    if key.lower() == b"x-request-id":
+                        request_id = value.decode("latin-1")
+            await send(message)
+
+        with tracer.start_as_current_span(
+            f"{scope['method']} {scope['path']}", context=context, kind=SpanKind.SERVER
+        ) as current:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = route_template(scope)
+                current.update_name(f"{scope['method']} {route}")
+                current.set_attribute("http.method", scope["method"])
+                current.set_attribute("http.route", route)
+                current.set_attribute("http.status_code", status_code)
+                if request_id:
+                    current.set_attribute("request.id", request_id)
+                if status_code >= 500:
+                    current.set_status(Status(StatusCode.ERROR))
@@ -0,0 +1,43 @@
+-- media_url 표준화 백필 (fix_media_urls.sql의 후속 일회성 마이그레이션)
+-- 백엔드는 이제 쓰기 시점에만 media.normalize_media_url()로 URL을 정리하고
+-- 조회 시에는 저장된 값을 그대로 반환하므로, 기존 행을 같은 규칙으로 한 번 정리합니다.
+--   1) 앞뒤 공백 및 끝의 세미콜론(여러 개 포함) 제거
+--   2) /advice-media/ 뒤 슬래시를 항상 2개(/advice-media//)로 통일
+--   3) 빈 문자열은 NULL로 변경
+-- 여러 번 실행해도 결과가 같습니다.
+
+-- 1. 현재 상태 확인
+SELECT COUNT(*) AS advices_to_fix
+FROM advices
+WHERE media_url IS DISTINCT FROM NULLIF(
+    regexp_replace(
+        regexp_replace(btrim(media_url), '[[:space:];]+$', ''),
+        '/advice-media/+', '/advice-media//', 'g'
+    ),
+    ''
+);
+
+-- 2. 표준 형식으로 정리
+UPDATE advices
+SET media_url = NULLIF(
+    regexp_replace(
+        regexp_replace(btrim(media_url), '[[:space:];]+$', ''),
+        '/advice-media/+', '/advice-media//', 'g'
+    ),
+    ''
+)
+WHERE media_url IS DISTINCT FROM NULLIF(
+    regexp_replace(
+        regexp_replace(btrim(media_url), '[[:space:];]+$', ''),
+        '/advice-media/+', '/advice-media//', 'g'
+    ),
+    ''
+);
+
+-- 3. 정리 후 상태 확인 (advices_with_semicolon, advices_with_wrong_format은 0이어야 합니다)
+SELECT COUNT(*) AS total_advices,
+       COUNT(media_url) AS advices_with_media,
+       COUNT(CASE WHEN media_url LIKE '%;' THEN 1 END) AS advices_with_semicolon,
+       COUNT(CASE WHEN media_url LIKE '%/advice-media//%' AND media_url NOT LIKE '%/advice-media///%' THEN 1 END) AS advices_with_correct_format,
+       COUNT(CASE WHEN media_url ~ '/advice-media/([^/]|/{2,})' THEN 1 END) AS advices_with_wrong_format
+FROM advices;
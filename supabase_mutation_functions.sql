@@ -0,0 +1,24 @@
+-- 조언 상태 변경용 Supabase RPC 함수
+-- 소유권 조건을 UPDATE 문에 포함해 한 번의 왕복으로 처리하고, 동시 클릭에도 갱신이 유실되지 않도록 합니다
+-- Supabase SQL Editor에서 실행하세요
+
+-- 1. 즐겨찾기 토글 (현재 값을 SQL에서 뒤집음)
+-- author_id_param(자녀의 father_id)과 일치하는 조언만 변경하며, 변경된 행을 반환합니다 (없으면 빈 결과)
+CREATE OR REPLACE FUNCTION toggle_advice_favorite(
+    advice_id_param UUID,
+    author_id_param VARCHAR(255)
+)
+RETURNS SETOF advices
+LANGUAGE sql
+VOLATILE
+SECURITY DEFINER
+AS $$
+    UPDATE advices
+    SET is_favorite = NOT is_favorite
+    WHERE id = advice_id_param
+      AND author_id = author_id_param
+    RETURNING *;
+$$;
+
+-- 권한 설정
+GRANT EXECUTE ON FUNCTION toggle_advice_favorite(UUID, VARCHAR) TO anon, authenticated, service_role;
@@ -0,0 +1,49 @@
+-- 조언 내용 검색용 Supabase RPC 함수
+-- GET /advices/search 엔드포인트에서 사용합니다. Supabase SQL Editor에서 실행하세요
+--
+-- 한국어는 조사/어미가 단어에 붙어 있어 공백 기준 tsvector('simple')로는 "사랑"으로 "사랑해"를 찾을 수 없으므로,
+-- 글자 단위 트라이그램(pg_trgm) GIN 인덱스로 부분 문자열 검색과 유사도 순위를 처리합니다.
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS advices_content_trgm_idx ON advices USING GIN (content gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS advices_category_trgm_idx ON advices USING GIN (category gin_trgm_ops);
+
+-- 가족(author_id_param)의 조언 중 query_param을 포함하거나 비슷한 조언을 관련도 순으로 반환합니다
+-- 관련도: 내용/카테고리에 검색어가 그대로 포함되면 가산점 + 단어 유사도(word_similarity)
+CREATE OR REPLACE FUNCTION search_advices(
+    author_id_param VARCHAR(255),
+    query_param TEXT,
+    limit_param INTEGER DEFAULT 20,
+    offset_param INTEGER DEFAULT 0
+)
+RETURNS SETOF advices
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH q AS (
+        SELECT
+            query_param AS raw,
+            '%' || replace(replace(replace(query_param, '\', '\\'), '%', '\%'), '_', '\_') || '%' AS pattern
+    )
+    SELECT a.*
+    FROM advices a, q
+    WHERE a.author_id = author_id_param
+      AND (
+          a.content ILIKE q.pattern
+          OR a.category ILIKE q.pattern
+          OR q.raw <% a.content
+      )
+    ORDER BY
+        (CASE WHEN a.content ILIKE q.pattern THEN 1 ELSE 0 END
+         + CASE WHEN a.category ILIKE q.pattern THEN 0.5 ELSE 0 END
+         + word_similarity(q.raw, a.content)) DESC,
+        a.created_at DESC,
+        a.id DESC
+    LIMIT limit_param
+    OFFSET offset_param;
+$$;
+
+-- 권한 설정
+GRANT EXECUTE ON FUNCTION search_advices(VARCHAR, TEXT, INTEGER, INTEGER) TO anon, authenticated, service_role;
@@ -0,0 +1,61 @@
+-- 통계 집계용 Supabase RPC 함수들
+-- /stats, /stats/age-distribution 엔드포인트가 전체 행 대신 집계 결과만 받도록 합니다
+-- Supabase SQL Editor에서 실행하세요
+
+-- 1. 조언 개수 통계 (아버지/자녀 공통)
+CREATE OR REPLACE FUNCTION get_advice_stats(
+    author_id_param VARCHAR(255),
+    current_age_param INTEGER DEFAULT NULL
+)
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    SELECT json_build_object(
+        'total_advices', COUNT(*),
+        'read_advices', COUNT(*) FILTER (WHERE is_read),
+        'unread_advices', COUNT(*) FILTER (WHERE NOT is_read),
+        'favorite_advices', COUNT(*) FILTER (WHERE is_favorite),
+        'available_advices', COUNT(*) FILTER (WHERE target_age <= current_age_param),
+        'future_advices', COUNT(*) FILTER (WHERE target_age > current_age_param)
+    )
+    FROM advices
+    WHERE author_id = author_id_param;
+$$;
+
+-- 2. 연령별 메시지 분포 (나이별 개수 + 연령대 구간)
+CREATE OR REPLACE FUNCTION get_advice_age_distribution(author_id_param VARCHAR(255))
+RETURNS JSON
+LANGUAGE sql
+STABLE
+SECURITY DEFINER
+AS $$
+    WITH per_age AS (
+        SELECT target_age, COUNT(*)::INTEGER AS cnt
+        FROM advices
+        WHERE author_id = author_id_param
+        GROUP BY target_age
+    )
+    SELECT json_build_object(
+        'age_distribution', COALESCE(json_object_agg(target_age, cnt ORDER BY target_age), '{}'::json),
+        'total_messages', COALESCE(SUM(cnt), 0)::INTEGER,
+        'age_ranges', json_build_object(
+            'childhood', COALESCE(SUM(cnt) FILTER (WHERE target_age <= 12), 0)::INTEGER,
+            'teenage', COALESCE(SUM(cnt) FILTER (WHERE target_age BETWEEN 13 AND 19), 0)::INTEGER,
+            'twenties', COALESCE(SUM(cnt) FILTER (WHERE target_age BETWEEN 20 AND 29), 0)::INTEGER,
+            'thirties', COALESCE(SUM(cnt) FILTER (WHERE target_age BETWEEN 30 AND 39), 0)::INTEGER,
+            'forties', COALESCE(SUM(cnt) FILTER (WHERE target_age BETWEEN 40 AND 49), 0)::INTEGER,
+            'fifties', COALESCE(SUM(cnt) FILTER (WHERE target_age BETWEEN 50 AND 59), 0)::INTEGER,
+            'sixties_plus', COALESCE(SUM(cnt) FILTER (WHERE target_age >= 60), 0)::INTEGER
+        )
+    )
+    FROM per_age;
+$$;
+
+-- 집계가 author_id 인덱스만으로 처리되도록 합니다
+CREATE INDEX IF NOT EXISTS advices_author_target_age_idx ON advices (author_id, target_age);
+
+-- 권한 설정
+GRANT EXECUTE ON FUNCTION get_advice_stats(VARCHAR, INTEGER) TO anon, authenticated, service_role;
+GRANT EXECUTE ON FUNCTION get_advice_age_distribution(VARCHAR) TO anon, authenticated, service_role;